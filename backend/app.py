@@ -1,20 +1,104 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
 from models import db, User, Product, Order, OrderItem, DistributionCenter, InventoryItem, ConversationSession, ChatMessage
-from services import UserService, ProductService, OrderService, ConversationService, ChatMessageService, EcommerceDataService
+from services import UserService, ProductService, OrderService, InventoryService, ConversationService, ChatMessageService, EcommerceDataService
 import os
-from lang_engine import run_langgraph_chat
-from memory_service import memory_service
+import json
+from datetime import datetime
+from search_index import ensure_product_search_index
+from response_cache import response_cache, cached_response
+from chat_cache import chat_response_cache
+from sqlite_tuning import SQLITE_TUNING_ENABLED, configure_sqlite_engine, log_sqlite_settings
+from lang_engine import run_langgraph_chat, stream_langgraph_chat, interrupted_chat_result, store_turn_memory, warmup_langgraph_workflow
+from memory_service import memory_service, memory_write_queue, memory_retention_job
+from conversation_summary import conversation_summarizer
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Next-After-Id', 'X-Prev-Before-Id'])
 
 # Database configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///ecommerce.db'
+# Relative SQLite paths resolve to the instance folder next to app.py
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///ecommerce.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Upper bound for ?limit= on paginated list endpoints
+MAX_PAGE_LIMIT = int(os.getenv('MAX_PAGE_LIMIT', '1000'))
+DEFAULT_SEARCH_LIMIT = 50
+DEFAULT_MESSAGE_PAGE = 50
+
 # Initialize database
 db.init_app(app)
+# Conversation summaries are written from a background thread under this app
+conversation_summarizer.init_app(app)
+
+with app.app_context():
+    # WAL, cache and busy-timeout pragmas on every connection, set before the first one is opened
+    if SQLITE_TUNING_ENABLED:
+        configure_sqlite_engine(db.engine)
+    log_sqlite_settings(db.engine)
+    # Make sure the product full-text index exists (and is populated) before serving searches
+    ensure_product_search_index(db.engine)
+
+# Compile the LangGraph workflow once at startup instead of on the first chat
+app.logger.info("LangGraph workflow compiled in %.1f ms", warmup_langgraph_workflow() * 1000)
+
+@app.before_request
+def _start_memory_retention():
+    # Scheduled memory expiry starts with the first request, so it runs in each process
+    # that serves the app (WSGI workers, the debug reloader's child) and not in the
+    # reloader's watcher process
+    if memory_retention_job.interval and not memory_retention_job.started:
+        memory_retention_job.start()
+
+def _stream_ndjson(rows):
+    """Yield one JSON document per line"""
+    for row in rows:
+        yield json.dumps(row.to_dict()) + '\n'
+
+def _stream_json_array(rows):
+    """Yield a JSON array chunk by chunk"""
+    yield '['
+    first = True
+    for row in rows:
+        yield ('' if first else ',') + json.dumps(row.to_dict())
+        first = False
+    yield ']'
+
+def list_response(get_page, iter_rows, key):
+    """Serve a list endpoint with keyset pagination and optional streaming.
+
+    Query parameters:
+        after_id: only return rows whose key is greater than this value
+        limit: maximum number of rows to return (capped at MAX_PAGE_LIMIT)
+        stream: 'ndjson' or 'json' to stream rows from a server-side cursor
+
+    Without limit/after_id/stream the full table is returned as before.
+    Paginated responses carry the cursor for the next page in X-Next-After-Id.
+    """
+    after_id = request.args.get('after_id', type=int)
+    limit = request.args.get('limit', type=int)
+    stream = request.args.get('stream')
+    
+    if limit is not None:
+        if limit < 1:
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+        limit = min(limit, MAX_PAGE_LIMIT)
+    
+    if stream:
+        if stream == 'ndjson':
+            generator, mimetype = _stream_ndjson, 'application/x-ndjson'
+        elif stream == 'json':
+            generator, mimetype = _stream_json_array, 'application/json'
+        else:
+            return jsonify({'error': 'stream must be "ndjson" or "json"'}), 400
+        rows = iter_rows(after_id, limit)
+        return Response(stream_with_context(generator(rows)), mimetype=mimetype)
+    
+    rows = get_page(after_id, limit)
+    response = jsonify([row.to_dict() for row in rows])
+    if limit and len(rows) == limit:
+        response.headers['X-Next-After-Id'] = str(getattr(rows[-1], key))
+    return response
 
 # ============================================================================
 # ROOT ENDPOINT
@@ -53,21 +137,8 @@ def root():
 
 @app.route('/api/users', methods=['GET'])
 def get_users():
-    """Get all users"""
-    users = UserService.get_all_users()
-    return jsonify([{
-        'id': user.id,
-        'first_name': user.first_name,
-        'last_name': user.last_name,
-        'email': user.email,
-        'age': user.age,
-        'gender': user.gender,
-        'state': user.state,
-        'city': user.city,
-        'country': user.country,
-        'traffic_source': user.traffic_source,
-        'created_at': user.created_at.isoformat() if user.created_at else None
-    } for user in users])
+    """Get users, optionally paginated (?after_id=&limit=) or streamed (?stream=ndjson|json)"""
+    return list_response(UserService.get_users_page, UserService.iter_users, 'id')
 
 @app.route('/api/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
@@ -76,87 +147,40 @@ def get_user(user_id):
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    return jsonify({
-        'id': user.id,
-        'first_name': user.first_name,
-        'last_name': user.last_name,
-        'email': user.email,
-        'age': user.age,
-        'gender': user.gender,
-        'state': user.state,
-        'city': user.city,
-        'country': user.country,
-        'traffic_source': user.traffic_source,
-        'created_at': user.created_at.isoformat() if user.created_at else None
-    })
+    return jsonify(user.to_dict())
 
 @app.route('/api/users/<int:user_id>/orders', methods=['GET'])
 def get_user_orders(user_id):
     """Get all orders for a specific user"""
     orders = UserService.get_user_orders(user_id)
-    return jsonify([{
-        'order_id': order.order_id,
-        'user_id': order.user_id,
-        'status': order.status,
-        'gender': order.gender,
-        'created_at': order.created_at.isoformat() if order.created_at else None,
-        'returned_at': order.returned_at.isoformat() if order.returned_at else None,
-        'shipped_at': order.shipped_at.isoformat() if order.shipped_at else None,
-        'delivered_at': order.delivered_at.isoformat() if order.delivered_at else None,
-        'num_of_item': order.num_of_item
-    } for order in orders])
+    return jsonify([order.to_dict() for order in orders])
 
 @app.route('/api/products', methods=['GET'])
+@cached_response
 def get_products():
-    """Get all products"""
-    products = ProductService.get_all_products()
-    return jsonify([{
-        'id': product.id,
-        'name': product.name,
-        'brand': product.brand,
-        'category': product.category,
-        'department': product.department,
-        'sku': product.sku,
-        'cost': product.cost,
-        'retail_price': product.retail_price,
-        'distribution_center_id': product.distribution_center_id
-    } for product in products])
+    """Get products, optionally paginated (?after_id=&limit=) or streamed (?stream=ndjson|json)"""
+    return list_response(ProductService.get_products_page, ProductService.iter_products, 'id')
 
 @app.route('/api/products/search', methods=['GET'])
+@cached_response
 def search_products():
-    """Search products by name, brand, or category"""
+    """Search products by name, brand, or category (ranked, prefix matching, ?limit=&offset=)"""
     query = request.args.get('q', '')
     if not query:
         return jsonify({'error': 'Query parameter "q" is required'}), 400
     
-    products = ProductService.search_products(query)
-    return jsonify([{
-        'id': product.id,
-        'name': product.name,
-        'brand': product.brand,
-        'category': product.category,
-        'department': product.department,
-        'sku': product.sku,
-        'cost': product.cost,
-        'retail_price': product.retail_price,
-        'distribution_center_id': product.distribution_center_id
-    } for product in products])
+    limit = request.args.get('limit', DEFAULT_SEARCH_LIMIT, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    if limit < 1 or offset < 0:
+        return jsonify({'error': 'limit must be positive and offset non-negative'}), 400
+    
+    products = ProductService.search_products(query, min(limit, MAX_PAGE_LIMIT), offset)
+    return jsonify([product.to_dict() for product in products])
 
 @app.route('/api/orders', methods=['GET'])
 def get_orders():
-    """Get all orders"""
-    orders = OrderService.get_all_orders()
-    return jsonify([{
-        'order_id': order.order_id,
-        'user_id': order.user_id,
-        'status': order.status,
-        'gender': order.gender,
-        'created_at': order.created_at.isoformat() if order.created_at else None,
-        'returned_at': order.returned_at.isoformat() if order.returned_at else None,
-        'shipped_at': order.shipped_at.isoformat() if order.shipped_at else None,
-        'delivered_at': order.delivered_at.isoformat() if order.delivered_at else None,
-        'num_of_item': order.num_of_item
-    } for order in orders])
+    """Get orders, optionally paginated (?after_id=&limit=) or streamed (?stream=ndjson|json)"""
+    return list_response(OrderService.get_orders_page, OrderService.iter_orders, 'order_id')
 
 @app.route('/api/orders/<int:order_id>', methods=['GET'])
 def get_order(order_id):
@@ -165,65 +189,25 @@ def get_order(order_id):
     if not order:
         return jsonify({'error': 'Order not found'}), 404
     
-    return jsonify({
-        'order_id': order.order_id,
-        'user_id': order.user_id,
-        'status': order.status,
-        'gender': order.gender,
-        'created_at': order.created_at.isoformat() if order.created_at else None,
-        'returned_at': order.returned_at.isoformat() if order.returned_at else None,
-        'shipped_at': order.shipped_at.isoformat() if order.shipped_at else None,
-        'delivered_at': order.delivered_at.isoformat() if order.delivered_at else None,
-        'num_of_item': order.num_of_item
-    })
+    return jsonify(order.to_dict())
 
 @app.route('/api/orders/<int:order_id>/items', methods=['GET'])
 def get_order_items(order_id):
     """Get all items for a specific order"""
     items = OrderService.get_order_items(order_id)
-    return jsonify([{
-        'id': item.id,
-        'order_id': item.order_id,
-        'user_id': item.user_id,
-        'product_id': item.product_id,
-        'inventory_item_id': item.inventory_item_id,
-        'status': item.status,
-        'created_at': item.created_at.isoformat() if item.created_at else None,
-        'shipped_at': item.shipped_at.isoformat() if item.shipped_at else None,
-        'delivered_at': item.delivered_at.isoformat() if item.delivered_at else None,
-        'returned_at': item.returned_at.isoformat() if item.returned_at else None,
-        'sale_price': item.sale_price
-    } for item in items])
+    return jsonify([item.to_dict() for item in items])
 
 @app.route('/api/distribution-centers', methods=['GET'])
+@cached_response
 def get_distribution_centers():
     """Get all distribution centers"""
     centers = DistributionCenter.query.all()
-    return jsonify([{
-        'id': center.id,
-        'name': center.name,
-        'latitude': center.latitude,
-        'longitude': center.longitude
-    } for center in centers])
+    return jsonify([center.to_dict() for center in centers])
 
 @app.route('/api/inventory-items', methods=['GET'])
 def get_inventory_items():
-    """Get all inventory items"""
-    items = InventoryItem.query.all()
-    return jsonify([{
-        'id': item.id,
-        'product_id': item.product_id,
-        'created_at': item.created_at.isoformat() if item.created_at else None,
-        'sold_at': item.sold_at.isoformat() if item.sold_at else None,
-        'cost': item.cost,
-        'product_category': item.product_category,
-        'product_name': item.product_name,
-        'product_brand': item.product_brand,
-        'product_retail_price': item.product_retail_price,
-        'product_department': item.product_department,
-        'product_sku': item.product_sku,
-        'product_distribution_center_id': item.product_distribution_center_id
-    } for item in items])
+    """Get inventory items, optionally paginated (?after_id=&limit=) or streamed (?stream=ndjson|json)"""
+    return list_response(InventoryService.get_inventory_page, InventoryService.iter_inventory, 'id')
 
 # ============================================================================
 # NEW CONVERSATION AND CHAT ENDPOINTS (MILESTONE 3)
@@ -311,10 +295,45 @@ def add_message(session_id):
 
 @app.route('/api/conversations/<int:session_id>/messages', methods=['GET'])
 def get_conversation_messages(session_id):
-    """Get all messages for a conversation session"""
+    """Get messages for a conversation session, oldest first.
+
+    Query parameters:
+        before_id: page of messages just older than this message
+        after_id: page of messages just newer than this message
+        latest: 'true' for the most recent page
+        limit: page size (default DEFAULT_MESSAGE_PAGE, capped at MAX_PAGE_LIMIT)
+
+    Without before_id/after_id/latest the whole history (or its first `limit`
+    messages) is returned as before. Paginated responses carry the anchor for
+    the next older page in X-Prev-Before-Id and for the next newer page in
+    X-Next-After-Id when more messages exist in that direction.
+    """
+    before_id = request.args.get('before_id', type=int)
+    after_id = request.args.get('after_id', type=int)
+    latest = request.args.get('latest', 'false').lower() == 'true'
     limit = request.args.get('limit', type=int)
-    messages = ChatMessageService.get_session_messages(session_id, limit)
-    return jsonify([message.to_dict() for message in messages])
+    
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    if before_id is not None and after_id is not None:
+        return jsonify({'error': 'use either before_id or after_id, not both'}), 400
+    
+    if before_id is None and after_id is None and not latest:
+        messages = ChatMessageService.get_session_messages(session_id, limit)
+        return jsonify([message.to_dict() for message in messages])
+    
+    limit = min(limit or DEFAULT_MESSAGE_PAGE, MAX_PAGE_LIMIT)
+    messages, has_more = ChatMessageService.get_messages_page(session_id, before_id, after_id, limit)
+    response = jsonify([message.to_dict() for message in messages])
+    if messages:
+        # Behind the page there is at least the anchor; ahead of it, only if has_more
+        has_older = has_more if after_id is None else True
+        has_newer = has_more if after_id is not None else before_id is not None
+        if has_older:
+            response.headers['X-Prev-Before-Id'] = str(messages[0].id)
+        if has_newer:
+            response.headers['X-Next-After-Id'] = str(messages[-1].id)
+    return response
 
 @app.route('/api/conversations/<int:session_id>/messages/recent', methods=['GET'])
 def get_recent_messages(session_id):
@@ -352,6 +371,7 @@ def get_user_context(user_id):
     return jsonify(context)
 
 @app.route('/api/ai/products', methods=['GET'])
+@cached_response
 def get_products_for_ai():
     """Get product information for AI context"""
     product_ids = request.args.getlist('product_ids', type=int)
@@ -370,64 +390,136 @@ def get_order_status_for_ai(order_id):
     
     return jsonify(order_status)
 
-@app.route('/api/chat', methods=['POST'])
-def chat_api():
-    """Chat endpoint: user sends message, LLM responds, all persisted"""
-    data = request.get_json()
+def _start_chat_turn(data):
+    """Validate a chat request and check its session exists.
+
+    Nothing is written here: a new session (session_id None) is created
+    together with the turn's messages by _save_turn.
+    Returns (session_id, user_message, received_at, error_response).
+    """
+    received_at = datetime.utcnow()
     user_id = data.get('user_id')
     user_message = data.get('message')
     session_id = data.get('session_id')
     
     if not user_id or not user_message:
-        return jsonify({'error': 'user_id and message are required'}), 400
+        return None, None, None, (jsonify({'error': 'user_id and message are required'}), 400)
     
-    # If no session_id, create a new session
     if not session_id:
-        session = ConversationService.create_session(user_id)
-        session_id = session.id
-    else:
-        session = ConversationService.get_session(session_id)
-        if not session:
-            return jsonify({'error': 'Session not found'}), 404
-    
-    # Persist user message
-    user_msg = ChatMessageService.add_message(
+        session_id = None
+    elif not ConversationService.get_session(session_id):
+        return None, None, None, (jsonify({'error': 'Session not found'}), 404)
+    return session_id, user_message, received_at, None
+
+def _save_turn(session_id, user_message, received_at, result):
+    """Persist the user message and the AI reply of a workflow run (and, for session_id
+    None, the new session) in one transaction, then store them in semantic memory.
+
+    Returns (user_msg, ai_msg). Queues a summary update when the session has
+    enough messages the summary doesn't cover yet.
+    """
+    user_msg, ai_msg = ChatMessageService.add_turn(
         session_id=session_id,
-        message_type='user',
-        content=user_message,
-        metadata=None
+        user_content=user_message,
+        ai_content=result.get('ai_response'),
+        ai_metadata={
+            'intent': result.get('intent'),
+            'db_result': result.get('db_result'),
+            'prompt_tokens': result.get('prompt_tokens'),
+            'error': result.get('error')
+        },
+        user_created_at=received_at,
+        user_id=result.get('user_id')
     )
+    store_turn_memory(result, user_msg.session_id, user_msg.id, ai_msg.id)
+    if result.get('summary_due'):
+        conversation_summarizer.schedule(user_msg.session_id)
+    return user_msg, ai_msg
+
+def _sse(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.route('/api/chat', methods=['POST'])
+def chat_api():
+    """Chat endpoint: user sends message, LLM responds, all persisted"""
+    data = request.get_json()
+    session_id, user_message, received_at, error_response = _start_chat_turn(data)
+    if error_response:
+        return error_response
     
     # Run LangGraph workflow
-    result = run_langgraph_chat(user_id, session_id, user_message)
-    ai_response = result.get('ai_response')
-    error = result.get('error')
-    db_result = result.get('db_result')
-    intent = result.get('intent')
-    
-    # Persist AI message
-    ai_msg = ChatMessageService.add_message(
-        session_id=session_id,
-        message_type='ai',
-        content=ai_response,
-        metadata={
-            'intent': intent,
-            'db_result': db_result,
-            'error': error
-        }
-    )
+    result = run_langgraph_chat(data.get('user_id'), session_id, user_message)
+    
+    # Persist both messages
+    user_msg, ai_msg = _save_turn(session_id, user_message, received_at, result)
     
     return jsonify({
-        'session_id': session_id,
+        'session_id': user_msg.session_id,
         'user_message': user_message,
-        'ai_response': ai_response,
-        'intent': intent,
-        'db_result': db_result,
-        'error': error,
+        'ai_response': result.get('ai_response'),
+        'intent': result.get('intent'),
+        'db_result': result.get('db_result'),
+        'prompt_tokens': result.get('prompt_tokens'),
+        'error': result.get('error'),
         'user_message_id': user_msg.id,
         'ai_message_id': ai_msg.id
     })
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream_api():
+    """Streaming chat endpoint: same as /api/chat but replies with Server-Sent Events.
+
+    Events: 'session', 'intent', 'db_result', one 'token' per completion chunk,
+    then 'done' (with the session and both message IDs) once the turn has been
+    persisted. A new session is only created when the turn is saved, so its
+    'session' event carries a null id. If the client disconnects
+    or the workflow fails mid-stream, the user message and the partial reply
+    are still saved.
+    """
+    data = request.get_json()
+    session_id, user_message, received_at, error_response = _start_chat_turn(data)
+    if error_response:
+        return error_response
+    user_id = data.get('user_id')
+    
+    def generate():
+        result, events, tokens = None, {}, []
+        try:
+            # session_id is null for a new session; its id comes with 'done'
+            yield _sse('session', {'session_id': session_id})
+            for event, payload in stream_langgraph_chat(user_id, session_id, user_message):
+                if event == 'result':
+                    result = payload
+                    continue
+                if event == 'token':
+                    tokens.append(payload)
+                else:
+                    events[event] = payload
+                yield _sse(event, payload)
+        finally:
+            if result is None:
+                # Client gone (GeneratorExit) or the workflow raised: keep what we have
+                try:
+                    _save_turn(session_id, user_message, received_at,
+                               interrupted_chat_result(user_id, user_message, events, tokens))
+                except Exception as e:
+                    print(f"Error saving interrupted chat turn: {e}")
+        
+        # Persist the turn once generation has finished
+        user_msg, ai_msg = _save_turn(session_id, user_message, received_at, result)
+        yield _sse('done', {
+            'session_id': user_msg.session_id,
+            'ai_response': result.get('ai_response'),
+            'prompt_tokens': result.get('prompt_tokens'),
+            'error': result.get('error'),
+            'user_message_id': user_msg.id,
+            'ai_message_id': ai_msg.id
+        })
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 # Add these new endpoints after the existing ones
 
 @app.route('/api/memory/stats/<int:user_id>', methods=['GET'])
@@ -441,14 +533,49 @@ def get_memory_stats(user_id):
 
 @app.route('/api/memory/cleanup', methods=['POST'])
 def cleanup_memory():
-    """Clean up expired memory entries"""
+    """Expire memory entries older than `days` (default MEMORY_RETENTION_DAYS).
+
+    Runs in the background and returns 202 with the run's status (poll
+    /api/memory/cleanup/status); {"wait": true} runs it within the request.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        days = data.get('days')
+        if days is not None and (not isinstance(days, int) or isinstance(days, bool) or days < 1):
+            return jsonify({'error': 'days must be a whole number of at least 1'}), 400
+        if data.get('wait'):
+            deleted_count = memory_retention_job.run_once(days)
+            if deleted_count is None:
+                return jsonify({'error': 'Memory cleanup already in progress',
+                                'status': memory_retention_job.status()}), 409
+            return jsonify({
+                'message': f'Cleaned up {deleted_count} expired memory entries',
+                'deleted_count': deleted_count,
+                'status': memory_retention_job.status()
+            })
+        started = memory_retention_job.trigger(days)
+        return jsonify({
+            'message': 'Memory cleanup started' if started else 'Memory cleanup already in progress',
+            'started': started,
+            'status': memory_retention_job.status()
+        }), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/memory/cleanup/status', methods=['GET'])
+def get_memory_cleanup_status():
+    """Progress of the running (or last) memory expiry run"""
+    return jsonify(memory_retention_job.status())
+
+@app.route('/api/memory/flush', methods=['POST'])
+def flush_memory():
+    """Wait until all queued memory writes have been stored"""
     try:
-        data = request.get_json() or {}
-        days = data.get('days', 30)
-        deleted_count = memory_service.cleanup_expired_memory(days)
+        flushed = memory_write_queue.flush()
         return jsonify({
-            'message': f'Cleaned up {deleted_count} expired memory entries',
-            'deleted_count': deleted_count
+            'flushed': flushed,
+            'written_count': memory_write_queue.written_count,
+            'failed_count': memory_write_queue.failed_count
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -476,6 +603,44 @@ def search_memory(user_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# ============================================================================
+# RESPONSE CACHE ENDPOINTS
+# ============================================================================
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Hit/miss statistics for the catalog response cache"""
+    return jsonify(response_cache.stats())
+
+@app.route('/api/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    """Drop all cached catalog responses (the loader does this automatically)"""
+    response_cache.clear()
+    return jsonify({'message': 'Response cache cleared'})
+
+@app.route('/api/chat/cache/stats', methods=['GET'])
+def get_chat_cache_stats():
+    """Hit/miss statistics for the chat reply cache"""
+    return jsonify(chat_response_cache.stats())
+
+@app.route('/api/chat/cache/invalidate', methods=['POST'])
+def invalidate_chat_cache():
+    """Drop cached chat replies about one order or product ({"order_id": ...} / {"product_id": ...}), or all of them"""
+    data = request.get_json(silent=True) or {}
+    if data.get('order_id'):
+        removed = chat_response_cache.invalidate('order', int(data['order_id']))
+    elif data.get('product_id'):
+        removed = chat_response_cache.invalidate('product', int(data['product_id']))
+    else:
+        removed = chat_response_cache.stats()['entries']
+        chat_response_cache.clear()
+    return jsonify({'message': 'Chat cache invalidated', 'removed': removed})
+
+@app.route('/api/chat/summaries/stats', methods=['GET'])
+def get_summary_stats():
+    """Background conversation-summary worker statistics"""
+    return jsonify(conversation_summarizer.stats())
+
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
@@ -0,0 +1,172 @@
+"""ASGI entry point: async /api/chat and /api/chat/stream, with the Flask app mounted for every other route.
+
+Each chat turn runs as a coroutine (LangGraph ainvoke/astream, aiosqlite,
+AsyncGroq), so one process holds hundreds of in-flight chats without a
+thread per request. Run with:
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+"""
+import os
+import json
+from datetime import datetime
+from contextlib import asynccontextmanager
+import anyio
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from async_services import AsyncConversationService, AsyncChatMessageService, dispose_async_engine
+from lang_engine import (arun_langgraph_chat, astream_langgraph_chat, astore_turn_memory, interrupted_chat_result,
+                         warmup_async_langgraph_workflow)
+from llm_client import set_async_groq_client
+from conversation_summary import conversation_summarizer
+from memory_service import memory_retention_job
+
+# Serve the rest of the API (products, orders, conversations, ...) from the same
+# port by mounting the Flask app; its views run on the ASGI server's thread pool
+ASGI_MOUNT_FLASK = os.getenv('ASGI_MOUNT_FLASK', 'true').lower() == 'true'
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Summaries are written by a background thread through the Flask app's database setup
+    from app import app as flask_app
+    conversation_summarizer.init_app(flask_app)
+    if memory_retention_job.interval:
+        memory_retention_job.start()
+    flask_app.logger.info("Async LangGraph workflow compiled in %.1f ms", warmup_async_langgraph_workflow() * 1000)
+    yield
+    client = set_async_groq_client(None)
+    if client is not None:
+        await client.close()
+    await dispose_async_engine()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'],
+                   expose_headers=['X-Next-After-Id', 'X-Prev-Before-Id'])
+
+def _error(message, status_code):
+    return JSONResponse({'error': message}, status_code=status_code)
+
+async def _start_chat_turn(request: Request):
+    """Async counterpart of app._start_chat_turn.
+
+    Returns (data, session_id, user_message, received_at, error_response).
+    """
+    received_at = datetime.utcnow()
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return None, None, None, None, _error('Request body must be a JSON object', 400)
+
+    user_id = data.get('user_id')
+    user_message = data.get('message')
+    session_id = data.get('session_id')
+
+    if not user_id or not user_message:
+        return None, None, None, None, _error('user_id and message are required', 400)
+
+    # A new session is created together with the turn's messages by _save_turn
+    if not session_id:
+        session_id = None
+    elif not await AsyncConversationService.get_session(session_id):
+        return None, None, None, None, _error('Session not found', 404)
+    return data, session_id, user_message, received_at, None
+
+async def _save_turn(session_id, user_message, received_at, result):
+    """Persist the user message and the AI reply (and, for session_id None, the new
+    session) in one transaction and store them in semantic memory; returns (user_msg, ai_msg)"""
+    user_msg, ai_msg = await AsyncChatMessageService.add_turn(
+        session_id=session_id,
+        user_content=user_message,
+        ai_content=result.get('ai_response'),
+        ai_metadata={
+            'intent': result.get('intent'),
+            'db_result': result.get('db_result'),
+            'prompt_tokens': result.get('prompt_tokens'),
+            'error': result.get('error')
+        },
+        user_created_at=received_at,
+        user_id=result.get('user_id')
+    )
+    await astore_turn_memory(result, user_msg.session_id, user_msg.id, ai_msg.id)
+    if result.get('summary_due'):
+        conversation_summarizer.schedule(user_msg.session_id)
+    return user_msg, ai_msg
+
+def _sse(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.post('/api/chat')
+async def chat_api(request: Request):
+    """Async /api/chat: same request and response bodies as the Flask endpoint"""
+    data, session_id, user_message, received_at, error_response = await _start_chat_turn(request)
+    if error_response:
+        return error_response
+
+    result = await arun_langgraph_chat(data.get('user_id'), session_id, user_message)
+    user_msg, ai_msg = await _save_turn(session_id, user_message, received_at, result)
+
+    return JSONResponse({
+        'session_id': user_msg.session_id,
+        'user_message': user_message,
+        'ai_response': result.get('ai_response'),
+        'intent': result.get('intent'),
+        'db_result': result.get('db_result'),
+        'prompt_tokens': result.get('prompt_tokens'),
+        'error': result.get('error'),
+        'user_message_id': user_msg.id,
+        'ai_message_id': ai_msg.id
+    })
+
+@app.post('/api/chat/stream')
+async def chat_stream_api(request: Request):
+    """Async /api/chat/stream: same Server-Sent Events as the Flask endpoint"""
+    data, session_id, user_message, received_at, error_response = await _start_chat_turn(request)
+    if error_response:
+        return error_response
+    user_id = data.get('user_id')
+
+    async def generate():
+        result, events, tokens = None, {}, []
+        try:
+            # session_id is null for a new session; its id comes with 'done'
+            yield _sse('session', {'session_id': session_id})
+            async for event, payload in astream_langgraph_chat(user_id, session_id, user_message):
+                if event == 'result':
+                    result = payload
+                    continue
+                if event == 'token':
+                    tokens.append(payload)
+                else:
+                    events[event] = payload
+                yield _sse(event, payload)
+        finally:
+            if result is None:
+                # Client gone or the workflow raised: keep what we have. Shielded, since
+                # a disconnect cancels the response task
+                with anyio.CancelScope(shield=True):
+                    try:
+                        await _save_turn(session_id, user_message, received_at,
+                                         interrupted_chat_result(user_id, user_message, events, tokens))
+                    except Exception as e:
+                        print(f"Error saving interrupted chat turn: {e}")
+
+        # Persist the turn once generation has finished
+        user_msg, ai_msg = await _save_turn(session_id, user_message, received_at, result)
+        yield _sse('done', {
+            'session_id': user_msg.session_id,
+            'ai_response': result.get('ai_response'),
+            'prompt_tokens': result.get('prompt_tokens'),
+            'error': result.get('error'),
+            'user_message_id': user_msg.id,
+            'ai_message_id': ai_msg.id
+        })
+
+    return StreamingResponse(generate(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+if ASGI_MOUNT_FLASK:
+    from starlette.middleware.wsgi import WSGIMiddleware
+    from app import app as flask_app
+    app.mount('/', WSGIMiddleware(flask_app))
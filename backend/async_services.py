@@ -0,0 +1,225 @@
+import os
+import json
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from models import Order, OrderItem, Product, ConversationSession, ChatMessage
+from sqlite_tuning import SQLITE_TUNING_ENABLED, configure_sqlite_engine
+
+# Async (aiosqlite) access to the same database file the Flask app uses, which
+# Flask-SQLAlchemy keeps in the instance folder next to app.py
+DEFAULT_DATABASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'ecommerce.db')
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL', f'sqlite+aiosqlite:///{DEFAULT_DATABASE_PATH}')
+# aiosqlite runs every connection on its own thread, so a fixed pool (rather than
+# aiosqlite's default of a new connection per session) bounds the threads used
+# for database access, however many chats are in flight
+ASYNC_DB_POOL_SIZE = int(os.getenv('ASYNC_DB_POOL_SIZE', '10'))
+ASYNC_DB_MAX_OVERFLOW = int(os.getenv('ASYNC_DB_MAX_OVERFLOW', '0'))
+
+def create_async_db_engine(url: str = None) -> AsyncEngine:
+    """Create an async engine with the same per-connection SQLite pragmas as the Flask engine"""
+    url = url or ASYNC_DATABASE_URL
+    options = {}
+    if ':memory:' not in url and url != 'sqlite+aiosqlite://':
+        options = {'poolclass': AsyncAdaptedQueuePool, 'pool_size': ASYNC_DB_POOL_SIZE,
+                   'max_overflow': ASYNC_DB_MAX_OVERFLOW}
+    engine = create_async_engine(url, **options)
+    if SQLITE_TUNING_ENABLED:
+        configure_sqlite_engine(engine.sync_engine)
+    return engine
+
+# Process-wide engine and session factory, created on first use so importing this
+# module does not require aiosqlite
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory = None
+_engine_lock = threading.Lock()
+
+def get_async_engine() -> AsyncEngine:
+    """Return the shared async engine, creating it on first use"""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                _async_engine = create_async_db_engine()
+                _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _async_engine
+
+def set_async_engine(engine: Optional[AsyncEngine]) -> Optional[AsyncEngine]:
+    """Replace the shared engine (e.g. with one on a test database); returns the previous one"""
+    global _async_engine, _async_session_factory
+    with _engine_lock:
+        previous, _async_engine = _async_engine, engine
+        _async_session_factory = async_sessionmaker(engine, expire_on_commit=False) if engine else None
+    return previous
+
+async def dispose_async_engine():
+    """Close the shared engine's pooled connections (on ASGI shutdown)"""
+    engine = set_async_engine(None)
+    if engine is not None:
+        await engine.dispose()
+
+def async_session():
+    """New AsyncSession on the shared engine; use as `async with async_session() as session`.
+
+    Sessions should be short-lived: open one per lookup or write, never across an
+    LLM call, so a pooled connection is only held while SQL is running.
+    """
+    get_async_engine()
+    return _async_session_factory()
+
+def _touch_session(session_id: int, added: int, now: Optional[datetime] = None):
+    """UPDATE bumping a session's timestamp and message count (as SQL, so concurrent writers don't lose counts)"""
+    return (update(ConversationSession)
+            .where(ConversationSession.id == session_id)
+            .values(updated_at=now or datetime.utcnow(), message_count=ConversationSession.message_count + added))
+
+class AsyncConversationService:
+    @staticmethod
+    async def create_session(user_id: int, title: Optional[str] = None) -> ConversationSession:
+        """Create a new conversation session for a user"""
+        async with async_session() as session:
+            conversation = ConversationSession(
+                user_id=user_id,
+                title=title or f"Chat Session - {datetime.utcnow().strftime('%Y-%m-%d %H:%M')}",
+                is_active=True
+            )
+            session.add(conversation)
+            await session.commit()
+            return conversation
+
+    @staticmethod
+    async def get_session(session_id: int) -> Optional[ConversationSession]:
+        """Get a conversation session by ID"""
+        async with async_session() as session:
+            return await session.get(ConversationSession, session_id)
+
+    @staticmethod
+    async def get_summary_state(session_id: int):
+        """Row of (summary, summary_message_id, message_count, summarized_count) for a session, or None"""
+        async with async_session() as session:
+            result = await session.execute(
+                select(ConversationSession.summary, ConversationSession.summary_message_id,
+                       ConversationSession.message_count, ConversationSession.summarized_count)
+                .where(ConversationSession.id == session_id)
+            )
+            return result.first()
+
+class AsyncChatMessageService:
+    @staticmethod
+    async def add_message(session_id: int, message_type: str, content: str,
+                          metadata: Optional[Dict[str, Any]] = None) -> ChatMessage:
+        """Add a new message to a conversation session"""
+        async with async_session() as session:
+            message = ChatMessage(
+                session_id=session_id,
+                message_type=message_type,
+                content=content,
+                message_metadata=json.dumps(metadata) if metadata else None
+            )
+            session.add(message)
+            await session.execute(_touch_session(session_id, 1))
+            await session.commit()
+            return message
+
+    @staticmethod
+    async def add_turn(session_id: Optional[int], user_content: str, ai_content: str,
+                       ai_metadata: Optional[Dict[str, Any]] = None,
+                       user_created_at: Optional[datetime] = None,
+                       user_id: Optional[int] = None) -> Tuple[ChatMessage, ChatMessage]:
+        """Async ChatMessageService.add_turn: both messages and the session touch (or, with
+        session_id None, a new session for user_id) in one transaction"""
+        now = datetime.utcnow()
+        async with async_session() as session:
+            if session_id is None:
+                conversation = ConversationSession(
+                    user_id=user_id,
+                    title=f"Chat Session - {now.strftime('%Y-%m-%d %H:%M')}",
+                    is_active=True,
+                    created_at=user_created_at or now,
+                    updated_at=now,
+                    message_count=2
+                )
+                session.add(conversation)
+                await session.flush()
+                session_id = conversation.id
+            else:
+                await session.execute(_touch_session(session_id, 2, now))
+            user_message = ChatMessage(
+                session_id=session_id,
+                message_type='user',
+                content=user_content,
+                created_at=user_created_at or now
+            )
+            ai_message = ChatMessage(
+                session_id=session_id,
+                message_type='ai',
+                content=ai_content,
+                message_metadata=json.dumps(ai_metadata) if ai_metadata else None,
+                created_at=now
+            )
+            session.add_all([user_message, ai_message])
+            await session.commit()
+            return user_message, ai_message
+
+    @staticmethod
+    async def get_conversation_context(session_id: int, recent_messages: int = 10) -> List[Dict[str, Any]]:
+        """Last recent_messages messages of a session, oldest first (as ChatMessageService.get_context_window)"""
+        async with async_session() as session:
+            result = await session.execute(
+                select(ChatMessage.message_type, ChatMessage.content, ChatMessage.created_at)
+                .where(ChatMessage.session_id == session_id)
+                .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+                .limit(recent_messages)
+            )
+            return [{
+                'role': row.message_type,
+                'content': row.content,
+                'timestamp': row.created_at.isoformat()
+            } for row in reversed(result.all())]
+
+class AsyncEcommerceDataService:
+    """Async versions of the EcommerceDataService lookups used by the chat workflow"""
+
+    @staticmethod
+    async def get_product_info(product_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get detailed product information"""
+        async with async_session() as session:
+            result = await session.execute(
+                select(Product).where(Product.id.in_(sorted(set(product_ids)))).order_by(Product.id))
+            return [{
+                'id': product.id,
+                'name': product.name,
+                'brand': product.brand,
+                'category': product.category,
+                'department': product.department,
+                'retail_price': product.retail_price,
+                'sku': product.sku
+            } for product in result.scalars()]
+
+    @staticmethod
+    async def get_order_status(order_id: int) -> Optional[Dict[str, Any]]:
+        """Get detailed order status information"""
+        async with async_session() as session:
+            order = await session.get(Order, order_id)
+            if not order:
+                return None
+
+            items = (await session.execute(select(OrderItem).where(OrderItem.order_id == order_id))).scalars().all()
+            return {
+                'order_id': order.order_id,
+                'status': order.status,
+                'created_at': order.created_at.isoformat() if order.created_at else None,
+                'shipped_at': order.shipped_at.isoformat() if order.shipped_at else None,
+                'delivered_at': order.delivered_at.isoformat() if order.delivered_at else None,
+                'returned_at': order.returned_at.isoformat() if order.returned_at else None,
+                'num_items': order.num_of_item,
+                'items': [{
+                    'id': item.id,
+                    'product_id': item.product_id,
+                    'status': item.status,
+                    'sale_price': item.sale_price
+                } for item in items]
+            }
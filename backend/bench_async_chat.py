@@ -0,0 +1,174 @@
+"""Benchmark many concurrent chat turns: threaded sync path vs. the async (ASGI) path.
+
+Every turn persists the user message, runs the chat workflow (memory search,
+DB lookup, streamed LLM completion) and persists the reply. The LLM is a local
+stub server in a child process with a fixed latency, so turns spend most of
+their time waiting on it, as they do against the real API.
+
+- sync: one thread per in-flight turn (what a threaded WSGI server does),
+  running run_langgraph_chat with the Flask-SQLAlchemy services and Groq
+- async: one coroutine per turn on a single event loop, running
+  arun_langgraph_chat with the aiosqlite services and AsyncGroq
+
+Reports turns/s, latency, the peak number of threads in this process and
+turns that failed on SQLite lock timeouts.
+
+Usage:
+    python bench_async_chat.py [--concurrency 200] [--turns 400] [--latency 1.0]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.exc import OperationalError
+from models import db, User, Order, Product, ConversationSession
+from services import ChatMessageService
+from sqlite_tuning import configure_sqlite_engine
+from llm_client import create_groq_client, set_groq_client, create_async_groq_client, set_async_groq_client
+from async_services import AsyncChatMessageService, create_async_db_engine, set_async_engine, dispose_async_engine
+from lang_engine import run_langgraph_chat, arun_langgraph_chat
+from bench_utils import StubGroqServer, create_bench_app, median_ms
+
+MESSAGES = ["what is the status of order {n}", "tell me about product {n}", "hi, any deals today?"]
+
+def _serve_stub(latency: float, conn):
+    """Child process: run the stub LLM server and report its URL"""
+    with StubGroqServer(reply='Your order is on its way and should arrive soon.', latency=latency) as server:
+        conn.send(server.base_url)
+        conn.recv()  # block until the parent is done
+
+class ThreadSampler:
+    """Track the peak thread count of this process while active"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count() - 1)  # not counting the sampler
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+def seed(users: int):
+    db.session.execute(User.__table__.insert(), [
+        {'id': i, 'first_name': f'User{i}', 'last_name': 'Bench', 'email': f'user{i}@example.com'}
+        for i in range(1, users + 1)
+    ])
+    db.session.execute(Product.__table__.insert(), [
+        {'id': i, 'name': f'Product {i}', 'brand': 'Bench', 'retail_price': 10.0 + i} for i in range(1, 101)
+    ])
+    db.session.execute(Order.__table__.insert(), [
+        {'order_id': i, 'user_id': (i % users) + 1, 'status': 'Shipped', 'num_of_item': 1} for i in range(1, 101)
+    ])
+    db.session.execute(ConversationSession.__table__.insert(), [
+        {'id': i, 'user_id': i, 'title': 'Bench chat', 'is_active': True} for i in range(1, users + 1)
+    ])
+    db.session.commit()
+
+def turn_args(turns: int, users: int):
+    return [((n % users) + 1, MESSAGES[n % len(MESSAGES)].format(n=(n % 100) + 1)) for n in range(turns)]
+
+def run_sync(app, turns, concurrency):
+    def turn(user_id, message):
+        start = time.perf_counter()
+        with app.app_context():
+            try:
+                ChatMessageService.add_message(user_id, 'user', message)
+                result = run_langgraph_chat(user_id, user_id, message)
+                ChatMessageService.add_message(user_id, 'ai', result.get('ai_response'))
+            except OperationalError:
+                return None
+            finally:
+                db.session.remove()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda args: turn(*args), turns))
+
+async def run_async(turns, concurrency):
+    limit = asyncio.Semaphore(concurrency)
+
+    async def turn(user_id, message):
+        async with limit:
+            start = time.perf_counter()
+            try:
+                await AsyncChatMessageService.add_message(user_id, 'user', message)
+                result = await arun_langgraph_chat(user_id, user_id, message)
+                await AsyncChatMessageService.add_message(user_id, 'ai', result.get('ai_response'))
+            except OperationalError:
+                return None
+            return time.perf_counter() - start
+
+    return await asyncio.gather(*(turn(*args) for args in turns))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', type=int, default=200, help='chat turns in flight at once')
+    parser.add_argument('--turns', type=int, default=400)
+    parser.add_argument('--latency', type=float, default=1.0, help='simulated LLM time per completion (s)')
+    parser.add_argument('--users', type=int, default=200)
+    args = parser.parse_args()
+
+    parent_conn, child_conn = multiprocessing.Pipe()
+    stub = multiprocessing.Process(target=_serve_stub, args=(args.latency, child_conn), daemon=True)
+    stub.start()
+    base_url = parent_conn.recv()
+    turns = turn_args(args.turns, args.users)
+
+    print(f"{args.turns} turns, {args.concurrency} in flight, {args.latency:.2f}s LLM latency")
+    print(f"{'mode':<6} | {'seconds':>7} | {'turns/s':>7} | {'p50':>8} | {'max':>8} | {'peak threads':>12} | {'failed':>6}")
+    print('-' * 75)
+    try:
+        for mode in ('sync', 'async'):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'bench.db')
+                app = create_bench_app(f"sqlite:///{path}")
+                with app.app_context():
+                    configure_sqlite_engine(db.engine)
+                    db.create_all()
+                    seed(args.users)
+
+                with ThreadSampler() as sampler:
+                    start = time.perf_counter()
+                    if mode == 'sync':
+                        set_groq_client(create_groq_client(api_key='stub', base_url=base_url, max_retries=0,
+                                                           max_connections=args.concurrency))
+                        samples = run_sync(app, turns, args.concurrency)
+                    else:
+                        async def run():
+                            set_async_engine(create_async_db_engine(f"sqlite+aiosqlite:///{path}"))
+                            set_async_groq_client(create_async_groq_client(api_key='stub', base_url=base_url,
+                                                                           max_retries=0))
+                            try:
+                                return await run_async(turns, args.concurrency)
+                            finally:
+                                await set_async_groq_client(None).close()
+                                await dispose_async_engine()
+                        samples = asyncio.run(run())
+                    elapsed = time.perf_counter() - start
+
+                completed = [sample for sample in samples if sample is not None]
+                print(f"{mode:<6} | {elapsed:>7.2f} | {len(completed) / elapsed:>7.1f} | {median_ms(completed):>6.0f}ms | "
+                      f"{max(completed) * 1000:>6.0f}ms | {sampler.peak:>12} | {len(samples) - len(completed):>6}")
+                with app.app_context():
+                    db.engine.dispose()
+    finally:
+        parent_conn.send('stop')
+        stub.join()
+
+if __name__ == '__main__':
+    main()
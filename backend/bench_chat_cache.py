@@ -0,0 +1,71 @@
+"""Benchmark repeated chat questions with and without the chat reply cache.
+
+Sends a stream of order/product questions drawn from a small pool (so many
+repeat, with varying punctuation and case) through run_langgraph_chat against
+a stub LLM with a fixed latency, and counts LLM calls and per-turn latency.
+
+Usage:
+    python bench_chat_cache.py [--turns 300] [--distinct 30] [--latency 0.5]
+"""
+import argparse
+import random
+import time
+from models import db, User, Order, Product
+from llm_client import create_groq_client, set_groq_client
+from lang_engine import run_langgraph_chat
+from chat_cache import chat_response_cache
+import lang_engine
+from bench_utils import StubGroqServer, create_bench_app, median_ms
+
+TEMPLATES = ["where is my order {n}", "What's the status of order #{n}?", "track order {n} please",
+             "what is the price of product {n}", "Tell me about product {n}!"]
+
+def seed():
+    db.session.execute(User.__table__.insert(), [{'id': 1, 'first_name': 'Bench', 'last_name': 'User'}])
+    db.session.execute(Product.__table__.insert(), [
+        {'id': i, 'name': f'Product {i}', 'brand': 'Bench', 'retail_price': 10.0 + i} for i in range(1, 101)
+    ])
+    db.session.execute(Order.__table__.insert(), [
+        {'order_id': i, 'user_id': 1, 'status': 'Shipped', 'num_of_item': 1} for i in range(1, 101)
+    ])
+    db.session.commit()
+
+def make_messages(turns: int, distinct: int, seed_value: int = 5):
+    rng = random.Random(seed_value)
+    pool = [rng.choice(TEMPLATES).format(n=rng.randint(1, 100)) for _ in range(distinct)]
+    messages = []
+    for _ in range(turns):
+        message = rng.choice(pool)
+        messages.append(message.upper() if rng.random() < 0.1 else message)
+    return messages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--turns', type=int, default=300)
+    parser.add_argument('--distinct', type=int, default=30, help='distinct questions in the pool')
+    parser.add_argument('--latency', type=float, default=0.5, help='simulated LLM time per completion (s)')
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    messages = make_messages(args.turns, args.distinct)
+    with app.app_context():
+        db.create_all()
+        seed()
+        print(f"{'cache':<5} | {'LLM calls':>9} | {'p50':>8} | {'mean':>8} | {'total s':>7}")
+        print('-' * 50)
+        for enabled in (False, True):
+            lang_engine.CHAT_CACHE_ENABLED = enabled
+            chat_response_cache.clear()
+            with StubGroqServer(latency=args.latency) as server:
+                set_groq_client(create_groq_client(api_key='stub', base_url=server.base_url, max_retries=0))
+                samples = []
+                for message in messages:
+                    start = time.perf_counter()
+                    run_langgraph_chat(1, 1, message)
+                    samples.append(time.perf_counter() - start)
+                print(f"{'on' if enabled else 'off':<5} | {server.request_count:>9} | {median_ms(samples):>6.1f}ms | "
+                      f"{sum(samples) / len(samples) * 1000:>6.1f}ms | {sum(samples):>7.1f}")
+        print(f"cache stats: {chat_response_cache.stats()}")
+
+if __name__ == '__main__':
+    main()
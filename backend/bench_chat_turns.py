@@ -0,0 +1,111 @@
+"""Benchmark chat-turn persistence throughput on a SQLite file.
+
+Compares the previous per-turn write pattern (two add_message calls, each
+re-reading the session and committing) with ChatMessageService.add_turn,
+which writes both messages and the session update in one transaction. Runs
+with SQLite's defaults (rollback journal, synchronous=FULL: one fsync per
+commit) and with the tuned pragmas from sqlite_tuning.py.
+
+Usage:
+    python bench_chat_turns.py [--seconds 5] [--writers 1 4]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+from sqlalchemy.exc import OperationalError
+from models import db, User, ConversationSession, ChatMessage
+from services import ChatMessageService
+from sqlite_tuning import configure_sqlite_engine
+from bench_utils import create_bench_app, median_ms
+
+METADATA = {'intent': 'order_status', 'db_result': {'order_id': 42, 'status': 'Shipped'}, 'error': None}
+
+def legacy_add_message(session_id, message_type, content, metadata=None):
+    """add_message as it was: session re-read and commit per message"""
+    message = ChatMessage(session_id=session_id, message_type=message_type, content=content,
+                          message_metadata=json.dumps(metadata) if metadata else None)
+    db.session.add(message)
+    session = ConversationSession.query.get(session_id)
+    if session:
+        session.updated_at = datetime.utcnow()
+        session.message_count = ConversationSession.message_count + 1
+    db.session.commit()
+    return message
+
+def per_message_turn(session_id):
+    legacy_add_message(session_id, 'user', 'where is my order 42?')
+    legacy_add_message(session_id, 'ai', 'Your order #42 has shipped.', METADATA)
+
+def unit_of_work_turn(session_id):
+    ChatMessageService.add_turn(session_id, 'where is my order 42?', 'Your order #42 has shipped.', METADATA)
+
+def seed(sessions: int):
+    db.session.execute(User.__table__.insert(), [{'id': 1, 'first_name': 'Bench', 'last_name': 'User'}])
+    db.session.execute(ConversationSession.__table__.insert(), [
+        {'id': i, 'user_id': 1, 'title': 'Bench chat', 'is_active': True} for i in range(1, sessions + 1)
+    ])
+    db.session.commit()
+
+def run(app, turn, writers, seconds, sessions):
+    stop = threading.Event()
+    samples = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def writer(seed_value):
+        rng = random.Random(seed_value)
+        with app.app_context():
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    turn(rng.randint(1, sessions))
+                except OperationalError:
+                    db.session.rollback()
+                    with lock:
+                        errors[0] += 1
+                    continue
+                sample = time.perf_counter() - start
+                with lock:
+                    samples.append(sample)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return samples, errors[0]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--writers', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--sessions', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'pragmas':<8} | {'writers':>7} | {'pattern':<13} | {'turns/s':>8} | {'p50':>8} | {'errors':>6}")
+    print('-' * 66)
+    for mode in ('default', 'tuned'):
+        for writers in args.writers:
+            for name, turn in (('per-message', per_message_turn), ('add_turn', unit_of_work_turn)):
+                with tempfile.TemporaryDirectory() as tmp:
+                    app = create_bench_app(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+                    with app.app_context():
+                        if mode == 'tuned':
+                            configure_sqlite_engine(db.engine)
+                        db.create_all()
+                        seed(args.sessions)
+                    samples, errors = run(app, turn, writers, args.seconds, args.sessions)
+                    print(f"{mode:<8} | {writers:>7} | {name:<13} | {len(samples) / args.seconds:>8.0f} | "
+                          f"{median_ms(samples):>6.2f}ms | {errors:>6}")
+                    with app.app_context():
+                        db.engine.dispose()
+
+if __name__ == '__main__':
+    main()
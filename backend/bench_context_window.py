@@ -0,0 +1,81 @@
+"""Benchmark loading a chat turn's conversation context: full message rows vs. the context-window query.
+
+The previous get_conversation_context loaded the last N ChatMessage objects
+newest first and decoded every message's metadata JSON (the AI messages carry
+the intent and db_result of their turn). ChatMessageService.get_context_window
+selects only role, content and timestamp and returns them oldest first.
+
+Usage:
+    python bench_context_window.py [--messages 2000] [--window 10] [--repeat 2000]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from models import db, User, ConversationSession, ChatMessage
+from services import ChatMessageService
+from sqlite_tuning import configure_sqlite_engine
+from bench_utils import create_bench_app
+
+METADATA = json.dumps({'intent': 'order_status', 'error': None, 'prompt_tokens': 180, 'db_result': {
+    'order_id': 42, 'status': 'Shipped', 'created_at': '2024-01-01T00:00:00', 'num_items': 8,
+    'items': [{'id': i, 'product_id': 100 + i, 'status': 'Shipped', 'sale_price': 19.99} for i in range(8)]
+}})
+
+def legacy_context(session_id, count):
+    """get_conversation_context as it was: ORM rows, newest first, metadata decoded"""
+    messages = ChatMessage.query.filter_by(session_id=session_id)\
+        .order_by(ChatMessage.created_at.desc())\
+        .limit(count)\
+        .all()
+    return [{
+        'role': msg.message_type,
+        'content': msg.content,
+        'timestamp': msg.created_at.isoformat(),
+        'metadata': json.loads(msg.message_metadata) if msg.message_metadata else {}
+    } for msg in messages]
+
+def seed(messages: int):
+    db.session.execute(User.__table__.insert(), [{'id': 1, 'first_name': 'Bench', 'last_name': 'User'}])
+    db.session.execute(ConversationSession.__table__.insert(), [
+        {'id': 1, 'user_id': 1, 'title': 'Bench chat', 'is_active': True, 'message_count': messages}
+    ])
+    start = datetime(2024, 1, 1)
+    db.session.execute(ChatMessage.__table__.insert(), [{
+        'session_id': 1,
+        'message_type': 'user' if n % 2 == 0 else 'ai',
+        'content': f"where is my order 42? ({n})" if n % 2 == 0 else f"Your order #42 has shipped and is on its way. ({n})",
+        'created_at': start + timedelta(seconds=n),
+        'message_metadata': None if n % 2 == 0 else METADATA
+    } for n in range(messages)])
+    db.session.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=2000, help='messages in the session')
+    parser.add_argument('--window', type=int, default=10, help='messages loaded per turn')
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    with app.app_context():
+        configure_sqlite_engine(db.engine)
+        db.create_all()
+        seed(args.messages)
+
+        legacy = legacy_context(1, args.window)
+        window = ChatMessageService.get_context_window(1, args.window)
+        print(f"legacy order: {legacy[0]['content']!r} ... {legacy[-1]['content']!r} (newest first)")
+        print(f"window order: {window[0]['content']!r} ... {window[-1]['content']!r} (oldest first)")
+        print(f"{'query':<16} | {'per turn':>9} | {'turns/s':>8}")
+        print('-' * 40)
+        for name, fn in (('legacy rows', legacy_context), ('context window', ChatMessageService.get_context_window)):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                fn(1, args.window)
+                db.session.remove()
+            elapsed = time.perf_counter() - start
+            print(f"{name:<16} | {elapsed / args.repeat * 1e6:>7.0f}us | {args.repeat / elapsed:>8.0f}")
+
+if __name__ == '__main__':
+    main()
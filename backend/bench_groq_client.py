@@ -0,0 +1,48 @@
+"""Benchmark per-turn LLM call latency with a shared Groq client vs. one client per call.
+
+Runs against a local stub server (no API key or network needed), so the
+difference is the cost of building a client and opening a new connection
+on every chat turn.
+
+Usage:
+    python bench_groq_client.py [--turns 200] [--latency 0.0]
+"""
+import argparse
+import time
+from llm_client import create_groq_client
+from bench_utils import StubGroqServer, median_ms
+
+MESSAGES = [{"role": "user", "content": "What is the status of order 123?"}]
+
+def run_turns(get_client, turns: int):
+    samples = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        client = get_client()
+        client.chat.completions.create(model="stub", messages=MESSAGES, max_tokens=16)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--turns', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated server time per request (s)')
+    args = parser.parse_args()
+    
+    with StubGroqServer(latency=args.latency) as server:
+        def per_call():
+            return create_groq_client(api_key='stub', base_url=server.base_url, max_retries=0)
+        
+        shared_client = per_call()
+        def shared():
+            return shared_client
+        
+        shared()  # open the pooled connection before timing
+        per_call_ms = median_ms(run_turns(per_call, args.turns))
+        shared_ms = median_ms(run_turns(shared, args.turns))
+        print(f"per-call client: {per_call_ms:.3f} ms/turn (median of {args.turns})")
+        print(f"shared client:   {shared_ms:.3f} ms/turn (median of {args.turns})")
+        print(f"stub requests served: {server.request_count}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Micro-benchmark intent classification and ID extraction over synthetic chat messages.
+
+Compares the old inline parsing (keyword scans in parse_intent_node, then a
+re.search per lookup in query_db_node and per memory in resolve_from_memory)
+with intent_parser.IntentParser, one message at a time and through parse_batch.
+
+Usage:
+    python bench_intent_parser.py [--messages 100000] [--memories 5] [--repeat 3]
+"""
+import argparse
+import random
+import re
+import time
+from intent_parser import IntentParser
+
+FILLER = ["hi", "hello", "please", "can", "you", "tell", "me", "about", "my", "the", "a", "thanks",
+          "shipping", "refund", "delivery", "size", "color", "jacket", "jeans", "when", "will", "arrive"]
+TEMPLATES = [
+    "where is my order {n}", "track order #{n} please", "what is the status of order {n}",
+    "tell me about product {n}", "is item {n} in stock", "product #{n} price",
+    "do you remember what I asked before", "last time we talked about order {n}",
+    "user {n} here, order {m} status?", "", "", "", ""
+]
+
+ORDER_ID_PATTERN = r"order[\s#]*(\d+)"
+PRODUCT_ID_PATTERN = r"product[\s#]*(\d+)"
+
+def make_messages(count: int, seed: int = 41):
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(3, 20))]
+        template = rng.choice(TEMPLATES)
+        if template:
+            words.insert(rng.randint(0, len(words)), template.format(n=rng.randint(1, 125000), m=rng.randint(1, 125000)))
+        messages.append(" ".join(words).capitalize())
+    return messages
+
+def legacy_parse(message: str, memories):
+    """The previous parse_intent_node + query_db_node + resolve_from_memory ID handling"""
+    msg = message.lower()
+    if any(word in msg for word in ["remember", "before", "last time", "previously", "earlier"]):
+        intent = "memory_recall"
+    elif "order" in msg and ("status" in msg or "track" in msg):
+        intent = "order_status"
+    elif "product" in msg or "item" in msg:
+        intent = "product_info"
+    else:
+        intent = "general"
+
+    if intent in ("order_status", "product_info"):
+        pattern = ORDER_ID_PATTERN if intent == "order_status" else PRODUCT_ID_PATTERN
+        match = re.search(pattern, message.lower())
+        if not match:
+            for memory in memories:
+                match = re.search(pattern, memory.lower())
+                if match:
+                    break
+    return intent
+
+def new_parse(parser: IntentParser, message: str, memories):
+    """parse_intent_node + query_db_node + resolve_from_memory with IntentParser"""
+    parsed = parser.parse(message)
+    intent = parsed["intent"]
+    if intent in ("order_status", "product_info"):
+        kind = "order" if intent == "order_status" else "product"
+        if kind not in parsed["entities"]:
+            for memory in memories:
+                if parser.first_id(kind, memory) is not None:
+                    break
+    return intent
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=100000)
+    parser.add_argument('--memories', type=int, default=5, help='retrieved memories scanned per message')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages)
+    memories = make_messages(args.memories, seed=7)
+    intent_parser = IntentParser()
+
+    mismatches = sum(legacy_parse(m, memories) != intent_parser.classify(m) for m in messages)
+    print(f"{args.messages} messages, {args.memories} memories each; intent mismatches vs. old parser: {mismatches}")
+
+    results = [
+        ("old inline parsing (chat path)", best_of(lambda: [legacy_parse(m, memories) for m in messages], args.repeat)),
+        ("IntentParser (chat path)", best_of(lambda: [new_parse(intent_parser, m, memories) for m in messages], args.repeat)),
+        ("old parsing, no memory scan", best_of(lambda: [legacy_parse(m, ()) for m in messages], args.repeat)),
+        ("IntentParser.classify", best_of(lambda: [intent_parser.classify(m) for m in messages], args.repeat)),
+        ("IntentParser.parse", best_of(lambda: [intent_parser.parse(m) for m in messages], args.repeat)),
+        ("IntentParser.parse_batch (all IDs)", best_of(lambda: intent_parser.parse_batch(messages), args.repeat)),
+    ]
+    print(f"{'variant':<36} | {'total ms':>9} | {'us/msg':>7} | {'msgs/s':>10}")
+    print('-' * 72)
+    for name, seconds in results:
+        print(f"{name:<36} | {seconds * 1000:>9.1f} | {seconds / args.messages * 1e6:>7.2f} | {args.messages / seconds:>10.0f}")
+
+if __name__ == '__main__':
+    main()
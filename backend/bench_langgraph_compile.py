@@ -0,0 +1,34 @@
+"""Measure the per-request cost of compiling the LangGraph workflow.
+
+Compares rebuilding the StateGraph on every call (the old behaviour of
+run_langgraph_chat) with fetching the shared compiled workflow.
+
+Usage:
+    python bench_langgraph_compile.py [--repeat 200]
+"""
+import argparse
+import time
+from lang_engine import build_langgraph_workflow, get_langgraph_workflow, warmup_langgraph_workflow
+from bench_utils import median_ms
+
+def sample(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    
+    print(f"warmup compile: {warmup_langgraph_workflow() * 1000:.2f} ms")
+    rebuild = median_ms(sample(build_langgraph_workflow, args.repeat))
+    shared = median_ms(sample(get_langgraph_workflow, args.repeat))
+    print(f"build per request: {rebuild:.3f} ms (median of {args.repeat})")
+    print(f"shared workflow:   {shared:.4f} ms (median of {args.repeat})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark memory expiry: one collection with a full get/delete vs. time-bucketed collections.
+
+The previous cleanup_expired_memory ran a metadata filter over the single
+memory collection, fetched every expired entry (documents included) and
+deleted them in one call. With time buckets, buckets that ended before the
+cutoff are dropped whole and only the bucket straddling it is trimmed, in
+pages of ids. Both layouts are seeded with the same entries spread evenly over
+--span-days; the script reports cleanup time, peak Python memory during
+cleanup and retrieval time afterwards. Bucketed retrieval is timed with the
+default MEMORY_SEARCH_DAYS window and again over the whole retention period.
+Uses hash embeddings in a temporary directory.
+
+Usage:
+    python bench_memory_retention.py [--entries 20000] [--span-days 180] [--retention-days 30]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+os.environ.setdefault("EMBEDDING_BACKEND", "hash")
+
+import chromadb
+from chromadb.config import Settings
+from embeddings import create_embedder
+from memory_service import SemanticMemoryService
+
+def legacy_cleanup(collection, days: int) -> int:
+    """cleanup_expired_memory as it was: fetch every expired entry, delete them in one call"""
+    cutoff = (datetime.utcnow() - timedelta(days=days)).timestamp()
+    old_memories = collection.get(where={"timestamp": {"$lt": cutoff}})
+    if old_memories['ids']:
+        collection.delete(ids=old_memories['ids'])
+    return len(old_memories['ids'])
+
+def make_entries(count: int, span_days: int):
+    now = datetime.utcnow()
+    step = timedelta(days=span_days) / count
+    return [{
+        "user_id": n % 50 + 1, "session_id": n % 500 + 1, "message_id": n, "message_type": "user",
+        "content": f"where is my order {n}? it was supposed to ship last week", "created_at": now - step * n
+    } for n in range(count)]
+
+def _measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def _query_us(query, repeat: int = 200) -> float:
+    start = time.perf_counter()
+    for n in range(repeat):
+        query(n % 50 + 1)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=20000, help='memories stored before cleanup')
+    parser.add_argument('--span-days', type=int, default=180, help='age of the oldest memory')
+    parser.add_argument('--retention-days', type=int, default=30)
+    parser.add_argument('--bucket-days', type=int, default=30)
+    args = parser.parse_args()
+
+    embedder = create_embedder()
+    entries = make_entries(args.entries, args.span_days)
+    legacy_path, bucketed_path = tempfile.mkdtemp(), tempfile.mkdtemp()
+    try:
+        # Legacy layout: everything in the one collection the old service used
+        client = chromadb.PersistentClient(path=legacy_path, settings=Settings(anonymized_telemetry=False))
+        legacy = client.get_or_create_collection("memory")
+        store = SemanticMemoryService(embedder, path=bucketed_path, bucket_days=args.bucket_days)
+        for i in range(0, len(entries), 1000):
+            batch = entries[i:i + 1000]
+            store.store_memory_batch(batch)
+            legacy.add(
+                ids=[f"memory_{e['user_id']}_{e['session_id']}_{e['message_id']}" for e in batch],
+                embeddings=embedder.embed([e["content"] for e in batch]),
+                documents=[e["content"] for e in batch],
+                metadatas=[store._create_memory_metadata(e["user_id"], e["session_id"], e["message_type"],
+                                                         e["created_at"]) for e in batch]
+            )
+        print(f"{args.entries} entries over {args.span_days} days, {len(store._buckets)} buckets "
+              f"of {args.bucket_days} days, retention {args.retention_days} days")
+
+        legacy_deleted, legacy_s, legacy_peak = _measure(lambda: legacy_cleanup(legacy, args.retention_days))
+        bucketed_deleted, bucketed_s, bucketed_peak = _measure(
+            lambda: store.cleanup_expired_memory(args.retention_days))
+        store.memory_expiry_days = args.retention_days
+        embed = embedder.embed_one
+        legacy_query_us = _query_us(lambda user_id: legacy.query(
+            query_embeddings=[embed("has my order shipped yet")], n_results=5, where={"user_id": user_id}))
+        bucketed_query_us = _query_us(lambda user_id: store.retrieve_relevant_memory(
+            user_id, 1, "has my order shipped yet", limit=5))
+        store.search_days = 0
+        full_window_query_us = _query_us(lambda user_id: store.retrieve_relevant_memory(
+            user_id, 1, "has my order shipped yet", limit=5))
+
+        print(f"{'layout':<10} | {'deleted':>8} | {'cleanup':>9} | {'peak memory':>11} | {'retrieval':>9}")
+        print('-' * 60)
+        print(f"{'legacy':<10} | {legacy_deleted:>8} | {legacy_s * 1000:>7.0f}ms | "
+              f"{legacy_peak / 1e6:>9.1f}MB | {legacy_query_us:>7.0f}us")
+        print(f"{'bucketed':<10} | {bucketed_deleted:>8} | {bucketed_s * 1000:>7.0f}ms | "
+              f"{bucketed_peak / 1e6:>9.1f}MB | {bucketed_query_us:>7.0f}us")
+        print(f"bucketed retrieval over all {args.retention_days} retained days: {full_window_query_us:.0f}us")
+    finally:
+        shutil.rmtree(legacy_path, ignore_errors=True)
+        shutil.rmtree(bucketed_path, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
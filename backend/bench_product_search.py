@@ -0,0 +1,78 @@
+"""Benchmark product search: FTS5 (BM25, prefix) vs. the LIKE '%q%' scan.
+
+Builds a temporary SQLite database per catalog size with synthetic product
+names, brands and categories, then times ProductService.search_products
+against ProductService.search_products_like, both with a page limit and
+without one (the old endpoint returned every match).
+
+Usage:
+    python bench_product_search.py [--sizes 30000 300000] [--repeat 20] [--limit 50]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from models import db, Product
+from services import ProductService
+from search_index import ensure_product_search_index
+from bench_utils import create_bench_app, median_ms
+
+WORDS = ["cotton", "denim", "leather", "wool", "silk", "slim", "relaxed", "classic", "vintage",
+         "sport", "jacket", "shirt", "jeans", "dress", "sweater", "shorts", "socks", "hoodie",
+         "coat", "skirt", "blazer", "polo", "cargo", "fleece", "linen", "stretch", "graphic"]
+BRANDS = [f"Brand{n}" for n in range(500)]
+CATEGORIES = ["Tops & Tees", "Jeans", "Outerwear & Coats", "Dresses", "Sweaters", "Shorts",
+              "Socks", "Active", "Swim", "Accessories", "Intimates", "Suits & Sport Coats"]
+QUERIES = ["leather jacket", "denim", "Brand42", "vint", "Outerwear"]
+
+def seed(size: int):
+    rng = random.Random(size)
+    rows = [{
+        'id': i,
+        'name': " ".join(rng.sample(WORDS, 4)).title(),
+        'brand': rng.choice(BRANDS),
+        'category': rng.choice(CATEGORIES),
+        'department': rng.choice(["Men", "Women"]),
+        'retail_price': round(rng.uniform(5, 200), 2)
+    } for i in range(1, size + 1)]
+    db.session.execute(Product.__table__.insert(), rows)
+    db.session.commit()
+
+def time_search(fn, query: str, limit: int, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(query, limit)
+        samples.append(time.perf_counter() - start)
+        db.session.expunge_all()
+    return median_ms(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[30000, 300000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+    
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = create_bench_app(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            with app.app_context():
+                db.create_all()
+                seed(size)
+                start = time.perf_counter()
+                ensure_product_search_index(db.engine)
+                print(f"\n{size} products (FTS index built in {time.perf_counter() - start:.2f}s)")
+                print(f"{'query':<16} | {'matches':>7} | {'LIKE all ms':>11} | {'LIKE page ms':>12} | {'FTS5 page ms':>12}")
+                print('-' * 71)
+                for query in QUERIES:
+                    matches = len(ProductService.search_products(query))
+                    like_all_ms = time_search(ProductService.search_products_like, query, None, args.repeat)
+                    like_ms = time_search(ProductService.search_products_like, query, args.limit, args.repeat)
+                    fts_ms = time_search(ProductService.search_products, query, args.limit, args.repeat)
+                    print(f"{query:<16} | {matches:>7} | {like_all_ms:>11.2f} | {like_ms:>12.2f} | {fts_ms:>12.2f}")
+                db.engine.dispose()
+
+if __name__ == '__main__':
+    main()
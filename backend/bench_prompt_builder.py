@@ -0,0 +1,96 @@
+"""Benchmark response-prompt size: the previous unbounded prompt vs. the token-budgeted builder.
+
+Builds prompts for synthetic turns (an order with many items, a memory-recall
+turn whose db_result repeats the memories and history, a product question with
+long past messages) and reports estimated prompt tokens and build time. The
+previous prompt is reproduced here as it was: the raw db_result repr, three
+memories and five history messages with no size control. Budgeted builds are
+timed warm (token counts of recurring history, memories and context cached,
+as from the second turn of a session on) and cold (caches cleared first).
+
+Usage:
+    python bench_prompt_builder.py [--budget 1500] [--repeat 2000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+import prompt_builder
+from prompt_builder import build_prompt, estimate_tokens, INSTRUCTION
+
+def legacy_prompt(state):
+    parts = [f"User: {state['user_message']}", f"Current Context: {state['db_result']}"]
+    if state["semantic_memory"]:
+        memory_context = "Relevant Past Conversations:\n"
+        for i, memory in enumerate(state["semantic_memory"][:3], 1):
+            memory_context += f"{i}. {memory['content']}\n"
+        parts.append(memory_context)
+    if state["conversation_context"]:
+        history_context = "Recent Conversation History:\n"
+        for msg in state["conversation_context"][-5:]:
+            history_context += f"{msg['role']}: {msg['content']}\n"
+        parts.append(history_context)
+    parts.append("\n" + INSTRUCTION)
+    return "\n\n".join(parts)
+
+def _text(rng, words):
+    vocabulary = ["order", "shipped", "delivery", "refund", "jacket", "size", "color", "warehouse",
+                  "tracking", "the", "my", "was", "please", "when", "arrive", "return", "exchange"]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+def make_states(seed_value: int = 3):
+    rng = random.Random(seed_value)
+    now = datetime(2024, 1, 1)
+    memories = [{'content': _text(rng, 120), 'similarity': 0.8} for _ in range(5)]
+    history = [{'role': 'user' if i % 2 == 0 else 'ai', 'content': _text(rng, 150),
+                'timestamp': (now - timedelta(minutes=i)).isoformat()} for i in range(10)]
+    order = {
+        'order_id': 42, 'status': 'Shipped', 'created_at': now.isoformat(), 'shipped_at': now.isoformat(),
+        'delivered_at': None, 'returned_at': None, 'num_items': 40,
+        'items': [{'id': i, 'product_id': 1000 + i, 'status': 'Shipped', 'sale_price': 19.990000152587891}
+                  for i in range(40)]
+    }
+    product = {'id': 7, 'name': 'Down Jacket', 'brand': 'North', 'category': 'Outerwear', 'department': 'Men',
+               'retail_price': 129.9900016784668, 'cost': None, 'sku': None, 'distribution_center_id': 1}
+    base = {'user_id': 1, 'session_id': 1, 'entities': {}, 'ai_response': None, 'prompt_tokens': 0, 'error': None}
+    return {
+        'large order': dict(base, user_message='where is my order 42?', intent='order_status', db_result=order,
+                            semantic_memory=memories, conversation_context=history),
+        'memory recall': dict(base, user_message='what did we talk about last time?', intent='memory_recall',
+                              db_result={'memory_context': memories, 'conversation_history': history},
+                              semantic_memory=memories, conversation_context=history),
+        'product': dict(base, user_message='tell me about product 7', intent='product_info', db_result=product,
+                        semantic_memory=memories[:1], conversation_context=history[:4]),
+    }
+
+def _time_us(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def _cold_build(state, budget):
+    prompt_builder._cached_tokens.cache_clear()
+    prompt_builder._cached_truncation.cache_clear()
+    build_prompt(state, budget)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget', type=int, default=1500, help='prompt token budget')
+    parser.add_argument('--repeat', type=int, default=2000, help='builds per timing')
+    args = parser.parse_args()
+
+    print(f"{'turn':<14} | {'legacy tokens':>13} | {'budgeted tokens':>15} | {'legacy build':>12} | "
+          f"{'budgeted warm':>13} | {'budgeted cold':>13}")
+    print('-' * 97)
+    for name, state in make_states().items():
+        legacy_tokens = estimate_tokens(legacy_prompt(state))
+        _, tokens = build_prompt(state, args.budget)
+        legacy_us = _time_us(lambda: legacy_prompt(state), args.repeat)
+        cold_us = _time_us(lambda: _cold_build(state, args.budget), args.repeat)
+        budgeted_us = _time_us(lambda: build_prompt(state, args.budget), args.repeat)
+        print(f"{name:<14} | {legacy_tokens:>13} | {tokens:>15} | {legacy_us:>10.1f}us | "
+              f"{budgeted_us:>11.1f}us | {cold_us:>11.1f}us")
+
+if __name__ == '__main__':
+    main()
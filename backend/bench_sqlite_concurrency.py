@@ -0,0 +1,125 @@
+"""Benchmark concurrent chat writes and reads: SQLite defaults vs. the tuned pragmas.
+
+Builds a temporary file database with users, sessions and message history, then
+runs writer threads calling ChatMessageService.add_message alongside reader
+threads loading session histories and user sessions. The same workload runs
+once with SQLite's defaults (rollback journal, synchronous=FULL) and once with
+the settings from sqlite_tuning.py (WAL, synchronous=NORMAL, cache, mmap,
+busy timeout).
+
+Usage:
+    python bench_sqlite_concurrency.py [--seconds 5] [--writers 2] [--readers 4]
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from sqlalchemy.exc import OperationalError
+from models import db, User, ChatMessage
+from services import ConversationService, ChatMessageService
+from sqlite_tuning import configure_sqlite_engine, get_sqlite_settings
+from bench_utils import create_bench_app, median_ms
+
+def seed(users: int, sessions_per_user: int, messages_per_session: int):
+    db.session.execute(User.__table__.insert(), [
+        {'id': i, 'first_name': f'User{i}', 'last_name': 'Bench', 'email': f'user{i}@example.com'}
+        for i in range(1, users + 1)
+    ])
+    db.session.commit()
+    session_ids = []
+    for user_id in range(1, users + 1):
+        for _ in range(sessions_per_user):
+            session_ids.append(ConversationService.create_session(user_id, "Bench chat").id)
+    db.session.execute(ChatMessage.__table__.insert(), [
+        {'session_id': session_id, 'message_type': 'user' if n % 2 == 0 else 'assistant',
+         'content': f'message {n} ' + 'lorem ipsum ' * 20}
+        for session_id in session_ids for n in range(messages_per_session)
+    ])
+    db.session.commit()
+    return session_ids
+
+def run_workload(app, session_ids, users, seconds, writers, readers):
+    stop = threading.Event()
+    stats = {'writes': [], 'reads': [], 'errors': 0}
+    lock = threading.Lock()
+
+    def writer(seed_value):
+        rng = random.Random(seed_value)
+        with app.app_context():
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    ChatMessageService.add_message(rng.choice(session_ids), 'user', 'where is my order?')
+                    sample = time.perf_counter() - start
+                    with lock:
+                        stats['writes'].append(sample)
+                except OperationalError:
+                    db.session.rollback()
+                    with lock:
+                        stats['errors'] += 1
+
+    def reader(seed_value):
+        rng = random.Random(seed_value)
+        with app.app_context():
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    if rng.random() < 0.5:
+                        ChatMessageService.get_session_messages(rng.choice(session_ids))
+                    else:
+                        ConversationService.get_user_sessions(rng.randint(1, users))
+                    sample = time.perf_counter() - start
+                    with lock:
+                        stats['reads'].append(sample)
+                except OperationalError:
+                    with lock:
+                        stats['errors'] += 1
+                db.session.remove()
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    threads += [threading.Thread(target=reader, args=(100 + n,)) for n in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return stats
+
+def p95_ms(samples) -> float:
+    ordered = sorted(samples)
+    return ordered[int(len(ordered) * 0.95)] * 1000 if ordered else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--messages', type=int, default=40, help='seeded messages per session')
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} | {'writes/s':>8} | {'write p50':>9} | {'write p95':>9} | "
+          f"{'reads/s':>8} | {'read p50':>8} | {'read p95':>8} | {'errors':>6}")
+    print('-' * 86)
+    for mode in ('default', 'tuned'):
+        with tempfile.TemporaryDirectory() as tmp:
+            app = create_bench_app(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            with app.app_context():
+                if mode == 'tuned':
+                    configure_sqlite_engine(db.engine)
+                db.create_all()
+                session_ids = seed(args.users, 2, args.messages)
+                settings = get_sqlite_settings(db.engine)
+            stats = run_workload(app, session_ids, args.users, args.seconds, args.writers, args.readers)
+            print(f"{mode:<8} | {len(stats['writes']) / args.seconds:>8.0f} | {median_ms(stats['writes']):>7.2f}ms | "
+                  f"{p95_ms(stats['writes']):>7.2f}ms | {len(stats['reads']) / args.seconds:>8.0f} | "
+                  f"{median_ms(stats['reads']):>6.2f}ms | {p95_ms(stats['reads']):>6.2f}ms | {stats['errors']:>6}")
+            print(f"         journal_mode={settings['journal_mode']}, synchronous={settings['synchronous']}")
+            with app.app_context():
+                db.engine.dispose()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark EcommerceDataService.get_user_context against the old N+1 loader.
+
+Seeds an in-memory SQLite database with users that have 1, 10 and 100 orders
+(3 items each) and reports the number of SQL statements and the median latency
+per call for both implementations.
+
+Usage:
+    python bench_user_context.py [--repeat 50]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from models import db, User, Product, Order, OrderItem
+from services import EcommerceDataService
+from bench_utils import create_bench_app, QueryCounter, median_ms
+
+ORDER_COUNTS = [1, 10, 100]
+ITEMS_PER_ORDER = 3
+
+def legacy_get_user_context(user_id: int):
+    """The previous implementation: one OrderItem query per order"""
+    user = User.query.get(user_id)
+    if not user:
+        return {}
+    orders = Order.query.filter_by(user_id=user_id).all()
+    order_items = []
+    for order in orders:
+        order_items.extend(OrderItem.query.filter_by(order_id=order.order_id).all())
+    return {'user': user.id, 'orders': len(orders), 'order_items': len(order_items)}
+
+def seed():
+    db.session.add_all(Product(id=p, name=f"Product {p}", brand=f"Brand {p % 10}") for p in range(1, 51))
+    order_id = item_id = 1
+    for user_id, num_orders in enumerate(ORDER_COUNTS, 1):
+        db.session.add(User(id=user_id, first_name='Bench', last_name=str(num_orders)))
+        for n in range(num_orders):
+            db.session.add(Order(order_id=order_id, user_id=user_id, status='Shipped',
+                                 created_at=datetime(2024, 1, 1) + timedelta(days=n),
+                                 num_of_item=ITEMS_PER_ORDER))
+            for _ in range(ITEMS_PER_ORDER):
+                db.session.add(OrderItem(id=item_id, order_id=order_id, user_id=user_id,
+                                         product_id=item_id % 50 + 1, status='Shipped', sale_price=10.0))
+                item_id += 1
+            order_id += 1
+    db.session.commit()
+
+def measure(fn, user_id: int, repeat: int):
+    with QueryCounter(db.engine) as counter:
+        fn(user_id)
+        db.session.expunge_all()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(user_id)
+        samples.append(time.perf_counter() - start)
+        db.session.expunge_all()
+    return counter.count, median_ms(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    
+    app = create_bench_app()
+    with app.app_context():
+        db.create_all()
+        seed()
+        print(f"{'orders':>6} | {'legacy queries':>14} | {'legacy ms':>9} | {'new queries':>11} | {'new ms':>7}")
+        print('-' * 62)
+        for user_id, num_orders in enumerate(ORDER_COUNTS, 1):
+            old_queries, old_ms = measure(legacy_get_user_context, user_id, args.repeat)
+            new_queries, new_ms = measure(EcommerceDataService.get_user_context, user_id, args.repeat)
+            print(f"{num_orders:>6} | {old_queries:>14} | {old_ms:>9.2f} | {new_queries:>11} | {new_ms:>7.2f}")
+
+if __name__ == '__main__':
+    main()
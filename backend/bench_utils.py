@@ -0,0 +1,140 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from flask import Flask
+from sqlalchemy import event
+from models import db
+
+def create_bench_app(database_uri: str = 'sqlite://') -> Flask:
+    """Create a minimal Flask app bound to its own database for benchmarks"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+class QueryCounter:
+    """Count SQL statements executed on an engine while active"""
+    
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+    
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+    
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+    
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+@contextmanager
+def timer(results: dict, key: str = 'seconds'):
+    """Store the wall-clock time of the block in results[key]"""
+    start = time.perf_counter()
+    yield
+    results[key] = time.perf_counter() - start
+
+def median_ms(samples) -> float:
+    """Median of a list of durations in seconds, in milliseconds"""
+    ordered = sorted(samples)
+    return ordered[len(ordered) // 2] * 1000
+
+class _StubGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep connections open between requests
+    disable_nagle_algorithm = True
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        self.server.request_count += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if request.get('stream'):
+            self._send_stream(request)
+            return
+        body = json.dumps({
+            'id': 'chatcmpl-stub',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'stub'),
+            'choices': [{
+                'index': 0,
+                'finish_reason': 'stop',
+                'message': {'role': 'assistant', 'content': self.server.reply}
+            }],
+            'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2}
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_stream(self, request):
+        """Reply with one SSE chunk per word of the canned reply"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        words = self.server.reply.split(' ')
+        for i, word in enumerate(words):
+            chunk = {
+                'id': 'chatcmpl-stub',
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': request.get('model', 'stub'),
+                'choices': [{
+                    'index': 0,
+                    'delta': {'content': word if i == 0 else ' ' + word},
+                    'finish_reason': 'stop' if i == len(words) - 1 else None
+                }]
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+    
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # accept hundreds of simultaneous connections
+
+class StubGroqServer:
+    """Local HTTP server that answers Groq chat completion requests with a canned reply.
+
+    Point a client at it with create_groq_client(base_url=server.base_url).
+    """
+    
+    def __init__(self, reply: str = 'stub reply', latency: float = 0.0):
+        self.httpd = _StubHTTPServer(('127.0.0.1', 0), _StubGroqHandler)
+        self.httpd.reply = reply
+        self.httpd.latency = latency
+        self.httpd.request_count = 0
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+    
+    @property
+    def request_count(self) -> int:
+        return self.httpd.request_count
+    
+    def __enter__(self):
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+# Cache of generated chat replies for questions answered from one order or
+# product row ("where is my order 123", "price of product 5"). A hit skips the
+# LLM call. Entries remember a fingerprint of the row the reply was written
+# from; a turn whose lookup returns a different row is treated as a miss and
+# replaces the stale entry, so order status changes and catalog reloads are
+# picked up without any write hooks.
+CHAT_CACHE_ENABLED = os.getenv('CHAT_CACHE_ENABLED', 'true').lower() == 'true'
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv('CHAT_CACHE_MAX_ENTRIES', '4096'))
+CHAT_CACHE_TTL = float(os.getenv('CHAT_CACHE_TTL', '600'))
+# Cosine similarity at which a differently worded question with the same intent
+# and IDs reuses a cached reply (uses the memory embedder); 0 disables it
+CHAT_CACHE_SIMILARITY = float(os.getenv('CHAT_CACHE_SIMILARITY', '0'))
+
+# Intents whose reply is written from one looked-up row, keyed by the entity
+# kind that row is looked up by. The reply prompt also carries the user's
+# memories and the session's summary and history, so entries are scoped to
+# the user and session that asked.
+CACHEABLE_INTENTS = {'order_status': 'order', 'product_info': 'product'}
+
+_NON_WORD = re.compile(r"[^\w#]+")
+
+def normalize_message(message: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(_NON_WORD.sub(" ", message.lower()).split())
+
+def fingerprint(row: Any) -> str:
+    """Stable hash of a lookup result (e.g. EcommerceDataService.get_order_status)"""
+    encoded = json.dumps(row, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+def cache_key(intent: Optional[str], entities: Optional[Dict[str, List[int]]], message: str,
+              user_id: int, session_id: Optional[int]) -> Optional[Tuple[str, Tuple[int, ...], int, int, str]]:
+    """(intent, entity IDs, user, session, normalized message), or None when the turn is not cacheable.
+
+    Only turns that name their order/product in the message itself qualify;
+    "where is my order?" depends on the user's memory and is never cached.
+    The first turn of a new session has no session yet and is not cached either.
+    """
+    kind = CACHEABLE_INTENTS.get(intent)
+    ids = (entities or {}).get(kind) if kind else None
+    if not ids or session_id is None:
+        return None
+    return intent, tuple(ids), user_id, session_id, normalize_message(message)
+
+class ChatResponseCache:
+    """Thread-safe LRU cache of chat replies with a TTL and optional similarity matching"""
+
+    def __init__(self, max_entries: int = CHAT_CACHE_MAX_ENTRIES, ttl: float = CHAT_CACHE_TTL,
+                 similarity: float = CHAT_CACHE_SIMILARITY, embed: Optional[Callable[[str], List[float]]] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self._embed = embed
+        self._entries = OrderedDict()  # key -> (expires_at, row fingerprint, reply, vector)
+        self._by_ids = {}  # (intent, ids, user, session) -> set of keys, for similarity lookups and invalidation
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def _vector(self, text: str):
+        vector = np.asarray(self._embed(text), dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def get(self, key, row_fingerprint: str) -> Optional[str]:
+        """Cached reply for key, provided it was written from the same row"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            stale = entry is not None
+            if stale:
+                if entry[0] >= now and entry[1] == row_fingerprint:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                # Expired, or written from a row that has since changed
+                self._remove_locked(key)
+            candidates = [candidate for candidate in self._by_ids.get(key[:-1], ())
+                          if self._entries[candidate][0] >= now and self._entries[candidate][1] == row_fingerprint]
+            if not (self.similarity and self._embed and candidates):
+                self._count_miss_locked(stale)
+                return None
+
+        vector = self._vector(key[-1])
+        with self._lock:
+            best_key, best_score = None, self.similarity
+            for candidate in candidates:
+                entry = self._entries.get(candidate)
+                if entry is None:
+                    continue
+                score = float(np.dot(vector, entry[3]))
+                if score >= best_score:
+                    best_key, best_score = candidate, score
+            if best_key is None:
+                self._count_miss_locked(stale)
+                return None
+            self._entries.move_to_end(best_key)
+            self.similar_hits += 1
+            return self._entries[best_key][2]
+
+    def _count_miss_locked(self, stale: bool):
+        if stale:
+            self.stale += 1
+        else:
+            self.misses += 1
+
+    def set(self, key, row_fingerprint: str, reply: str):
+        vector = self._vector(key[-1]) if self.similarity and self._embed else None
+        with self._lock:
+            if key in self._entries:
+                self._remove_locked(key)
+            self._entries[key] = (time.monotonic() + self.ttl, row_fingerprint, reply, vector)
+            self._by_ids.setdefault(key[:-1], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove_locked(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, kind: str, entity_id: int) -> int:
+        """Drop every reply about one order/product; returns how many were dropped"""
+        intents = [intent for intent, intent_kind in CACHEABLE_INTENTS.items() if intent_kind == kind]
+        with self._lock:
+            keys = [key for ids_key, keys in self._by_ids.items()
+                    if ids_key[0] in intents and entity_id in ids_key[1] for key in keys]
+            for key in keys:
+                self._remove_locked(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_ids.clear()
+
+    def _remove_locked(self, key):
+        self._entries.pop(key)
+        keys = self._by_ids.get(key[:-1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_ids[key[:-1]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.similar_hits + self.misses + self.stale
+            return {
+                'enabled': CHAT_CACHE_ENABLED,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'similar_hits': self.similar_hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'hit_rate': round((self.hits + self.similar_hits) / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'similarity_threshold': self.similarity
+            }
+
+def _embed_with_memory_embedder(text: str) -> List[float]:
+    # Imported lazily: memory_service opens the Chroma store and loads the model
+    from memory_service import memory_service
+    return memory_service.embedder.embed_one(text)
+
+# Global instance
+chat_response_cache = ChatResponseCache(embed=_embed_with_memory_embedder)
@@ -0,0 +1,173 @@
+import os
+import queue
+import threading
+from typing import Optional, Tuple
+from llm_client import GROQ_MODEL, get_groq_client
+from models import db
+from prompt_builder import estimate_tokens, truncate_to_tokens
+from services import ConversationService, ChatMessageService
+
+# Rolling conversation summaries. Each session keeps a summary of its older
+# messages on ConversationSession; chat prompts carry that summary plus only
+# the messages it doesn't cover yet, so prompt size and history reads stay
+# bounded however long a session runs. Once SUMMARY_EVERY_MESSAGES messages
+# have piled up beyond the SUMMARY_RECENT_MESSAGES kept verbatim, a background
+# worker folds them into the summary with one LLM call.
+SUMMARY_ENABLED = os.getenv('CONVERSATION_SUMMARY_ENABLED', 'true').lower() == 'true'
+SUMMARY_EVERY_MESSAGES = int(os.getenv('SUMMARY_EVERY_MESSAGES', '8'))
+SUMMARY_RECENT_MESSAGES = int(os.getenv('SUMMARY_RECENT_MESSAGES', '4'))
+SUMMARY_MAX_TOKENS = int(os.getenv('SUMMARY_MAX_TOKENS', '250'))
+# History loaded per turn when summaries are disabled
+DEFAULT_CONTEXT_MESSAGES = 10
+# Messages a chat turn adds (the user message and the reply)
+TURN_MESSAGES = 2
+# Longest message text passed to the summarizer
+SUMMARY_MESSAGE_MAX_TOKENS = 150
+
+SUMMARY_INSTRUCTION = ("Update the running summary of this customer-support conversation with the new messages. "
+                       "Keep order and product IDs, statuses, stated preferences and unresolved questions; "
+                       f"drop pleasantries. Reply with the updated summary only, at most {SUMMARY_MAX_TOKENS} words.")
+
+def plan_context(summary_state) -> Tuple[Optional[str], int, bool]:
+    """(summary, messages to load verbatim, whether a fold is due once this turn is saved).
+
+    summary_state is ConversationService.get_summary_state's row. The verbatim
+    window covers every message the summary doesn't, capped at
+    SUMMARY_RECENT_MESSAGES + SUMMARY_EVERY_MESSAGES while a fold is pending.
+    """
+    if not SUMMARY_ENABLED or summary_state is None:
+        return None, DEFAULT_CONTEXT_MESSAGES, False
+    unsummarized = (summary_state.message_count or 0) - (summary_state.summarized_count or 0)
+    window = min(max(unsummarized, SUMMARY_RECENT_MESSAGES), SUMMARY_RECENT_MESSAGES + SUMMARY_EVERY_MESSAGES)
+    due = unsummarized + TURN_MESSAGES >= SUMMARY_RECENT_MESSAGES + SUMMARY_EVERY_MESSAGES
+    return summary_state.summary, window, due
+
+def _summary_prompt(previous: Optional[str], messages) -> str:
+    lines = [f"{message_type}: {truncate_to_tokens(content, SUMMARY_MESSAGE_MAX_TOKENS)}"
+             for _, message_type, content in messages]
+    return (f"Current summary: {previous or '(none)'}\n\n"
+            "New messages:\n" + "\n".join(lines) + f"\n\n{SUMMARY_INSTRUCTION}")
+
+def _fallback_summary(previous: Optional[str], messages) -> str:
+    """Extractive summary used when the LLM call fails: the previous summary, shortened
+    as needed, followed by what the user asked in the folded messages"""
+    asked = " ".join(content for _, message_type, content in messages if message_type == 'user')
+    asked = truncate_to_tokens(f"User asked: {asked}", SUMMARY_MAX_TOKENS // 2)
+    if not previous:
+        return asked
+    return truncate_to_tokens(previous, SUMMARY_MAX_TOKENS - estimate_tokens(asked)) + " " + asked
+
+def summarize_session(session_id: int) -> int:
+    """Fold a session's messages older than the recent window into its summary.
+
+    Needs an app context. Returns how many messages were folded (0 when fewer
+    than SUMMARY_EVERY_MESSAGES were waiting).
+    """
+    state = ConversationService.get_summary_state(session_id)
+    if state is None:
+        return 0
+    messages = ChatMessageService.get_messages_after(session_id, state.summary_message_id)
+    fold = messages[:-SUMMARY_RECENT_MESSAGES] if SUMMARY_RECENT_MESSAGES else messages
+    if len(fold) < SUMMARY_EVERY_MESSAGES:
+        return 0
+
+    try:
+        completion = get_groq_client().chat.completions.create(
+            model=GROQ_MODEL,
+            messages=[{"role": "user", "content": _summary_prompt(state.summary, fold)}],
+            max_tokens=SUMMARY_MAX_TOKENS * 2,
+            temperature=0.2
+        )
+        summary = truncate_to_tokens(completion.choices[0].message.content.strip(), SUMMARY_MAX_TOKENS)
+    except Exception as e:
+        print(f"Error summarizing conversation {session_id}: {e}")
+        summary = _fallback_summary(state.summary, fold)
+
+    if not ConversationService.save_summary(session_id, summary, state.summary_message_id, fold[-1][0], len(fold)):
+        return 0  # another fold got there first
+    return len(fold)
+
+class ConversationSummarizer:
+    """Background worker that updates conversation summaries off the request path.
+
+    Chat endpoints call schedule() after saving a turn that makes a fold due;
+    a session already waiting in the queue is not queued twice.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.sessions_summarized = 0
+        self.folded_messages = 0
+        self.failed_count = 0
+
+    def init_app(self, app):
+        """Use this Flask app's context (and database) for summary writes"""
+        self.app = app
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="conversation-summarizer", daemon=True)
+                    self._thread.start()
+
+    def schedule(self, session_id: int) -> bool:
+        """Queue a session for summarizing; returns False if summaries are off or it is already queued"""
+        if not SUMMARY_ENABLED or self.app is None:
+            return False
+        with self._lock:
+            if session_id in self._pending:
+                return False
+            self._pending.add(session_id)
+        self._ensure_worker()
+        self._queue.put(session_id)
+        return True
+
+    @property
+    def pending_count(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def _run(self):
+        while True:
+            session_id = self._queue.get()
+            with self._lock:
+                self._pending.discard(session_id)
+            try:
+                with self.app.app_context():
+                    try:
+                        folded = summarize_session(session_id)
+                        if folded:
+                            self.sessions_summarized += 1
+                            self.folded_messages += folded
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                self.failed_count += 1
+                print(f"Error updating conversation summary {session_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> int:
+        """Block until every queued session has been summarized; returns how many were pending"""
+        pending = self.pending_count
+        if pending:
+            self._queue.join()
+        return pending
+
+    def stats(self) -> dict:
+        return {
+            'enabled': SUMMARY_ENABLED,
+            'pending': self.pending_count,
+            'sessions_summarized': self.sessions_summarized,
+            'messages_folded': self.folded_messages,
+            'failed': self.failed_count,
+            'every_messages': SUMMARY_EVERY_MESSAGES,
+            'recent_messages': SUMMARY_RECENT_MESSAGES
+        }
+
+# Global instance
+conversation_summarizer = ConversationSummarizer()
@@ -0,0 +1,155 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+import numpy as np
+
+class HashEmbeddingBackend:
+    """MD5-based placeholder embedding (4 hash floats padded to 128 dimensions).
+
+    Has no semantic meaning; kept for offline use and for memories stored before
+    real embeddings were introduced.
+    """
+    name = "hash"
+    dimension = 128
+    
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        embeddings = []
+        for text in texts:
+            hash_bytes = hashlib.md5(text.encode()).digest()
+            embedding = [int.from_bytes(hash_bytes[i:i+4], byteorder='big') / 2**32
+                         for i in range(0, len(hash_bytes), 4)]
+            embeddings.append(embedding + [0.0] * (self.dimension - len(embedding)))
+        return embeddings
+
+class SentenceTransformerBackend:
+    """CPU sentence-transformer encoder, loaded lazily once per process"""
+    
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", device: str = "cpu", batch_size: int = 32):
+        self.name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+    
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.name, device=self.device)
+        return self._model
+    
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+    
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.model.encode(texts, batch_size=self.batch_size,
+                                    normalize_embeddings=True, convert_to_numpy=True)
+        return vectors.tolist()
+
+class CachedEmbedder:
+    """Batching LRU cache in front of an embedding backend.
+
+    Vectors are cached by text hash and stored as float32, float16 or int8
+    (symmetric per-vector scale) to trade precision for cache memory.
+    Only cache misses are sent to the backend, in a single batch.
+    """
+    
+    PRECISIONS = ("float32", "float16", "int8")
+    
+    def __init__(self, backend, cache_size: int = 10000, precision: str = "float32"):
+        if precision not in self.PRECISIONS:
+            raise ValueError(f"precision must be one of {self.PRECISIONS}")
+        self.backend = backend
+        self.cache_size = cache_size
+        self.precision = precision
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def name(self) -> str:
+        return self.backend.name
+    
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.sha1(text.encode()).digest()
+    
+    def _pack(self, vector: List[float]):
+        array = np.asarray(vector, dtype=np.float32)
+        if self.precision == "float16":
+            return array.astype(np.float16)
+        if self.precision == "int8":
+            scale = float(np.abs(array).max()) / 127 or 1.0
+            return np.round(array / scale).astype(np.int8), scale
+        return array
+    
+    def _unpack(self, packed) -> List[float]:
+        if self.precision == "int8":
+            values, scale = packed
+            return (values.astype(np.float32) * scale).tolist()
+        return packed.astype(np.float32).tolist()
+    
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts, encoding only the ones not already cached"""
+        keys = [self._key(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                packed = self._cache.get(key)
+                if packed is not None:
+                    self._cache.move_to_end(key)
+                    results[i] = self._unpack(packed)
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+            self.misses += sum(len(indexes) for indexes in missing.values())
+        
+        if missing:
+            unique_texts = [texts[indexes[0]] for indexes in missing.values()]
+            vectors = self.backend.embed(unique_texts)
+            with self._lock:
+                for (key, indexes), vector in zip(missing.items(), vectors):
+                    packed = self._pack(vector)
+                    self._cache[key] = packed
+                    self._cache.move_to_end(key)
+                    for i in indexes:
+                        results[i] = self._unpack(packed)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return results
+    
+    def embed_one(self, text: str) -> List[float]:
+        return self.embed([text])[0]
+    
+    def stats(self):
+        return {"backend": self.name, "precision": self.precision, "cache_size": len(self._cache),
+                "hits": self.hits, "misses": self.misses}
+
+def create_embedder() -> CachedEmbedder:
+    """Build the embedder configured by EMBEDDING_BACKEND, EMBEDDING_MODEL,
+    EMBEDDING_CACHE_SIZE, EMBEDDING_PRECISION and EMBEDDING_BATCH_SIZE"""
+    backend_name = os.getenv("EMBEDDING_BACKEND", "sentence-transformers")
+    if backend_name == "hash":
+        backend = HashEmbeddingBackend()
+    else:
+        try:
+            import sentence_transformers  # noqa: F401
+            backend = SentenceTransformerBackend(
+                model_name=os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
+                batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+            )
+        except ImportError:
+            print("sentence-transformers is not installed; falling back to hash embeddings")
+            backend = HashEmbeddingBackend()
+    return CachedEmbedder(
+        backend,
+        cache_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "10000")),
+        precision=os.getenv("EMBEDDING_PRECISION", "float32")
+    )
@@ -0,0 +1,190 @@
+"""Intent classification and entity (order/product/user ID) extraction for chat messages.
+
+Usage (classify historical chat logs offline):
+    python intent_parser.py [--db ecommerce.db] [--output intents.ndjson] [--all-types]
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Ordered intent rules: the first rule whose keyword groups all match wins. A group
+# matches when any of its keywords occurs in the lowercased message (substring match).
+DEFAULT_INTENT_RULES = [
+    ("memory_recall", [["remember", "before", "last time", "previously", "earlier"]]),
+    ("order_status", [["order"], ["status", "track"]]),
+    ("product_info", [["product", "item"]]),
+]
+DEFAULT_INTENT = "general"
+
+# Entity kinds and the keyword that introduces their ID, e.g. "order #123", "product 42"
+DEFAULT_ENTITY_KEYWORDS = {"order": "order", "product": "product", "user": "user"}
+
+# Entity kinds whose IDs parse() extracts for each intent (the lookups the chat
+# graph makes); parse_batch() and extract_entities() pull out every kind
+DEFAULT_INTENT_ENTITIES = {"order_status": ["order"], "product_info": ["product"]}
+
+# Optional JSON file overriding the rules:
+# {"rules": [[intent, [[kw, ...], ...]], ...], "default": "general", "entities": {...}, "intent_entities": {...}}
+INTENT_RULES_FILE = os.getenv("INTENT_RULES_FILE")
+
+class IntentParser:
+    """Precompiled intent rules and ID regexes.
+
+    Rules are kept as (intent, keyword groups) tuples of lowercased keywords
+    and tested with plain substring checks, which for a handful of short
+    keywords beat a regex alternation. ID regexes are compiled once per
+    entity kind, plus one combined pattern that extracts every kind in a
+    single pass; extraction is skipped when no entity keyword occurs in the
+    message.
+    """
+
+    def __init__(self, rules: Optional[Sequence] = None, default_intent: str = DEFAULT_INTENT,
+                 entity_keywords: Optional[Dict[str, str]] = None,
+                 intent_entities: Optional[Dict[str, Sequence[str]]] = None):
+        self.rules: List[Tuple[str, Tuple[Tuple[str, ...], ...]]] = [
+            (intent, tuple(tuple(keyword.lower() for keyword in group) for group in groups))
+            for intent, groups in (rules or DEFAULT_INTENT_RULES)
+        ]
+        for intent, groups in self.rules:
+            if not groups or not all(groups):
+                raise ValueError(f"Intent rule {intent!r} needs at least one non-empty keyword group")
+        self.default_intent = default_intent
+        self.entity_keywords = dict(entity_keywords or DEFAULT_ENTITY_KEYWORDS)
+        self._kind_by_keyword = {keyword: kind for kind, keyword in self.entity_keywords.items()}
+        alternation = "|".join(re.escape(keyword) for keyword in sorted(self._kind_by_keyword, key=len, reverse=True))
+        self._entity_pattern = re.compile(rf"({alternation})[\s#]*(\d+)")
+        self._kind_patterns = {kind: re.compile(rf"{re.escape(keyword)}[\s#]*(\d+)")
+                               for kind, keyword in self.entity_keywords.items()}
+        # intent -> ((kind, ID regex), ...) extracted by parse()
+        self._intent_lookups = {
+            intent: tuple((kind, self._kind_patterns[kind]) for kind in kinds)
+            for intent, kinds in (DEFAULT_INTENT_ENTITIES if intent_entities is None else intent_entities).items()
+        }
+
+    @classmethod
+    def from_file(cls, path: str) -> "IntentParser":
+        """Load rules from a JSON file (see INTENT_RULES_FILE)"""
+        with open(path) as f:
+            config = json.load(f)
+        return cls(config["rules"], config.get("default", DEFAULT_INTENT), config.get("entities"),
+                   config.get("intent_entities"))
+
+    def _classify_lowered(self, msg: str) -> str:
+        # First rule whose keyword groups all have a keyword in msg
+        for intent, groups in self.rules:
+            for group in groups:
+                for keyword in group:
+                    if keyword in msg:
+                        break
+                else:
+                    break
+            else:
+                return intent
+        return self.default_intent
+
+    def _extract_lowered(self, msg: str) -> Dict[str, List[int]]:
+        entities = {}
+        for keyword in self._kind_by_keyword:
+            if keyword in msg:
+                break
+        else:
+            return entities
+        for keyword, value in self._entity_pattern.findall(msg):
+            ids = entities.setdefault(self._kind_by_keyword[keyword], [])
+            entity_id = int(value)
+            if entity_id not in ids:
+                ids.append(entity_id)
+        return entities
+
+    def classify(self, message: str) -> str:
+        """Intent of a single message"""
+        return self._classify_lowered(message.lower())
+
+    def extract_entities(self, text: str) -> Dict[str, List[int]]:
+        """IDs mentioned in text by kind, in order of appearance, e.g. {'order': [12, 15], 'product': [3]}.
+
+        Kinds with no IDs are left out.
+        """
+        return self._extract_lowered(text.lower())
+
+    def first_id(self, kind: str, text: str) -> Optional[int]:
+        """First ID of the given kind mentioned in text (stops at the first match)"""
+        match = self._kind_patterns[kind].search(text.lower())
+        return int(match.group(1)) if match else None
+
+    def parse(self, message: str) -> Dict[str, object]:
+        """Intent of a message plus the IDs that intent looks up (see DEFAULT_INTENT_ENTITIES).
+
+        The message is lowercased once; e.g. "track order 5 and product 7"
+        gives {'intent': 'order_status', 'entities': {'order': [5]}}.
+        """
+        msg = message.lower()
+        intent = self._classify_lowered(msg)
+        entities = {}
+        for kind, pattern in self._intent_lookups.get(intent, ()):
+            values = pattern.findall(msg)
+            if values:
+                entities[kind] = [int(values[0])] if len(values) == 1 else list(dict.fromkeys(map(int, values)))
+        return {"intent": intent, "entities": entities}
+
+    def parse_batch(self, messages: Iterable[str]) -> List[Dict[str, object]]:
+        """Intent and every mentioned ID (as extract_entities) of many messages, e.g. historical chat logs"""
+        classify, extract = self._classify_lowered, self._extract_lowered
+        results = []
+        for message in messages:
+            msg = message.lower()
+            results.append({"intent": classify(msg), "entities": extract(msg)})
+        return results
+
+# Global instance
+intent_parser = IntentParser.from_file(INTENT_RULES_FILE) if INTENT_RULES_FILE else IntentParser()
+
+def iter_chat_messages(db_path: str, all_types: bool = False, batch_size: int = 5000) -> Iterator[List[tuple]]:
+    """Yield batches of (id, session_id, content) from ChatMessage, in id order"""
+    conn = sqlite3.connect(db_path)
+    try:
+        where = "" if all_types else "WHERE message_type = 'user'"
+        cursor = conn.execute(f"SELECT id, session_id, content FROM ChatMessage {where} ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+def classify_chat_log(db_path: str, output=None, all_types: bool = False, parser: IntentParser = None) -> Counter:
+    """Classify stored chat messages in batches, optionally writing one JSON line per message"""
+    parser = parser or intent_parser
+    counts = Counter()
+    for rows in iter_chat_messages(db_path, all_types):
+        results = parser.parse_batch(content for _, _, content in rows)
+        for (message_id, session_id, _), result in zip(rows, results):
+            counts[result["intent"]] += 1
+            if output:
+                output.write(json.dumps({"message_id": message_id, "session_id": session_id, **result}) + "\n")
+    return counts
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Classify stored chat messages by intent")
+    arg_parser.add_argument('--db', default='ecommerce.db', help='SQLite database file')
+    arg_parser.add_argument('--output', help='write one JSON line per message to this file ("-" for stdout)')
+    arg_parser.add_argument('--all-types', action='store_true', help='include AI messages, not just user messages')
+    args = arg_parser.parse_args()
+
+    if args.output == '-':
+        counts = classify_chat_log(args.db, sys.stdout, args.all_types)
+    elif args.output:
+        with open(args.output, 'w') as f:
+            counts = classify_chat_log(args.db, f, args.all_types)
+    else:
+        counts = classify_chat_log(args.db, None, args.all_types)
+
+    print(f"Classified {sum(counts.values())} messages:", file=sys.stderr)
+    for intent, count in counts.most_common():
+        print(f"  {intent}: {count}", file=sys.stderr)
@@ -1,256 +1,563 @@
-import os
+import asyncio
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph, END
-from groq import Groq
-from services import EcommerceDataService
-from memory_service import memory_service
+from langgraph.config import get_stream_writer
+from llm_client import GROQ_MODEL, get_groq_client, get_async_groq_client
+from services import EcommerceDataService, ConversationService
+from async_services import AsyncEcommerceDataService, AsyncChatMessageService, AsyncConversationService
+from memory_service import memory_service, memory_write_queue, MEMORY_WRITE_BEHIND
+from intent_parser import intent_parser
+from chat_cache import CHAT_CACHE_ENABLED, chat_response_cache, cache_key, fingerprint
+from prompt_builder import build_prompt
+from conversation_summary import plan_context
 from typing import TypedDict, Optional, List, Dict, Any
-import json
+from contextlib import nullcontext
+from flask import current_app, has_app_context
+import threading
+import time
 
 load_dotenv()
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
 # Enhanced state format for LangGraph with memory
 class ChatState(TypedDict):
     user_id: int
-    session_id: int
+    session_id: Optional[int]  # None until the first turn of a new session is saved
     user_message: str
     intent: Optional[str]
+    entities: Optional[Dict[str, List[int]]]
     db_result: Optional[dict]
     semantic_memory: Optional[List[Dict[str, Any]]]
     conversation_context: Optional[List[Dict[str, Any]]]
+    conversation_summary: Optional[str]
+    summary_due: bool
     ai_response: Optional[str]
+    prompt_tokens: int
     error: Optional[str]
 
 def parse_intent_node(state: ChatState) -> ChatState:
-    """Enhanced intent parser with memory awareness"""
-    msg = state["user_message"].lower()
-    
-    # Check for memory-related keywords
-    if any(word in msg for word in ["remember", "before", "last time", "previously", "earlier"]):
-        state["intent"] = "memory_recall"
-    elif "order" in msg and ("status" in msg or "track" in msg):
-        state["intent"] = "order_status"
-    elif "product" in msg or "item" in msg:
-        state["intent"] = "product_info"
-    else:
-        state["intent"] = "general"
-    
+    """Enhanced intent parser with memory awareness (rules live in intent_parser.py)"""
+    parsed = intent_parser.parse(state["user_message"])
+    state["intent"] = parsed["intent"]
+    state["entities"] = parsed["entities"]
     return state
 
-def retrieve_memory_node(state: ChatState) -> ChatState:
-    """Retrieve relevant semantic memory"""
-    try:
-        # Get semantic memory
-        semantic_memory = memory_service.retrieve_relevant_memory(
-            user_id=state["user_id"],
-            session_id=state["session_id"],
-            query=state["user_message"],
-            limit=5
-        )
-        state["semantic_memory"] = semantic_memory
-        
-        # Get conversation context
-        conversation_context = memory_service.get_conversation_context(
-            user_id=state["user_id"],
-            session_id=state["session_id"],
-            recent_messages=10
-        )
-        state["conversation_context"] = conversation_context
-        
-    except Exception as e:
-        state["error"] = f"Memory retrieval error: {e}"
-        state["semantic_memory"] = []
-        state["conversation_context"] = []
-    
-    return state
+def _branch_app_context():
+    """Give a parallel graph branch its own Flask app context.
 
-def query_db_node(state: ChatState) -> ChatState:
-    """Enhanced DB query with memory context"""
-    try:
-        if state["intent"] == "order_status":
-            # Try to extract order_id from message or memory
-            import re
-            match = re.search(r"order[\s#]*(\d+)", state["user_message"].lower())
-            order_id = int(match.group(1)) if match else None
-            
-            # If no order ID in current message, check memory
-            if not order_id and state["semantic_memory"]:
-                for memory in state["semantic_memory"]:
-                    memory_match = re.search(r"order[\s#]*(\d+)", memory["content"].lower())
-                    if memory_match:
-                        order_id = int(memory_match.group(1))
-                        break
-            
-            if order_id:
-                result = EcommerceDataService.get_order_status(order_id)
-                state["db_result"] = result
-            else:
-                state["db_result"] = {"error": "No order ID found in message or memory."}
-                
-        elif state["intent"] == "product_info":
-            # Try to extract product_id from message or memory
-            import re
-            match = re.search(r"product[\s#]*(\d+)", state["user_message"].lower())
-            product_id = int(match.group(1)) if match else None
+    Flask-SQLAlchemy scopes sessions per app context, so this keeps the memory
+    and DB branches from sharing one (non thread-safe) session.
+    """
+    if has_app_context():
+        return current_app.app_context()
+    return nullcontext()
+
+def retrieve_memory_node(state: ChatState) -> Dict[str, Any]:
+    """Retrieve relevant semantic memory (runs in parallel with query_db)"""
+    with _branch_app_context():
+        try:
+            # Get semantic memory
+            semantic_memory = memory_service.retrieve_relevant_memory(
+                user_id=state["user_id"],
+                session_id=state["session_id"],
+                query=state["user_message"],
+                limit=5
+            )
             
-            # If no product ID in current message, check memory
-            if not product_id and state["semantic_memory"]:
-                for memory in state["semantic_memory"]:
-                    memory_match = re.search(r"product[\s#]*(\d+)", memory["content"].lower())
-                    if memory_match:
-                        product_id = int(memory_match.group(1))
-                        break
+            # Conversation context: the rolling summary plus the messages it doesn't cover yet
+            summary, recent_messages, summary_due = plan_context(
+                ConversationService.get_summary_state(state["session_id"]))
+            conversation_context = memory_service.get_conversation_context(
+                user_id=state["user_id"],
+                session_id=state["session_id"],
+                recent_messages=recent_messages
+            )
+            return {"semantic_memory": semantic_memory, "conversation_context": conversation_context,
+                    "conversation_summary": summary, "summary_due": summary_due}
             
-            if product_id:
-                result = EcommerceDataService.get_product_info([product_id])
-                state["db_result"] = result[0] if result else {"error": "Product not found."}
-            else:
-                state["db_result"] = {"error": "No product ID found in message or memory."}
-                
-        elif state["intent"] == "memory_recall":
-            # For memory recall, use semantic memory as context
-            state["db_result"] = {
-                "memory_context": state["semantic_memory"],
-                "conversation_history": state["conversation_context"]
+        except Exception as e:
+            return {
+                "error": f"Memory retrieval error: {e}",
+                "semantic_memory": [],
+                "conversation_context": []
             }
-        else:
-            state["db_result"] = {}
-            
-    except Exception as e:
-        state["db_result"] = {"error": str(e)}
+
+def _lookup_order(order_id: int) -> dict:
+    return EcommerceDataService.get_order_status(order_id) or {"error": "Order not found."}
+
+def _lookup_product(product_id: int) -> dict:
+    result = EcommerceDataService.get_product_info([product_id])
+    return result[0] if result else {"error": "Product not found."}
+
+def _first_entity(state: ChatState, kind: str) -> Optional[int]:
+    ids = (state["entities"] or {}).get(kind)
+    return ids[0] if ids else None
+
+def query_db_node(state: ChatState) -> Dict[str, Any]:
+    """Query the DB for IDs found in the message itself (runs in parallel with retrieve_memory).
+
+    Leaves db_result unset when the answer depends on memory, so that
+    resolve_from_memory can finish the lookup once memory is available.
+    """
+    with _branch_app_context():
+        try:
+            if state["intent"] == "order_status":
+                order_id = _first_entity(state, "order")
+                if order_id:
+                    return {"db_result": _lookup_order(order_id)}
+                    
+            elif state["intent"] == "product_info":
+                product_id = _first_entity(state, "product")
+                if product_id:
+                    return {"db_result": _lookup_product(product_id)}
+                    
+            elif state["intent"] != "memory_recall":
+                return {"db_result": {}}
+                
+        except Exception as e:
+            return {"db_result": {"error": str(e)}}
     
-    return state
+    return {}
 
-def generate_response_node(state: ChatState) -> ChatState:
-    """Enhanced response generation with memory and personalization"""
+def _memory_recall_result(state: ChatState) -> dict:
+    """For memory recall, semantic memory and history are the context"""
+    return {
+        "memory_context": state["semantic_memory"],
+        "conversation_history": state["conversation_context"]
+    }
+
+def _memory_lookup_label(state: ChatState) -> str:
+    return "order" if state["intent"] == "order_status" else "product"
+
+def _id_from_memory(state: ChatState, label: str) -> Optional[int]:
+    """First order/product ID mentioned in the retrieved memories"""
+    for memory in state["semantic_memory"] or []:
+        found_id = intent_parser.first_id(label, memory["content"])
+        if found_id:
+            return found_id
+    return None
+
+def resolve_from_memory_node(state: ChatState) -> Dict[str, Any]:
+    """Join point: fill in db_result from semantic memory when the message alone was not enough"""
+    if state["db_result"] is not None:
+        return {}
+    
     try:
-        client = Groq(api_key=GROQ_API_KEY)
+        if state["intent"] == "memory_recall":
+            return {"db_result": _memory_recall_result(state)}
         
-        # Build enhanced prompt with memory
-        prompt_parts = [
-            f"User: {state['user_message']}",
-            f"Current Context: {state['db_result']}"
-        ]
+        # No ID in the current message, so check memory
+        label = _memory_lookup_label(state)
+        found_id = _id_from_memory(state, label)
+        if found_id:
+            lookup = _lookup_order if label == "order" else _lookup_product
+            return {"db_result": lookup(found_id)}
+        return {"db_result": {"error": f"No {label} ID found in message or memory."}}
         
-        # Add semantic memory context
+    except Exception as e:
+        return {"db_result": {"error": str(e)}}
+
+def _fallback_response(state: ChatState) -> str:
+    """Enhanced fallback response with memory, used when the LLM call fails"""
+    if state["intent"] == "memory_recall":
         if state["semantic_memory"]:
-            memory_context = "Relevant Past Conversations:\n"
-            for i, memory in enumerate(state["semantic_memory"][:3], 1):
-                memory_context += f"{i}. {memory['content']}\n"
-            prompt_parts.append(memory_context)
-        
-        # Add conversation history
-        if state["conversation_context"]:
-            history_context = "Recent Conversation History:\n"
-            for msg in state["conversation_context"][-5:]:  # Last 5 messages
-                history_context += f"{msg['role']}: {msg['content']}\n"
-            prompt_parts.append(history_context)
-        
-        prompt_parts.append("\nRespond as a helpful e-commerce assistant with memory and personalization. Reference past conversations when relevant.")
-        
-        full_prompt = "\n\n".join(prompt_parts)
+            memory_summary = "Based on our previous conversations, "
+            for memory in state["semantic_memory"][:2]:
+                memory_summary += f"I remember {memory['content']}. "
+            return memory_summary + "How can I help you today?"
+        else:
+            return "I don't have specific memories of our previous conversations, but I'm here to help!"
+    elif state["intent"] == "order_status":
+        if state["db_result"] and "error" not in state["db_result"]:
+            order_info = state["db_result"]
+            return f"Your order #{order_info.get('order_id', 'Unknown')} is currently {order_info.get('status', 'Unknown')}. Created on {order_info.get('created_at', 'Unknown')}."
+        else:
+            return "I couldn't find that order. Please check your order number and try again."
+    elif state["intent"] == "product_info":
+        if state["db_result"] and "error" not in state["db_result"]:
+            product_info = state["db_result"]
+            return f"The product '{product_info.get('name', 'Unknown')}' by {product_info.get('brand', 'Unknown')} is priced at ${product_info.get('retail_price', 'Unknown')}."
+        else:
+            return "I couldn't find that product. Please check the product ID and try again."
+    else:
+        return "I'm here to help with your e-commerce questions! You can ask about order status, product information, or reference our previous conversations."
+
+def _cached_reply(state: ChatState) -> Optional[str]:
+    """Reply from the chat response cache, or None (see chat_cache.py)"""
+    if not CHAT_CACHE_ENABLED:
+        return None
+    key = cache_key(state["intent"], state["entities"], state["user_message"],
+                    state["user_id"], state["session_id"])
+    if key is None:
+        return None
+    return chat_response_cache.get(key, fingerprint(state["db_result"]))
+
+def _cache_reply(state: ChatState):
+    """Remember a successfully generated reply for identical questions about the same row"""
+    if not CHAT_CACHE_ENABLED or state["error"] or not state["ai_response"]:
+        return
+    key = cache_key(state["intent"], state["entities"], state["user_message"],
+                    state["user_id"], state["session_id"])
+    if key is not None:
+        chat_response_cache.set(key, fingerprint(state["db_result"]), state["ai_response"])
+
+def generate_response_node(state: ChatState) -> ChatState:
+    """Enhanced response generation with memory and personalization"""
+    # Repeated questions about an unchanged order/product skip the LLM
+    cached = _cached_reply(state)
+    if cached is not None:
+        get_stream_writer()({"token": cached})
+        state["ai_response"] = cached
+        return state
+    
+    try:
+        client = get_groq_client()
+        full_prompt, state["prompt_tokens"] = build_prompt(state)
         
-        response = client.chat.completions.create(
-            model="mixtral-8x7b-32768",
+        # Stream the completion so token events reach SSE clients as they arrive;
+        # the writer is a no-op when the graph is run with invoke()
+        writer = get_stream_writer()
+        stream = client.chat.completions.create(
+            model=GROQ_MODEL,
             messages=[{"role": "user", "content": full_prompt}],
             max_tokens=512,
-            temperature=0.3
+            temperature=0.3,
+            stream=True
         )
-        state["ai_response"] = response.choices[0].message.content
+        tokens = []
+        for chunk in stream:
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            if token:
+                tokens.append(token)
+                writer({"token": token})
+        state["ai_response"] = "".join(tokens)
+        _cache_reply(state)
         
     except Exception as e:
         state["error"] = f"Groq LLM error: {e}"
-        # Enhanced fallback response with memory
-        if state["intent"] == "memory_recall":
-            if state["semantic_memory"]:
-                memory_summary = "Based on our previous conversations, "
-                for memory in state["semantic_memory"][:2]:
-                    memory_summary += f"I remember {memory['content']}. "
-                state["ai_response"] = memory_summary + "How can I help you today?"
-            else:
-                state["ai_response"] = "I don't have specific memories of our previous conversations, but I'm here to help!"
-        elif state["intent"] == "order_status":
-            if state["db_result"] and "error" not in state["db_result"]:
-                order_info = state["db_result"]
-                state["ai_response"] = f"Your order #{order_info.get('order_id', 'Unknown')} is currently {order_info.get('status', 'Unknown')}. Created on {order_info.get('created_at', 'Unknown')}."
-            else:
-                state["ai_response"] = "I couldn't find that order. Please check your order number and try again."
-        elif state["intent"] == "product_info":
-            if state["db_result"] and "error" not in state["db_result"]:
-                product_info = state["db_result"]
-                state["ai_response"] = f"The product '{product_info.get('name', 'Unknown')}' by {product_info.get('brand', 'Unknown')} is priced at ${product_info.get('retail_price', 'Unknown')}."
-            else:
-                state["ai_response"] = "I couldn't find that product. Please check the product ID and try again."
-        else:
-            state["ai_response"] = "I'm here to help with your e-commerce questions! You can ask about order status, product information, or reference our previous conversations."
+        state["ai_response"] = _fallback_response(state)
     
     return state
 
-def store_memory_node(state: ChatState) -> ChatState:
-    """Store the current interaction in memory"""
+def store_turn_memory(result: dict, session_id: int, user_message_id: int, ai_message_id: int):
+    """Store a saved chat turn in semantic memory (queued for a background write unless disabled).
+
+    Called once the turn is persisted, so entries carry the session and message IDs.
+    """
+    store = memory_write_queue.enqueue if MEMORY_WRITE_BEHIND else memory_service.store_message_memory
     try:
         # Store user message
-        memory_service.store_message_memory(
-            user_id=state["user_id"],
-            session_id=state["session_id"],
-            message_id=0,  # Will be updated by the calling service
-            content=state["user_message"],
+        store(
+            user_id=result["user_id"],
+            session_id=session_id,
+            message_id=user_message_id,
+            content=result["user_message"],
             message_type="user",
-            metadata={"intent": state["intent"]}
+            metadata={"intent": result.get("intent")}
         )
         
-        # Store AI response
-        if state["ai_response"]:
-            memory_service.store_message_memory(
-                user_id=state["user_id"],
-                session_id=state["session_id"],
-                message_id=0,  # Will be updated by the calling service
-                content=state["ai_response"],
+        # Store AI response (a reply cut short by a dropped stream is saved but not remembered)
+        if result.get("ai_response") and not result.get("interrupted"):
+            store(
+                user_id=result["user_id"],
+                session_id=session_id,
+                message_id=ai_message_id,
+                content=result["ai_response"],
                 message_type="ai",
-                metadata={"intent": state["intent"], "db_result": state["db_result"]}
+                metadata={"intent": result.get("intent"), "db_result": result.get("db_result")}
             )
         
     except Exception as e:
         print(f"Error storing memory: {e}")
-        # Don't fail the workflow if memory storage fails
-    
-    return state
+        # Don't fail the turn if memory storage fails
 
-def build_langgraph_workflow():
-    """Build enhanced LangGraph workflow with memory"""
+def _build_graph(nodes: Dict[str, Any]):
+    """Wire the chat graph from a {name: node function} mapping and compile it"""
     graph = StateGraph(ChatState)
     
     # Add nodes
-    graph.add_node("parse_intent", parse_intent_node)
-    graph.add_node("retrieve_memory", retrieve_memory_node)
-    graph.add_node("query_db", query_db_node)
-    graph.add_node("generate_response", generate_response_node)
-    graph.add_node("store_memory", store_memory_node)
+    for name in ("parse_intent", "retrieve_memory", "query_db", "resolve_from_memory",
+                 "generate_response"):
+        graph.add_node(name, nodes[name])
     
     # Add edges
+    # Memory retrieval and the DB query only depend on the message, so they run
+    # in parallel and join before generation
     graph.add_edge("parse_intent", "retrieve_memory")
-    graph.add_edge("retrieve_memory", "query_db")
-    graph.add_edge("query_db", "generate_response")
-    graph.add_edge("generate_response", "store_memory")
-    graph.add_edge("store_memory", END)
+    graph.add_edge("parse_intent", "query_db")
+    graph.add_edge(["retrieve_memory", "query_db"], "resolve_from_memory")
+    graph.add_edge("resolve_from_memory", "generate_response")
+    # The turn is stored in memory by the caller once it is saved (store_turn_memory)
+    graph.add_edge("generate_response", END)
     
     graph.set_entry_point("parse_intent")
     return graph.compile()
 
-def run_langgraph_chat(user_id: int, session_id: int, user_message: str) -> dict:
-    """Run enhanced LangGraph chat with memory"""
-    workflow = build_langgraph_workflow()
-    state = ChatState(
+def build_langgraph_workflow():
+    """Build enhanced LangGraph workflow with memory"""
+    return _build_graph({
+        "parse_intent": parse_intent_node,
+        "retrieve_memory": retrieve_memory_node,
+        "query_db": query_db_node,
+        "resolve_from_memory": resolve_from_memory_node,
+        "generate_response": generate_response_node,
+    })
+
+# Process-wide compiled graph, built once and shared by all request threads.
+# A compiled graph keeps no per-run state, so concurrent invoke() calls are safe.
+_compiled_workflow = None
+_workflow_lock = threading.Lock()
+
+def get_langgraph_workflow():
+    """Return the shared compiled workflow, compiling it on first use"""
+    global _compiled_workflow
+    if _compiled_workflow is None:
+        with _workflow_lock:
+            if _compiled_workflow is None:
+                _compiled_workflow = build_langgraph_workflow()
+    return _compiled_workflow
+
+def warmup_langgraph_workflow() -> float:
+    """Compile the shared workflow ahead of the first request; returns seconds spent"""
+    start = time.perf_counter()
+    get_langgraph_workflow()
+    return time.perf_counter() - start
+
+def _initial_state(user_id: int, session_id: int, user_message: str) -> ChatState:
+    return ChatState(
         user_id=user_id, 
         session_id=session_id, 
         user_message=user_message,
         intent=None,
+        entities=None,
         db_result=None,
         semantic_memory=None,
         conversation_context=None,
+        conversation_summary=None,
+        summary_due=False,
         ai_response=None,
+        prompt_tokens=0,
         error=None
     )
-    result = workflow.invoke(state)
-    return result 
\ No newline at end of file
+
+def run_langgraph_chat(user_id: int, session_id: int, user_message: str) -> dict:
+    """Run enhanced LangGraph chat with memory"""
+    workflow = get_langgraph_workflow()
+    result = workflow.invoke(_initial_state(user_id, session_id, user_message))
+    return result 
+
+def stream_langgraph_chat(user_id: int, session_id: int, user_message: str):
+    """Run the chat workflow and yield (event, data) pairs as results become available.
+
+    Events are emitted in order: 'intent', 'db_result', then one 'token' per
+    streamed completion chunk, and finally 'result' with the full final state.
+    """
+    workflow = get_langgraph_workflow()
+    state = _initial_state(user_id, session_id, user_message)
+    final_state = state
+    intent_sent = db_result_sent = False
+    for mode, chunk in workflow.stream(state, stream_mode=["values", "custom"]):
+        if mode == "custom":
+            yield "token", chunk["token"]
+            continue
+        final_state = chunk
+        if not intent_sent and chunk.get("intent") is not None:
+            intent_sent = True
+            yield "intent", chunk["intent"]
+        if not db_result_sent and chunk.get("db_result") is not None:
+            db_result_sent = True
+            yield "db_result", chunk["db_result"]
+    yield "result", final_state
+
+def interrupted_chat_result(user_id: int, user_message: str, events: Dict[str, Any], tokens: List[str]) -> dict:
+    """Stand-in for the final state of a stream that ended early (client gone or an error).
+
+    events holds the 'intent'/'db_result' payloads streamed so far and tokens the
+    reply chunks, so the turn can be saved with the partial reply.
+    """
+    return {
+        "user_id": user_id,
+        "user_message": user_message,
+        "intent": events.get("intent"),
+        "db_result": events.get("db_result"),
+        "ai_response": "".join(tokens),
+        "error": "Reply interrupted before it was complete",
+        "interrupted": True
+    }
+
+# Async variants of the nodes for the ASGI chat path (asgi_app.py). Database
+# lookups go through aiosqlite and the LLM call through AsyncGroq, so a turn
+# waiting on I/O holds no thread; only the Chroma memory search, which has no
+# async API, runs on the default executor's small thread pool.
+
+async def aparse_intent_node(state: ChatState) -> ChatState:
+    # Pure CPU and microseconds long; an async def keeps LangGraph from
+    # dispatching it to an executor thread
+    return parse_intent_node(state)
+
+async def _aconversation_context(session_id: int):
+    """(summary, recent messages, whether a summary fold is due), as in retrieve_memory_node"""
+    summary, recent_messages, summary_due = plan_context(await AsyncConversationService.get_summary_state(session_id))
+    context = await AsyncChatMessageService.get_conversation_context(session_id, recent_messages=recent_messages)
+    return summary, context, summary_due
+
+async def aretrieve_memory_node(state: ChatState) -> Dict[str, Any]:
+    """Async retrieve_memory_node: semantic search on a worker thread, history via aiosqlite"""
+    try:
+        semantic_memory, (summary, conversation_context, summary_due) = await asyncio.gather(
+            asyncio.to_thread(
+                memory_service.retrieve_relevant_memory,
+                user_id=state["user_id"],
+                session_id=state["session_id"],
+                query=state["user_message"],
+                limit=5
+            ),
+            _aconversation_context(state["session_id"])
+        )
+        return {"semantic_memory": semantic_memory, "conversation_context": conversation_context,
+                "conversation_summary": summary, "summary_due": summary_due}
+        
+    except Exception as e:
+        return {
+            "error": f"Memory retrieval error: {e}",
+            "semantic_memory": [],
+            "conversation_context": []
+        }
+
+async def _alookup_order(order_id: int) -> dict:
+    return await AsyncEcommerceDataService.get_order_status(order_id) or {"error": "Order not found."}
+
+async def _alookup_product(product_id: int) -> dict:
+    result = await AsyncEcommerceDataService.get_product_info([product_id])
+    return result[0] if result else {"error": "Product not found."}
+
+async def aquery_db_node(state: ChatState) -> Dict[str, Any]:
+    """Async query_db_node"""
+    try:
+        if state["intent"] == "order_status":
+            order_id = _first_entity(state, "order")
+            if order_id:
+                return {"db_result": await _alookup_order(order_id)}
+                
+        elif state["intent"] == "product_info":
+            product_id = _first_entity(state, "product")
+            if product_id:
+                return {"db_result": await _alookup_product(product_id)}
+                
+        elif state["intent"] != "memory_recall":
+            return {"db_result": {}}
+            
+    except Exception as e:
+        return {"db_result": {"error": str(e)}}
+    
+    return {}
+
+async def aresolve_from_memory_node(state: ChatState) -> Dict[str, Any]:
+    """Async resolve_from_memory_node"""
+    if state["db_result"] is not None:
+        return {}
+    
+    try:
+        if state["intent"] == "memory_recall":
+            return {"db_result": _memory_recall_result(state)}
+        
+        label = _memory_lookup_label(state)
+        found_id = _id_from_memory(state, label)
+        if found_id:
+            lookup = _alookup_order if label == "order" else _alookup_product
+            return {"db_result": await lookup(found_id)}
+        return {"db_result": {"error": f"No {label} ID found in message or memory."}}
+        
+    except Exception as e:
+        return {"db_result": {"error": str(e)}}
+
+async def agenerate_response_node(state: ChatState) -> ChatState:
+    """Async generate_response_node, streaming the completion from AsyncGroq"""
+    cached = _cached_reply(state)
+    if cached is not None:
+        get_stream_writer()({"token": cached})
+        state["ai_response"] = cached
+        return state
+    
+    try:
+        client = get_async_groq_client()
+        full_prompt, state["prompt_tokens"] = build_prompt(state)
+        
+        writer = get_stream_writer()
+        stream = await client.chat.completions.create(
+            model=GROQ_MODEL,
+            messages=[{"role": "user", "content": full_prompt}],
+            max_tokens=512,
+            temperature=0.3,
+            stream=True
+        )
+        tokens = []
+        async for chunk in stream:
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            if token:
+                tokens.append(token)
+                writer({"token": token})
+        state["ai_response"] = "".join(tokens)
+        _cache_reply(state)
+        
+    except Exception as e:
+        state["error"] = f"Groq LLM error: {e}"
+        state["ai_response"] = _fallback_response(state)
+    
+    return state
+
+async def astore_turn_memory(result: dict, session_id: int, user_message_id: int, ai_message_id: int):
+    """Async store_turn_memory: enqueueing is non-blocking, direct Chroma writes go to a worker thread"""
+    if MEMORY_WRITE_BEHIND:
+        return store_turn_memory(result, session_id, user_message_id, ai_message_id)
+    return await asyncio.to_thread(store_turn_memory, result, session_id, user_message_id, ai_message_id)
+
+def build_async_langgraph_workflow():
+    """Build the chat workflow from the async nodes, for ainvoke()/astream()"""
+    return _build_graph({
+        "parse_intent": aparse_intent_node,
+        "retrieve_memory": aretrieve_memory_node,
+        "query_db": aquery_db_node,
+        "resolve_from_memory": aresolve_from_memory_node,
+        "generate_response": agenerate_response_node,
+    })
+
+_compiled_async_workflow = None
+
+def get_async_langgraph_workflow():
+    """Return the shared compiled async workflow, compiling it on first use"""
+    global _compiled_async_workflow
+    if _compiled_async_workflow is None:
+        with _workflow_lock:
+            if _compiled_async_workflow is None:
+                _compiled_async_workflow = build_async_langgraph_workflow()
+    return _compiled_async_workflow
+
+def warmup_async_langgraph_workflow() -> float:
+    """Compile the shared async workflow ahead of the first request; returns seconds spent"""
+    start = time.perf_counter()
+    get_async_langgraph_workflow()
+    return time.perf_counter() - start
+
+async def arun_langgraph_chat(user_id: int, session_id: int, user_message: str) -> dict:
+    """Async run_langgraph_chat, using the async workflow's ainvoke()"""
+    workflow = get_async_langgraph_workflow()
+    return await workflow.ainvoke(_initial_state(user_id, session_id, user_message))
+
+async def astream_langgraph_chat(user_id: int, session_id: int, user_message: str):
+    """Async stream_langgraph_chat: yields the same (event, data) pairs"""
+    workflow = get_async_langgraph_workflow()
+    state = _initial_state(user_id, session_id, user_message)
+    final_state = state
+    intent_sent = db_result_sent = False
+    async for mode, chunk in workflow.astream(state, stream_mode=["values", "custom"]):
+        if mode == "custom":
+            yield "token", chunk["token"]
+            continue
+        final_state = chunk
+        if not intent_sent and chunk.get("intent") is not None:
+            intent_sent = True
+            yield "intent", chunk["intent"]
+        if not db_result_sent and chunk.get("db_result") is not None:
+            db_result_sent = True
+            yield "db_result", chunk["db_result"]
+    yield "result", final_state
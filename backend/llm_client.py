@@ -0,0 +1,105 @@
+import os
+import threading
+from typing import Optional
+import httpx
+from dotenv import load_dotenv
+from groq import AsyncGroq, Groq
+
+load_dotenv()
+
+# Connection pool, timeout and retry settings for the Groq API (override via env)
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_MODEL = os.getenv("GROQ_MODEL", "mixtral-8x7b-32768")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "30"))
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "2"))
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+GROQ_MAX_KEEPALIVE = int(os.getenv("GROQ_MAX_KEEPALIVE", "10"))
+GROQ_KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "60"))
+# Async connections don't pin a thread each, so the async pool can be much larger
+GROQ_ASYNC_MAX_CONNECTIONS = int(os.getenv("GROQ_ASYNC_MAX_CONNECTIONS", "200"))
+
+def _http_client_options(timeout: float, max_connections: int, max_keepalive: Optional[int]) -> dict:
+    """Timeout and pool settings shared by the sync and async HTTP clients"""
+    return {
+        "timeout": httpx.Timeout(timeout, connect=min(GROQ_CONNECT_TIMEOUT, timeout)),
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive or GROQ_MAX_KEEPALIVE,
+            keepalive_expiry=GROQ_KEEPALIVE_EXPIRY
+        )
+    }
+
+def create_groq_client(api_key: Optional[str] = None, base_url: Optional[str] = None,
+                       timeout: Optional[float] = None, max_retries: Optional[int] = None,
+                       max_connections: Optional[int] = None,
+                       max_keepalive: Optional[int] = None) -> Groq:
+    """Create a Groq client backed by a keep-alive HTTP connection pool.
+
+    Retries use the SDK's built-in exponential backoff (max_retries attempts).
+    """
+    timeout = GROQ_TIMEOUT if timeout is None else timeout
+    http_client = httpx.Client(**_http_client_options(timeout, max_connections or GROQ_MAX_CONNECTIONS, max_keepalive))
+    return Groq(
+        api_key=api_key or GROQ_API_KEY,
+        base_url=base_url or GROQ_BASE_URL,
+        timeout=timeout,
+        max_retries=GROQ_MAX_RETRIES if max_retries is None else max_retries,
+        http_client=http_client
+    )
+
+def create_async_groq_client(api_key: Optional[str] = None, base_url: Optional[str] = None,
+                             timeout: Optional[float] = None, max_retries: Optional[int] = None,
+                             max_connections: Optional[int] = None,
+                             max_keepalive: Optional[int] = None) -> AsyncGroq:
+    """AsyncGroq counterpart of create_groq_client for the ASGI chat path"""
+    timeout = GROQ_TIMEOUT if timeout is None else timeout
+    http_client = httpx.AsyncClient(
+        **_http_client_options(timeout, max_connections or GROQ_ASYNC_MAX_CONNECTIONS, max_keepalive))
+    return AsyncGroq(
+        api_key=api_key or GROQ_API_KEY,
+        base_url=base_url or GROQ_BASE_URL,
+        timeout=timeout,
+        max_retries=GROQ_MAX_RETRIES if max_retries is None else max_retries,
+        http_client=http_client
+    )
+
+# Process-wide client shared by all chat turns so connections (and TLS sessions) are reused
+_groq_client: Optional[Groq] = None
+_client_lock = threading.Lock()
+
+def get_groq_client() -> Groq:
+    """Return the shared Groq client, creating it on first use"""
+    global _groq_client
+    if _groq_client is None:
+        with _client_lock:
+            if _groq_client is None:
+                _groq_client = create_groq_client()
+    return _groq_client
+
+def set_groq_client(client: Optional[Groq]) -> Optional[Groq]:
+    """Replace the shared client (e.g. with one pointing at a stub server); returns the previous one"""
+    global _groq_client
+    with _client_lock:
+        previous, _groq_client = _groq_client, client
+    return previous
+
+# Shared async client; its connections belong to the event loop that first uses it
+_async_groq_client: Optional[AsyncGroq] = None
+
+def get_async_groq_client() -> AsyncGroq:
+    """Return the shared AsyncGroq client, creating it on first use"""
+    global _async_groq_client
+    if _async_groq_client is None:
+        with _client_lock:
+            if _async_groq_client is None:
+                _async_groq_client = create_async_groq_client()
+    return _async_groq_client
+
+def set_async_groq_client(client: Optional[AsyncGroq]) -> Optional[AsyncGroq]:
+    """Replace the shared async client; returns the previous one (close it with `await previous.close()`)"""
+    global _async_groq_client
+    with _client_lock:
+        previous, _async_groq_client = _async_groq_client, client
+    return previous
@@ -1,53 +1,328 @@
-import pandas as pd
-import sqlite3
+import argparse
+import hashlib
 import os
-from datetime import datetime
-
-def load_csv_to_sqlite():
-    """Load CSV files from dataset directory into SQLite database"""
-    
-    # Connect to SQLite database
-    conn = sqlite3.connect('ecommerce.db')
-    
-    # Path to dataset directory
-    dataset_path = '../dataset'
-    
-    # List of CSV files to load
-    csv_files = [
-        'users.csv',
-        'distribution_centers.csv', 
-        'products.csv',
-        'inventory_items.csv',
-        'orders.csv',
-        'order_items.csv'
-    ]
-    
-    for csv_file in csv_files:
-        file_path = os.path.join(dataset_path, csv_file)
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+import pandas as pd
+from sqlalchemy import Integer, Float, DateTime, Boolean, create_engine
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateTable, CreateIndex
+from models import User, DistributionCenter, Product, InventoryItem, Order, OrderItem, IngestWatermark, IngestRowHash, CatalogVersion
+from search_index import ensure_product_search_index
+
+# CSV files and the ORM tables they load into, in load order
+CSV_TABLES = [
+    ('users.csv', User.__table__),
+    ('distribution_centers.csv', DistributionCenter.__table__),
+    ('products.csv', Product.__table__),
+    ('inventory_items.csv', InventoryItem.__table__),
+    ('orders.csv', Order.__table__),
+    ('order_items.csv', OrderItem.__table__)
+]
+
+DEFAULT_CHUNKSIZE = 50000
+# Parsed chunks buffered per file; bounds memory while the writer catches up
+QUEUE_DEPTH = 4
+# Primary keys looked up per query when comparing row hashes
+HASH_LOOKUP_BATCH = 500
+# Timezone suffix on exported timestamps ("2023-02-01 00:00:00 UTC"), which ISO8601 parsing rejects
+UTC_SUFFIX = r'\s*UTC$'
+
+def _csv_dtypes(table):
+    """Explicit pandas dtypes for a table's columns (datetimes are parsed separately)"""
+    dtypes = {}
+    for column in table.columns:
+        if isinstance(column.type, (Integer, Boolean)):
+            dtypes[column.name] = 'Int64'
+        elif isinstance(column.type, Float):
+            dtypes[column.name] = 'float64'
+        else:
+            dtypes[column.name] = str
+    return dtypes
+
+def _to_rows(df, datetime_columns, file_path=None):
+    """Convert a parsed chunk into DB-API tuples with SQLAlchemy's SQLite datetime format.
+
+    Timestamps may carry a trailing " UTC" ("2023-02-01 00:00:00 UTC"); values
+    that still don't parse are stored as NULL and counted in a warning.
+    """
+    for col in datetime_columns:
+        values = df[col].str.replace(UTC_SUFFIX, '', regex=True)
+        parsed = pd.to_datetime(values, errors='coerce', utc=True, format='ISO8601').dt.tz_convert(None)
+        unparsed = int((parsed.isna() & values.notna()).sum())
+        if unparsed:
+            print(f"Warning: {unparsed} unparseable {col} values in {file_path or 'chunk'} stored as NULL")
+        df[col] = parsed.dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+    df = df.astype(object).where(df.notna(), None)
+    return list(df.itertuples(index=False, name=None))
+
+def _row_hash(row) -> int:
+    """Stable 64-bit content hash of a row, as a signed SQLite integer"""
+    return int.from_bytes(hashlib.blake2b(repr(row).encode(), digest_size=8).digest(), 'big', signed=True)
+
+def parse_csv(file_path, columns, dtypes, datetime_columns, chunksize, out_queue):
+    """Worker: stream a CSV in chunks and put (rows, row_hashes) lists on out_queue.
+
+    Only the table's columns are read; a final None marks the end of the file.
+    """
+    try:
+        header = pd.read_csv(file_path, nrows=0).columns
+        usecols = [col for col in columns if col in header]
+        for chunk in pd.read_csv(file_path, usecols=usecols, dtype={c: dtypes[c] for c in usecols},
+                                 chunksize=chunksize):
+            chunk = chunk.reindex(columns=columns)
+            rows = _to_rows(chunk, [c for c in datetime_columns if c in usecols], file_path)
+            out_queue.put((rows, [_row_hash(row) for row in rows]))
+    except Exception as e:
+        out_queue.put(e)
+    out_queue.put(None)
+
+def _ddl(element) -> str:
+    return str(element.compile(dialect=sqlite.dialect()))
+
+def _create_table(conn, table):
+    """Recreate a table from its model definition, without its indexes"""
+    conn.execute(f'DROP TABLE IF EXISTS "{table.name}"')
+    conn.execute(_ddl(CreateTable(table)))
+
+def _create_indexes(conn, table):
+    for index in table.indexes:
+        conn.execute(_ddl(CreateIndex(index)).replace(
+            'CREATE INDEX', 'CREATE INDEX IF NOT EXISTS', 1).replace(
+            'CREATE UNIQUE INDEX', 'CREATE UNIQUE INDEX IF NOT EXISTS', 1))
+
+def _ensure_metadata_tables(conn):
+    for table in (IngestWatermark.__table__, IngestRowHash.__table__, CatalogVersion.__table__):
+        conn.execute(_ddl(CreateTable(table, if_not_exists=True)))
+
+def _bump_catalog_version(conn):
+    """Tell running API processes that cached catalog responses are stale"""
+    conn.execute(
+        'INSERT INTO CatalogVersion (id, version, updated_at) VALUES (1, 1, ?) '
+        'ON CONFLICT(id) DO UPDATE SET version=version + 1, updated_at=excluded.updated_at',
+        (time.strftime('%Y-%m-%d %H:%M:%S.000000', time.gmtime()),)
+    )
+
+def _file_stat(file_path):
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime
+
+def _save_watermark(conn, csv_file, table, file_path, rows_seen, rows_changed):
+    size, mtime = _file_stat(file_path)
+    conn.execute(
+        'INSERT INTO IngestWatermark (file_name, table_name, file_size, file_mtime, rows_seen, rows_changed, loaded_at) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?) '
+        'ON CONFLICT(file_name) DO UPDATE SET table_name=excluded.table_name, file_size=excluded.file_size, '
+        'file_mtime=excluded.file_mtime, rows_seen=excluded.rows_seen, rows_changed=excluded.rows_changed, '
+        'loaded_at=excluded.loaded_at',
+        (csv_file, table.name, size, mtime, rows_seen, rows_changed,
+         time.strftime('%Y-%m-%d %H:%M:%S.000000', time.gmtime()))
+    )
+
+def _is_unchanged(conn, csv_file, file_path) -> bool:
+    watermark = conn.execute('SELECT file_size, file_mtime FROM IngestWatermark WHERE file_name = ?',
+                             (csv_file,)).fetchone()
+    return watermark is not None and tuple(watermark) == _file_stat(file_path)
+
+def _iter_parsed(files, dataset_path, workers, chunksize):
+    """Parse files in a process pool; yield (csv_file, table, chunks) in order.
+
+    chunks yields (rows, row_hashes) per parsed chunk and must be fully consumed
+    before moving on to the next file.
+    """
+    # The manager is shut down first on exit, which unblocks any worker still
+    # waiting on a full queue if the consumer stopped early
+    with ProcessPoolExecutor(max_workers=workers) as pool, Manager() as manager:
+        # Submit in load order so the table being written is always being parsed
+        queues = []
+        for csv_file, table in files:
+            columns = [column.name for column in table.columns]
+            datetime_columns = [column.name for column in table.columns if isinstance(column.type, DateTime)]
+            out_queue = manager.Queue(maxsize=QUEUE_DEPTH)
+            pool.submit(parse_csv, os.path.join(dataset_path, csv_file), columns,
+                        _csv_dtypes(table), datetime_columns, chunksize, out_queue)
+            queues.append(out_queue)
         
+        for (csv_file, table), out_queue in zip(files, queues):
+            yield csv_file, table, _drain(out_queue)
+
+def _drain(out_queue):
+    while (chunk := out_queue.get()) is not None:
+        if isinstance(chunk, Exception):
+            raise chunk
+        yield chunk
+
+def _insert_sql(table, upsert: bool = False) -> str:
+    columns = [column.name for column in table.columns]
+    sql = (f'INSERT INTO "{table.name}" ({", ".join(columns)}) '
+           f'VALUES ({", ".join("?" for _ in columns)})')
+    if upsert:
+        key = table.primary_key.columns.values()[0].name
+        updates = ", ".join(f"{col}=excluded.{col}" for col in columns if col != key)
+        sql += f" ON CONFLICT({key}) DO UPDATE SET {updates}"
+    return sql
+
+def _existing_hashes(conn, table_name, row_ids):
+    """Stored row hashes for the given primary keys"""
+    hashes = {}
+    for i in range(0, len(row_ids), HASH_LOOKUP_BATCH):
+        batch = row_ids[i:i + HASH_LOOKUP_BATCH]
+        hashes.update(conn.execute(
+            f'SELECT row_id, row_hash FROM IngestRowHash WHERE table_name = ? '
+            f'AND row_id IN ({", ".join("?" for _ in batch)})',
+            [table_name, *batch]
+        ).fetchall())
+    return hashes
+
+def _missing_files(dataset_path):
+    files = []
+    for csv_file, table in CSV_TABLES:
+        file_path = os.path.join(dataset_path, csv_file)
         if os.path.exists(file_path):
-            print(f"Loading {csv_file}...")
-            
-            # Read CSV file
-            df = pd.read_csv(file_path)
-            
-            # Convert datetime columns
-            datetime_columns = ['created_at', 'sold_at', 'shipped_at', 'delivered_at', 'returned_at']
-            for col in datetime_columns:
-                if col in df.columns:
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-            
-            # Determine table name based on CSV filename
-            table_name = csv_file.replace('.csv', '')
-            
-            # Load data into SQLite
-            df.to_sql(table_name, conn, if_exists='replace', index=False)
-            print(f"Loaded {len(df)} rows into {table_name} table")
+            files.append((csv_file, table))
         else:
             print(f"Warning: {file_path} not found")
-    
+    return files
+
+def load_csv_to_sqlite(db_path='ecommerce.db', dataset_path='../dataset',
+                       workers=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Bulk load the dataset CSVs into the ORM tables defined in models.py.
+
+    Files are parsed in chunks by a process pool while this process writes each
+    table with executemany inside a single transaction. The load runs in WAL mode
+    with synchronous=NORMAL (no fsync per commit, but a failed table still rolls
+    back cleanly) and indexes are built once the data is in. Row hashes and file
+    watermarks are recorded so later runs can use incremental mode.
+    """
+    start = time.perf_counter()
+    files = _missing_files(dataset_path)
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+    synchronous = conn.execute('PRAGMA synchronous').fetchone()[0]
+    # Journaling stays on: each table is replaced in one transaction that must be
+    # able to roll back, and WAL appends its pages sequentially
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+
+    try:
+        _ensure_metadata_tables(conn)
+        for csv_file, table, chunks in _iter_parsed(files, dataset_path, workers, chunksize):
+            print(f"Loading {csv_file}...")
+            insert_sql = _insert_sql(table)
+
+            key_index = [column.name for column in table.columns].index(
+                table.primary_key.columns.values()[0].name)
+            row_count = 0
+            conn.execute('BEGIN')
+            try:
+                _create_table(conn, table)
+                conn.execute('DELETE FROM IngestRowHash WHERE table_name = ?', (table.name,))
+                for rows, row_hashes in chunks:
+                    conn.executemany(insert_sql, rows)
+                    conn.executemany(
+                        'INSERT INTO IngestRowHash (table_name, row_id, row_hash) VALUES (?, ?, ?)',
+                        [(table.name, row[key_index], row_hash) for row, row_hash in zip(rows, row_hashes)]
+                    )
+                    row_count += len(rows)
+                _save_watermark(conn, csv_file, table, os.path.join(dataset_path, csv_file), row_count, row_count)
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+            print(f"Loaded {row_count} rows into {table.name} table")
+
+        print("Creating indexes...")
+        for _, table in files:
+            _create_indexes(conn, table)
+    finally:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.execute(f'PRAGMA journal_mode={journal_mode}')
+        conn.execute(f'PRAGMA synchronous={synchronous}')
+        conn.close()
+
+    # Product was recreated, so its full-text index and triggers need rebuilding
+    engine = create_engine(f'sqlite:///{db_path}')
+    ensure_product_search_index(engine, rebuild=True)
+    engine.dispose()
+
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    _bump_catalog_version(conn)
     conn.close()
-    print("Data loading completed!")
+
+    print(f"Data loading completed in {time.perf_counter() - start:.1f}s!")
+
+def load_csv_incremental(db_path='ecommerce.db', dataset_path='../dataset',
+                         workers=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Apply only new or changed CSV rows to the database.
+
+    Files whose size and mtime match their watermark are skipped. For the rest,
+    each row's content hash is compared with the stored hash for its primary key
+    and only differing rows are written with INSERT ... ON CONFLICT DO UPDATE.
+    Every chunk commits separately, keeping write locks short while the API
+    keeps reading. Rows removed from a CSV are not deleted.
+    """
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    try:
+        _ensure_metadata_tables(conn)
+        files = []
+        for csv_file, table in _missing_files(dataset_path):
+            if _is_unchanged(conn, csv_file, os.path.join(dataset_path, csv_file)):
+                print(f"Skipping {csv_file} (unchanged since last load)")
+            else:
+                files.append((csv_file, table))
+
+        total_changed = 0
+        for csv_file, table, chunks in _iter_parsed(files, dataset_path, workers, chunksize):
+            print(f"Updating {table.name} from {csv_file}...")
+            conn.execute(_ddl(CreateTable(table, if_not_exists=True)))
+            _create_indexes(conn, table)
+            upsert_sql = _insert_sql(table, upsert=True)
+            key_index = [column.name for column in table.columns].index(
+                table.primary_key.columns.values()[0].name)
+
+            rows_seen = rows_changed = 0
+            for rows, row_hashes in chunks:
+                rows_seen += len(rows)
+                stored = _existing_hashes(conn, table.name, [row[key_index] for row in rows])
+                changed = [(row, row_hash) for row, row_hash in zip(rows, row_hashes)
+                           if stored.get(row[key_index]) != row_hash]
+                if not changed:
+                    continue
+                conn.execute('BEGIN')
+                conn.executemany(upsert_sql, [row for row, _ in changed])
+                conn.executemany(
+                    'INSERT INTO IngestRowHash (table_name, row_id, row_hash) VALUES (?, ?, ?) '
+                    'ON CONFLICT(table_name, row_id) DO UPDATE SET row_hash=excluded.row_hash',
+                    [(table.name, row[key_index], row_hash) for row, row_hash in changed]
+                )
+                conn.execute('COMMIT')
+                rows_changed += len(changed)
+
+            _save_watermark(conn, csv_file, table, os.path.join(dataset_path, csv_file), rows_seen, rows_changed)
+            print(f"Applied {rows_changed} new/changed rows of {rows_seen} to {table.name}")
+            total_changed += rows_changed
+
+        if total_changed:
+            _bump_catalog_version(conn)
+    finally:
+        conn.close()
+
+    print(f"Incremental load completed in {time.perf_counter() - start:.1f}s!")
 
 if __name__ == "__main__":
-    load_csv_to_sqlite() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Bulk load the e-commerce CSV dataset into SQLite")
+    parser.add_argument('--db', default='ecommerce.db', help='SQLite database file')
+    parser.add_argument('--dataset', default='../dataset', help='directory containing the CSV files')
+    parser.add_argument('--workers', type=int, default=None, help='parser processes (default: CPU count)')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='rows per parsed chunk')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only apply new/changed rows instead of replacing the tables')
+    args = parser.parse_args()
+    if args.incremental:
+        load_csv_incremental(args.db, args.dataset, args.workers, args.chunksize)
+    else:
+        load_csv_to_sqlite(args.db, args.dataset, args.workers, args.chunksize)
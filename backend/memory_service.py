@@ -1,39 +1,161 @@
 import os
 import json
+import queue
+import threading
+import atexit
+import calendar
+import time
+import uuid
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import numpy as np
+import re
+from embeddings import CachedEmbedder, HashEmbeddingBackend, create_embedder
 from services import ChatMessageService
 from models import ChatMessage, ConversationSession
 
+# Memories are stored in time buckets: one Chroma collection per
+# MEMORY_BUCKET_DAYS window, named <collection>_<window start>_<days>d. Expiry
+# drops whole buckets; only the bucket straddling the cutoff is trimmed entry
+# by entry.
+MEMORY_BUCKET_DAYS = int(os.getenv("MEMORY_BUCKET_DAYS", "30"))
+MEMORY_RETENTION_DAYS = int(os.getenv("MEMORY_RETENTION_DAYS", "30"))
+# Entries deleted per page when trimming a bucket (ids only, no documents fetched)
+MEMORY_CLEANUP_PAGE_SIZE = int(os.getenv("MEMORY_CLEANUP_PAGE_SIZE", "500"))
+# Retrieval looks at memories from the last MEMORY_SEARCH_DAYS days (0: the whole
+# retention period) and queries at most MEMORY_SEARCH_BUCKETS buckets, newest first
+MEMORY_SEARCH_DAYS = int(os.getenv("MEMORY_SEARCH_DAYS", "14"))
+MEMORY_SEARCH_BUCKETS = int(os.getenv("MEMORY_SEARCH_BUCKETS", "2"))
+
+def _collection_names(client) -> List[str]:
+    # chromadb < 0.6 returns Collection objects, newer versions return names
+    return [c if isinstance(c, str) else c.name for c in client.list_collections()]
+
 class SemanticMemoryService:
     """Service for managing semantic memory using ChromaDB"""
     
-    def __init__(self):
+    def __init__(self, embedder: Optional[CachedEmbedder] = None, path: str = "./chroma_db",
+                 bucket_days: int = MEMORY_BUCKET_DAYS):
         # Initialize ChromaDB client
         self.client = chromadb.PersistentClient(
-            path="./chroma_db",
+            path=path,
             settings=Settings(anonymized_telemetry=False)
         )
         
-        # Create collections for different types of memory
-        self.user_memory_collection = self.client.get_or_create_collection(
-            name="user_memory",
-            metadata={"description": "User conversation memory"}
-        )
-        
-        self.session_memory_collection = self.client.get_or_create_collection(
-            name="session_memory", 
-            metadata={"description": "Session-specific memory"}
-        )
+        # Embedding backend (sentence-transformers by default, see embeddings.create_embedder)
+        self.embedder = embedder or create_embedder()
         
         # Memory expiration settings (in days)
-        self.memory_expiry_days = 30
+        self.memory_expiry_days = MEMORY_RETENTION_DAYS
+        
+        # Each time bucket holds the memories of all users; user and session scopes are metadata filters
+        self.bucket_days = bucket_days
+        base_name = self._collection_name("memory")
+        self._bucket_prefix = base_name[:50].rstrip("-_.")
+        self._bucket_pattern = re.compile(rf"^{re.escape(self._bucket_prefix)}_(\d{{8}})_(\d+)d$")
+        self._buckets = {}  # name -> (start timestamp, end timestamp, collection)
+        self._buckets_lock = threading.Lock()
+        names = _collection_names(self.client)
+        for name in names:
+            bucket_range = self._bucket_range(name)
+            if bucket_range:
+                self._buckets[name] = (*bucket_range, self.client.get_collection(name))
+        # Collection from before time bucketing: still searched (within the retention
+        # period) and trimmed by cleanup until it is empty or wholly expired, then dropped
+        self.legacy_collection = self.client.get_collection(base_name) if base_name in names else None
+        # New entries go to buckets, so the legacy collection ages like a bucket ending at its newest entry
+        self._legacy_end = self._legacy_collection_end() if self.legacy_collection is not None else 0.0
+        self.search_days = MEMORY_SEARCH_DAYS
+        self.search_buckets = MEMORY_SEARCH_BUCKETS
         
+    def _collection_name(self, base: str) -> str:
+        """Collection name for the active embedding model.
+
+        Vectors from different models are not comparable (nor the same size), so
+        each model gets its own collection; hash embeddings use the plain base name.
+        """
+        if self.embedder.name == HashEmbeddingBackend.name:
+            return base
+        model_slug = re.sub(r"[^a-zA-Z0-9._-]", "-", self.embedder.name.split("/")[-1])
+        return f"{base}_{model_slug}"[:63].rstrip("-_.")
+    
+    def _bucket_range(self, name: str) -> Optional[Tuple[float, float]]:
+        """(start, end) timestamps of a bucket collection, or None for other collections"""
+        match = self._bucket_pattern.match(name)
+        if not match:
+            return None
+        start = calendar.timegm(time.strptime(match.group(1), "%Y%m%d"))
+        return start, start + int(match.group(2)) * 86400
+    
+    def _bucket_collection(self, timestamp: float) -> Tuple[str, Any]:
+        """(name, collection) of the bucket for entries created at timestamp, created on first use"""
+        width = self.bucket_days * 86400
+        start = timestamp - timestamp % width
+        name = f"{self._bucket_prefix}_{datetime.utcfromtimestamp(start):%Y%m%d}_{self.bucket_days}d"
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            with self._buckets_lock:
+                bucket = self._buckets.get(name)
+                if bucket is None:
+                    collection = self.client.get_or_create_collection(
+                        name=name,
+                        metadata={"description": "Conversation memory scoped by user_id/session_id metadata",
+                                  "embedding_model": self.embedder.name,
+                                  "bucket_start": start, "bucket_end": start + width}
+                    )
+                    bucket = self._buckets[name] = (start, start + width, collection)
+        return name, bucket[2]
+    
+    def _legacy_collection_end(self) -> float:
+        """Timestamp just past the newest entry of the pre-bucketing collection.
+
+        Found by paging through its metadata on first use and kept in the
+        collection's own metadata, so later starts read it directly.
+        """
+        metadata = dict(self.legacy_collection.metadata or {})
+        if "bucket_end" in metadata:
+            return float(metadata["bucket_end"])
+        newest, offset = 0.0, 0
+        while True:
+            page = self.legacy_collection.get(limit=MEMORY_CLEANUP_PAGE_SIZE, offset=offset, include=["metadatas"])
+            if not page['ids']:
+                break
+            newest = max([newest] + [entry.get("timestamp", 0.0) for entry in page['metadatas']])
+            offset += len(page['ids'])
+        end = newest + 1 if newest else 0.0
+        self.legacy_collection.modify(metadata={**metadata, "bucket_end": end})
+        return end
+    
+    def _retention_cutoff(self, days: Optional[int] = None) -> float:
+        if days is None:
+            days = self.memory_expiry_days
+        return (datetime.utcnow() - timedelta(days=days)).timestamp()
+    
+    def _live_collections(self, cutoff: float, max_buckets: int = 0) -> List[Tuple[Any, bool]]:
+        """(collection, needs a timestamp filter) for the buckets with entries newer than cutoff,
+        newest first, at most max_buckets of them (0: all)"""
+        with self._buckets_lock:
+            buckets = list(self._buckets.values())
+        if self.legacy_collection is not None:
+            buckets.append((0.0, self._legacy_end, self.legacy_collection))
+        buckets.sort(key=lambda bucket: bucket[1], reverse=True)
+        live = [(collection, start < cutoff) for start, end, collection in buckets if end > cutoff]
+        return live[:max_buckets] if max_buckets else live
+    
+    @staticmethod
+    def _live_filter(where: Dict[str, Any], cutoff: float, straddles_cutoff: bool) -> Dict[str, Any]:
+        """Add the retention cutoff to a where filter for buckets that may hold expired entries"""
+        if not straddles_cutoff:
+            return where
+        return {"$and": [where, {"timestamp": {"$gte": cutoff}}]}
+    
     def _generate_embedding_id(self, user_id: int, session_id: int, message_id: int) -> str:
         """Generate unique ID for embedding"""
+        if not message_id:
+            # Messages stored before they have a DB id still need distinct IDs
+            return f"user_{user_id}_session_{session_id}_msg_{uuid.uuid4().hex}"
         return f"user_{user_id}_session_{session_id}_msg_{message_id}"
     
     def _create_memory_metadata(self, user_id: int, session_id: int, message_type: str, 
@@ -45,110 +167,92 @@ class SemanticMemoryService:
             "message_type": message_type,
             "created_at": created_at.isoformat(),
             "timestamp": created_at.timestamp(),
-            **(metadata or {})
+            # Chroma only accepts scalar metadata values, so nested data is stored as JSON
+            **{key: value if value is None or isinstance(value, (str, int, float, bool)) else json.dumps(value, default=str)
+               for key, value in (metadata or {}).items()}
         }
     
     def store_message_memory(self, user_id: int, session_id: int, message_id: int,
                            content: str, message_type: str, metadata: Optional[Dict] = None) -> bool:
         """Store a message in semantic memory"""
+        return self.store_memory_batch([{
+            "user_id": user_id,
+            "session_id": session_id,
+            "message_id": message_id,
+            "content": content,
+            "message_type": message_type,
+            "metadata": metadata
+        }]) == 1
+    
+    def store_memory_batch(self, entries: List[Dict[str, Any]]) -> int:
+        """Store several messages with a single add(); returns the number stored.
+
+        Each entry has the keyword arguments of store_message_memory.
+        """
+        if not entries:
+            return 0
         try:
-            # Generate embedding using a simple text embedding (you can replace with better embeddings)
-            embedding = self._generate_simple_embedding(content)
+            now = datetime.utcnow()
+            documents, metadatas, ids = [], [], []
+            for entry in entries:
+                documents.append(entry["content"])
+                metadatas.append(self._create_memory_metadata(
+                    entry["user_id"], entry["session_id"], entry["message_type"],
+                    entry.get("created_at") or now, entry.get("metadata")
+                ))
+                ids.append(self._generate_embedding_id(entry["user_id"], entry["session_id"], entry.get("message_id")))
             
-            # Create unique ID
-            embedding_id = self._generate_embedding_id(user_id, session_id, message_id)
+            # Encode the whole batch at once
+            embeddings = self.embedder.embed(documents)
             
-            # Create metadata
-            memory_metadata = self._create_memory_metadata(
-                user_id, session_id, message_type, datetime.utcnow(), metadata
-            )
-            
-            # Store in both collections
-            self.user_memory_collection.add(
-                embeddings=[embedding],
-                documents=[content],
-                metadatas=[memory_metadata],
-                ids=[embedding_id]
-            )
+            # One add() per time bucket (a single one unless entries carry their own created_at)
+            by_bucket = {}
+            for i, metadata in enumerate(metadatas):
+                name, collection = self._bucket_collection(metadata["timestamp"])
+                by_bucket.setdefault(name, (collection, []))[1].append(i)
+            for collection, rows in by_bucket.values():
+                collection.add(
+                    embeddings=[embeddings[i] for i in rows],
+                    documents=[documents[i] for i in rows],
+                    metadatas=[metadatas[i] for i in rows],
+                    ids=[ids[i] for i in rows]
+                )
             
-            self.session_memory_collection.add(
-                embeddings=[embedding],
-                documents=[content],
-                metadatas=[memory_metadata],
-                ids=[f"session_{embedding_id}"]
-            )
-            
-            return True
+            return len(entries)
             
         except Exception as e:
             print(f"Error storing memory: {e}")
-            return False
-    
-    def _generate_simple_embedding(self, text: str) -> List[float]:
-        """Generate a simple embedding (placeholder - replace with proper embedding model)"""
-        # This is a simple hash-based embedding for demonstration
-        # In production, use a proper embedding model like sentence-transformers
-        import hashlib
-        hash_obj = hashlib.md5(text.encode())
-        hash_bytes = hash_obj.digest()
-        
-        # Convert to 128-dimensional vector
-        embedding = []
-        for i in range(0, len(hash_bytes), 4):
-            chunk = hash_bytes[i:i+4]
-            value = int.from_bytes(chunk, byteorder='big')
-            embedding.append(value / 2**32)  # Normalize to [0, 1]
-        
-        # Pad or truncate to 128 dimensions
-        while len(embedding) < 128:
-            embedding.append(0.0)
-        embedding = embedding[:128]
-        
-        return embedding
+            return 0
     
     def retrieve_relevant_memory(self, user_id: int, session_id: int, query: str, 
                                limit: int = 5) -> List[Dict[str, Any]]:
         """Retrieve relevant memory based on semantic similarity"""
         try:
             # Generate embedding for query
-            query_embedding = self._generate_simple_embedding(query)
+            query_embedding = self.embedder.embed_one(query)
             
-            # Query user memory
-            user_results = self.user_memory_collection.query(
-                query_embeddings=[query_embedding],
-                n_results=limit,
-                where={"user_id": user_id}
-            )
-            
-            # Query session memory
-            session_results = self.session_memory_collection.query(
-                query_embeddings=[query_embedding],
-                n_results=limit,
-                where={"session_id": session_id}
-            )
-            
-            # Combine and deduplicate results
+            # One query per recent time bucket over the user's memories covers both scopes;
+            # entries from the current session are labelled as session memory and ranked alongside
+            days = self.memory_expiry_days
+            if self.search_days:
+                days = min(days, self.search_days)
+            cutoff = self._retention_cutoff(days)
             all_memories = []
-            
-            # Process user memories
-            if user_results['documents']:
-                for i, doc in enumerate(user_results['documents'][0]):
-                    all_memories.append({
-                        'content': doc,
-                        'metadata': user_results['metadatas'][0][i],
-                        'distance': user_results['distances'][0][i],
-                        'source': 'user_memory'
-                    })
-            
-            # Process session memories
-            if session_results['documents']:
-                for i, doc in enumerate(session_results['documents'][0]):
-                    all_memories.append({
-                        'content': doc,
-                        'metadata': session_results['metadatas'][0][i],
-                        'distance': session_results['distances'][0][i],
-                        'source': 'session_memory'
-                    })
+            for collection, straddles_cutoff in self._live_collections(cutoff, self.search_buckets):
+                results = collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=limit,
+                    where=self._live_filter({"user_id": user_id}, cutoff, straddles_cutoff)
+                )
+                if results['documents']:
+                    for i, doc in enumerate(results['documents'][0]):
+                        metadata = results['metadatas'][0][i]
+                        all_memories.append({
+                            'content': doc,
+                            'metadata': metadata,
+                            'distance': results['distances'][0][i],
+                            'source': 'session_memory' if metadata.get('session_id') == session_id else 'user_memory'
+                        })
             
             # Sort by relevance (lower distance = more relevant)
             all_memories.sort(key=lambda x: x['distance'])
@@ -171,79 +275,279 @@ class SemanticMemoryService:
     
     def get_conversation_context(self, user_id: int, session_id: int, 
                                recent_messages: int = 10) -> List[Dict[str, Any]]:
-        """Get recent conversation context for the session"""
+        """Get the session's last recent_messages messages, oldest first"""
         try:
-            # Get recent messages from database
-            recent_messages = ChatMessageService.get_recent_messages(session_id, recent_messages)
-            
-            context = []
-            for msg in recent_messages:
-                context.append({
-                    'role': msg.message_type,
-                    'content': msg.content,
-                    'timestamp': msg.created_at.isoformat(),
-                    'metadata': json.loads(msg.message_metadata) if msg.message_metadata else {}
-                })
-            
-            return context
+            return ChatMessageService.get_context_window(session_id, recent_messages)
             
         except Exception as e:
             print(f"Error getting conversation context: {e}")
             return []
     
-    def cleanup_expired_memory(self, days: Optional[int] = None) -> int:
-        """Remove old memory entries"""
-        try:
-            expiry_days = days or self.memory_expiry_days
-            cutoff_time = datetime.utcnow() - timedelta(days=expiry_days)
-            cutoff_timestamp = cutoff_time.timestamp()
-            
-            # Get old entries from both collections
-            old_user_memories = self.user_memory_collection.get(
-                where={"timestamp": {"$lt": cutoff_timestamp}}
-            )
+    def cleanup_expired_memory(self, days: Optional[int] = None, progress=None) -> int:
+        """Remove memory entries older than the retention period; returns how many were removed.
+
+        Buckets that ended before the cutoff are dropped whole. The bucket straddling
+        it (and the pre-bucketing collection) are trimmed in pages of ids, without
+        fetching documents. progress, if given, is called with a status dict after
+        each bucket and page.
+        """
+        cutoff = self._retention_cutoff(days)
+        with self._buckets_lock:
+            targets = sorted(((start, name, end, collection) for name, (start, end, collection) in self._buckets.items()
+                              if start < cutoff), key=lambda target: target[0])
+        targets = [(name, end, collection) for _, name, end, collection in targets]
+        if self.legacy_collection is not None:
+            targets.append((self.legacy_collection.name, self._legacy_end, self.legacy_collection))
+        
+        deleted = 0
+        for done, (name, end, collection) in enumerate(targets):
+            def report(bucket_deleted: int = 0, buckets_done: int = done):
+                if progress:
+                    progress({"bucket": name, "buckets_done": buckets_done, "buckets_total": len(targets),
+                              "deleted": deleted + bucket_deleted})
             
-            old_session_memories = self.session_memory_collection.get(
-                where={"timestamp": {"$lt": cutoff_timestamp}}
+            legacy = collection is self.legacy_collection
+            if end <= cutoff:
+                # Every entry in the bucket has expired
+                count = collection.count()
+                with self._buckets_lock:
+                    self._buckets.pop(name, None)
+                self.client.delete_collection(name)
+                deleted += count
+                if legacy:
+                    self.legacy_collection = None
+            else:
+                deleted += self._delete_before(collection, cutoff, report)
+                if legacy and collection.count() == 0:
+                    self.client.delete_collection(name)
+                    self.legacy_collection = None
+            report(buckets_done=done + 1)
+        return deleted
+    
+    @staticmethod
+    def _delete_before(collection, cutoff: float, report) -> int:
+        """Delete a collection's entries older than cutoff, one page of ids at a time"""
+        deleted = 0
+        while True:
+            page = collection.get(
+                where={"timestamp": {"$lt": cutoff}},
+                limit=MEMORY_CLEANUP_PAGE_SIZE,
+                include=[]
             )
-            
-            # Delete old entries
-            deleted_count = 0
-            if old_user_memories['ids']:
-                self.user_memory_collection.delete(ids=old_user_memories['ids'])
-                deleted_count += len(old_user_memories['ids'])
-            
-            if old_session_memories['ids']:
-                self.session_memory_collection.delete(ids=old_session_memories['ids'])
-                deleted_count += len(old_session_memories['ids'])
-            
-            return deleted_count
-            
-        except Exception as e:
-            print(f"Error cleaning up memory: {e}")
-            return 0
+            if not page['ids']:
+                return deleted
+            collection.delete(ids=page['ids'])
+            deleted += len(page['ids'])
+            report(deleted)
     
     def get_memory_stats(self, user_id: int) -> Dict[str, Any]:
         """Get memory statistics for a user"""
         try:
-            user_memories = self.user_memory_collection.get(
-                where={"user_id": user_id}
-            )
-            
-            session_memories = self.session_memory_collection.get(
-                where={"user_id": user_id}
-            )
+            cutoff = self._retention_cutoff()
+            memory_count = 0
+            for collection, straddles_cutoff in self._live_collections(cutoff):
+                user_memories = collection.get(
+                    where=self._live_filter({"user_id": user_id}, cutoff, straddles_cutoff),
+                    include=[]
+                )
+                memory_count += len(user_memories['ids'])
             
+            # Every entry is scoped to both its user and its session, so the
+            # per-scope counts match; vectors are no longer stored twice
             return {
-                "user_memory_count": len(user_memories['ids']) if user_memories['ids'] else 0,
-                "session_memory_count": len(session_memories['ids']) if session_memories['ids'] else 0,
-                "total_memory_count": (len(user_memories['ids']) if user_memories['ids'] else 0) + 
-                                   (len(session_memories['ids']) if session_memories['ids'] else 0)
+                "user_memory_count": memory_count,
+                "session_memory_count": memory_count,
+                "total_memory_count": memory_count
             }
             
         except Exception as e:
             print(f"Error getting memory stats: {e}")
             return {"user_memory_count": 0, "session_memory_count": 0, "total_memory_count": 0}
 
+class MemoryWriteQueue:
+    """Write-behind queue that batches memory inserts on a background worker thread.
+
+    Chat turns enqueue entries and return immediately; the worker collects up to
+    batch_size entries (waiting at most flush_interval seconds for a batch to fill)
+    and writes them with a single store_memory_batch call.
+    """
+    
+    def __init__(self, service: SemanticMemoryService, batch_size: int = 32, flush_interval: float = 0.5):
+        self.service = service
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.written_count = 0
+        self.failed_count = 0
+    
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+                    self._thread.start()
+    
+    def enqueue(self, user_id: int, session_id: int, message_id: int, content: str,
+                message_type: str, metadata: Optional[Dict] = None):
+        """Queue a message for storage in semantic memory"""
+        self._ensure_worker()
+        self._queue.put({
+            "user_id": user_id,
+            "session_id": session_id,
+            "message_id": message_id,
+            "content": content,
+            "message_type": message_type,
+            "metadata": metadata
+        })
+    
+    @property
+    def pending_count(self) -> int:
+        return self._queue.unfinished_tasks
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                stored = self.service.store_memory_batch(batch)
+                self.written_count += stored
+                self.failed_count += len(batch) - stored
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def flush(self) -> int:
+        """Block until every queued entry has been written; returns how many were pending"""
+        pending = self.pending_count
+        if pending:
+            self._queue.join()
+        return pending
+
+class MemoryRetentionJob:
+    """Background thread that expires old memories every interval seconds.
+
+    Runs go through SemanticMemoryService.cleanup_expired_memory; status()
+    reports the progress of the current run (bucket, buckets done, entries
+    deleted so far) and the outcome of the last one. trigger() starts a run
+    on demand; only one run is in progress at a time.
+    """
+    
+    def __init__(self, service: SemanticMemoryService, interval: float = 3600):
+        self.service = service
+        self.interval = interval
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._days = None
+        self.started = False
+        self._status = {"running": False, "started_at": None, "finished_at": None, "days": None,
+                        "bucket": None, "buckets_done": 0, "buckets_total": 0, "deleted": 0, "error": None}
+        self.runs = 0
+        self.deleted_count = 0
+    
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="memory-retention", daemon=True)
+                    self._thread.start()
+    
+    def start(self) -> bool:
+        """Start the periodic runs, beginning with one right away; False if already started"""
+        with self._lock:
+            if self.started:
+                return False
+            self.started = True
+        self.trigger()
+        return True
+    
+    def trigger(self, days: Optional[int] = None) -> bool:
+        """Start a run in the background; returns False if one is already in progress"""
+        with self._lock:
+            if self._status["running"] or self._wake.is_set():
+                return False
+            self._days = days
+            self._wake.set()
+        self._ensure_worker()
+        return True
+    
+    def _report(self, progress: Dict[str, Any]):
+        with self._lock:
+            self._status.update(progress)
+    
+    def _begin(self, days: Optional[int]) -> bool:
+        """Mark a run as started (caller holds the lock); False if one is already in progress"""
+        if self._status["running"]:
+            return False
+        self._status.update(running=True, started_at=datetime.utcnow().isoformat(), finished_at=None,
+                            days=self.service.memory_expiry_days if days is None else days, bucket=None,
+                            buckets_done=0, buckets_total=0, deleted=0, error=None)
+        return True
+    
+    def run_once(self, days: Optional[int] = None) -> Optional[int]:
+        """Expire memories now, on the calling thread; returns how many entries were
+        removed, or None if a run is already in progress"""
+        with self._lock:
+            if not self._begin(days):
+                return None
+        return self._expire(days)
+    
+    def _expire(self, days: Optional[int]) -> int:
+        deleted = 0
+        try:
+            deleted = self.service.cleanup_expired_memory(days, progress=self._report)
+            self.deleted_count += deleted
+        except Exception as e:
+            print(f"Error expiring memory: {e}")
+            self._report({"error": str(e)})
+        finally:
+            self.runs += 1
+            self._report({"running": False, "finished_at": datetime.utcnow().isoformat()})
+        return deleted
+    
+    def _run(self):
+        while True:
+            # Sleep until the next scheduled run or a trigger(); interval 0 means on demand only
+            self._wake.wait(self.interval or None)
+            with self._lock:
+                days, self._days = self._days, None
+                self._wake.clear()
+                started = self._begin(days)
+            if started:
+                self._expire(days)
+    
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._status, pending=self._wake.is_set(), runs=self.runs, total_deleted=self.deleted_count,
+                        interval_seconds=self.interval)
+
 # Global instance
-memory_service = SemanticMemoryService() 
\ No newline at end of file
+memory_service = SemanticMemoryService()
+
+# Memory writes are taken off the request path unless MEMORY_WRITE_BEHIND=false
+MEMORY_WRITE_BEHIND = os.getenv("MEMORY_WRITE_BEHIND", "true").lower() == "true"
+memory_write_queue = MemoryWriteQueue(
+    memory_service,
+    batch_size=int(os.getenv("MEMORY_WRITE_BATCH_SIZE", "32")),
+    flush_interval=float(os.getenv("MEMORY_WRITE_FLUSH_INTERVAL", "0.5"))
+)
+
+# Don't lose queued memories when the process exits
+atexit.register(memory_write_queue.flush)
+
+# Periodic expiry of memories older than MEMORY_RETENTION_DAYS (started by the app);
+# MEMORY_CLEANUP_INTERVAL=0 leaves cleanup to POST /api/memory/cleanup
+memory_retention_job = MemoryRetentionJob(
+    memory_service,
+    interval=float(os.getenv("MEMORY_CLEANUP_INTERVAL", "3600"))
+) 
\ No newline at end of file
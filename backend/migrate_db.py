@@ -1,6 +1,9 @@
 import sqlite3
 import os
 from datetime import datetime
+from sqlalchemy import create_engine, inspect
+from models import Product, InventoryItem, Order, OrderItem, ConversationSession, ChatMessage
+from search_index import ensure_product_search_index
 
 def migrate_database():
     """Add new conversation and chat tables to existing database"""
@@ -34,6 +37,7 @@ def migrate_database():
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                 updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                 is_active BOOLEAN DEFAULT 1,
+                message_count INTEGER NOT NULL DEFAULT 0,
                 FOREIGN KEY (user_id) REFERENCES UserTable(id)
             )
         ''')
@@ -78,5 +82,78 @@ def migrate_database():
     print("- POST /api/conversations/{id}/messages - Add message")
     print("- GET /api/conversations/{id}/messages - Get messages")
 
+def migrate_search_index():
+    """Create the product full-text search index and its sync triggers"""
+    print("Creating product search index...")
+    engine = create_engine('sqlite:///ecommerce.db')
+    if ensure_product_search_index(engine):
+        print("✓ Product search index ready")
+    else:
+        print("Product table not found. Load data first, then re-run the migration.")
+    engine.dispose()
+
+def migrate_message_counts():
+    """Add ConversationSession.message_count and backfill it from ChatMessage; safe to re-run"""
+    conn = sqlite3.connect('ecommerce.db')
+    cursor = conn.cursor()
+    
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(ConversationSession)")]
+    if not columns:
+        print("ConversationSession table not found, skipping message counts")
+    elif 'message_count' in columns:
+        print("ConversationSession.message_count already exists.")
+    else:
+        print("Adding ConversationSession.message_count...")
+        cursor.execute('ALTER TABLE ConversationSession ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0')
+        cursor.execute('''
+            UPDATE ConversationSession SET message_count = (
+                SELECT COUNT(*) FROM ChatMessage WHERE ChatMessage.session_id = ConversationSession.id
+            )
+        ''')
+        conn.commit()
+        print(f"✓ message_count backfilled for {cursor.rowcount} sessions")
+    conn.close()
+
+def migrate_conversation_summaries():
+    """Add the ConversationSession rolling-summary columns; safe to re-run"""
+    conn = sqlite3.connect('ecommerce.db')
+    cursor = conn.cursor()
+    
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(ConversationSession)")]
+    if not columns:
+        print("ConversationSession table not found, skipping conversation summaries")
+    elif 'summary' in columns:
+        print("ConversationSession summary columns already exist.")
+    else:
+        print("Adding ConversationSession summary columns...")
+        cursor.execute('ALTER TABLE ConversationSession ADD COLUMN summary TEXT')
+        cursor.execute('ALTER TABLE ConversationSession ADD COLUMN summary_message_id INTEGER')
+        cursor.execute('ALTER TABLE ConversationSession ADD COLUMN summarized_count INTEGER NOT NULL DEFAULT 0')
+        conn.commit()
+        print("✓ Summary columns added (sessions are summarized as they continue)")
+    conn.close()
+
+def migrate_indexes():
+    """Create the secondary indexes declared on the models; safe to re-run"""
+    print("Creating secondary indexes...")
+    engine = create_engine('sqlite:///ecommerce.db')
+    existing_tables = set(inspect(engine).get_table_names())
+    for model in (Product, InventoryItem, Order, OrderItem, ConversationSession, ChatMessage):
+        table = model.__table__
+        if table.name not in existing_tables:
+            print(f"{table.name} table not found, skipping its indexes")
+            continue
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+        print(f"✓ {table.name}: {', '.join(sorted(index.name for index in table.indexes))}")
+    # Refresh planner statistics so the new indexes are picked up
+    with engine.begin() as conn:
+        conn.exec_driver_sql('ANALYZE')
+    engine.dispose()
+
 if __name__ == "__main__":
-    migrate_database() 
\ No newline at end of file
+    migrate_database()
+    migrate_message_counts()
+    migrate_conversation_summaries()
+    migrate_indexes()
+    migrate_search_index() 
\ No newline at end of file
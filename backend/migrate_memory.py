@@ -0,0 +1,87 @@
+import argparse
+import chromadb
+from chromadb.config import Settings
+
+# Legacy layout stored every vector twice: once in user_memory and once (with a
+# "session_" id prefix) in session_memory. Model-specific collections carry a
+# suffix, e.g. user_memory_all-MiniLM-L6-v2 / session_memory_all-MiniLM-L6-v2.
+USER_PREFIX = "user_memory"
+SESSION_PREFIX = "session_memory"
+PAGE_SIZE = 500
+
+def _collection_names(client):
+    # chromadb < 0.6 returns Collection objects, newer versions return names
+    return [c if isinstance(c, str) else c.name for c in client.list_collections()]
+
+def _copy(source, target, strip_prefix: str = "", skip_ids=None) -> int:
+    """Copy all entries from source into target page by page; returns the number copied"""
+    copied = 0
+    offset = 0
+    while True:
+        page = source.get(limit=PAGE_SIZE, offset=offset,
+                          include=["embeddings", "documents", "metadatas"])
+        if not page['ids']:
+            break
+        offset += len(page['ids'])
+        
+        rows = [
+            (entry_id[len(strip_prefix):] if strip_prefix and entry_id.startswith(strip_prefix) else entry_id,
+             page['embeddings'][i], page['documents'][i], page['metadatas'][i])
+            for i, entry_id in enumerate(page['ids'])
+        ]
+        if skip_ids is not None:
+            rows = [row for row in rows if row[0] not in skip_ids]
+        if not rows:
+            continue
+        
+        ids, embeddings, documents, metadatas = (list(column) for column in zip(*rows))
+        target.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+        copied += len(ids)
+    return copied
+
+def migrate_memory(path: str = "./chroma_db", keep_old: bool = False):
+    """Merge user_memory/session_memory collection pairs into single memory collections"""
+    client = chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False))
+    names = _collection_names(client)
+    
+    print("Starting memory migration...")
+    user_collections = [name for name in names if name.startswith(USER_PREFIX)]
+    if not user_collections:
+        print("No legacy user_memory collections found. Migration not needed.")
+        return
+    
+    for user_name in user_collections:
+        suffix = user_name[len(USER_PREFIX):]
+        session_name = SESSION_PREFIX + suffix
+        target_name = "memory" + suffix
+        
+        user_collection = client.get_collection(user_name)
+        metadata = dict(user_collection.metadata or {})
+        metadata["description"] = "Conversation memory scoped by user_id/session_id metadata"
+        target = client.get_or_create_collection(name=target_name, metadata=metadata)
+        
+        print(f"Migrating {user_name} -> {target_name}...")
+        copied = _copy(user_collection, target)
+        print(f"✓ Copied {copied} entries")
+        
+        if session_name in names:
+            # Session entries are duplicates of user entries; only copy strays
+            existing = set(target.get(include=[])['ids'])
+            extra = _copy(client.get_collection(session_name), target,
+                          strip_prefix="session_", skip_ids=existing)
+            print(f"✓ Copied {extra} session-only entries from {session_name}")
+        
+        if not keep_old:
+            client.delete_collection(user_name)
+            if session_name in names:
+                client.delete_collection(session_name)
+            print(f"✓ Removed {user_name} and {session_name}")
+    
+    print("Memory migration completed successfully!")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge duplicated user/session memory collections")
+    parser.add_argument("--path", default="./chroma_db", help="ChromaDB directory")
+    parser.add_argument("--keep-old", action="store_true", help="keep the legacy collections after copying")
+    args = parser.parse_args()
+    migrate_memory(args.path, args.keep_old)
@@ -26,6 +26,21 @@ class User(db.Model):
     conversation_sessions = db.relationship('ConversationSession', backref='user', lazy=True)
     orders = db.relationship('Order', backref='user', lazy=True)
 
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'email': self.email,
+            'age': self.age,
+            'gender': self.gender,
+            'state': self.state,
+            'city': self.city,
+            'country': self.country,
+            'traffic_source': self.traffic_source,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
 class DistributionCenter(db.Model):
     __tablename__ = 'DistributionCenter'
     id = db.Column(db.Integer, primary_key=True)
@@ -36,8 +51,19 @@ class DistributionCenter(db.Model):
     # Relationships
     products = db.relationship('Product', backref='distribution_center', lazy=True)
 
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'latitude': self.latitude,
+            'longitude': self.longitude
+        }
+
 class Product(db.Model):
     __tablename__ = 'Product'
+    __table_args__ = (
+        db.Index('idx_product_distribution_center_id', 'distribution_center_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255))
     brand = db.Column(db.String(100))
@@ -52,8 +78,24 @@ class Product(db.Model):
     inventory_items = db.relationship('InventoryItem', backref='product', lazy=True)
     order_items = db.relationship('OrderItem', backref='product', lazy=True)
 
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'brand': self.brand,
+            'category': self.category,
+            'department': self.department,
+            'sku': self.sku,
+            'cost': self.cost,
+            'retail_price': self.retail_price,
+            'distribution_center_id': self.distribution_center_id
+        }
+
 class InventoryItem(db.Model):
     __tablename__ = 'InventoryItem'
+    __table_args__ = (
+        db.Index('idx_inventory_item_product_id', 'product_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey('Product.id'))
     created_at = db.Column(db.DateTime)
@@ -70,8 +112,28 @@ class InventoryItem(db.Model):
     # Relationships
     order_items = db.relationship('OrderItem', backref='inventory_item', lazy=True)
 
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'product_id': self.product_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sold_at': self.sold_at.isoformat() if self.sold_at else None,
+            'cost': self.cost,
+            'product_category': self.product_category,
+            'product_name': self.product_name,
+            'product_brand': self.product_brand,
+            'product_retail_price': self.product_retail_price,
+            'product_department': self.product_department,
+            'product_sku': self.product_sku,
+            'product_distribution_center_id': self.product_distribution_center_id
+        }
+
 class Order(db.Model):
     __tablename__ = 'OrderTable'
+    __table_args__ = (
+        # Also serves plain user_id lookups (leftmost column)
+        db.Index('idx_order_user_created', 'user_id', 'created_at'),
+    )
     order_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('UserTable.id'))
     status = db.Column(db.String(50))
@@ -85,8 +147,26 @@ class Order(db.Model):
     # Relationships
     order_items = db.relationship('OrderItem', backref='order', lazy=True)
 
+    def to_dict(self):
+        return {
+            'order_id': self.order_id,
+            'user_id': self.user_id,
+            'status': self.status,
+            'gender': self.gender,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'returned_at': self.returned_at.isoformat() if self.returned_at else None,
+            'shipped_at': self.shipped_at.isoformat() if self.shipped_at else None,
+            'delivered_at': self.delivered_at.isoformat() if self.delivered_at else None,
+            'num_of_item': self.num_of_item
+        }
+
 class OrderItem(db.Model):
     __tablename__ = 'OrderItem'
+    __table_args__ = (
+        db.Index('idx_order_item_order_id', 'order_id'),
+        db.Index('idx_order_item_user_id', 'user_id'),
+        db.Index('idx_order_item_product_id', 'product_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('OrderTable.order_id'))
     user_id = db.Column(db.Integer, db.ForeignKey('UserTable.id'))
@@ -99,16 +179,40 @@ class OrderItem(db.Model):
     returned_at = db.Column(db.DateTime)
     sale_price = db.Column(db.Float)
 
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'order_id': self.order_id,
+            'user_id': self.user_id,
+            'product_id': self.product_id,
+            'inventory_item_id': self.inventory_item_id,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'shipped_at': self.shipped_at.isoformat() if self.shipped_at else None,
+            'delivered_at': self.delivered_at.isoformat() if self.delivered_at else None,
+            'returned_at': self.returned_at.isoformat() if self.returned_at else None,
+            'sale_price': self.sale_price
+        }
+
 # NEW MODELS FOR MILESTONE 3
 
 class ConversationSession(db.Model):
     __tablename__ = 'ConversationSession'
+    __table_args__ = (
+        db.Index('idx_conversation_user_id', 'user_id'),
+        db.Index('idx_conversation_active', 'is_active'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('UserTable.id'), nullable=False)
     title = db.Column(db.String(255))  # Optional title for the conversation
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)  # To mark sessions as active/inactive
+    message_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Kept current by add_message and add_turn (ChatMessageService and its async twin)
+    # Rolling summary of the messages older than the recent window (see conversation_summary.py)
+    summary = db.Column(db.Text)
+    summary_message_id = db.Column(db.Integer)  # Last ChatMessage folded into the summary
+    summarized_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     # Relationships
     messages = db.relationship('ChatMessage', backref='session', lazy=True, order_by='ChatMessage.created_at')
@@ -121,11 +225,17 @@ class ConversationSession(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'is_active': self.is_active,
-            'message_count': len(self.messages)
+            'message_count': self.message_count or 0,
+            'summary': self.summary
         }
 
 class ChatMessage(db.Model):
     __tablename__ = 'ChatMessage'
+    __table_args__ = (
+        # Session history in order; also serves plain session_id lookups
+        db.Index('idx_chat_session_created', 'session_id', 'created_at'),
+        db.Index('idx_chat_created_at', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.Integer, db.ForeignKey('ConversationSession.id'), nullable=False)
     message_type = db.Column(db.String(10), nullable=False)  # 'user' or 'ai'
@@ -143,4 +253,32 @@ class ChatMessage(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'embedding': self.embedding,
             'metadata': self.message_metadata
-        } 
\ No newline at end of file
+        } 
+
+# DATA INGESTION METADATA
+
+class IngestWatermark(db.Model):
+    """Last successful load of each dataset CSV, used to skip unchanged files"""
+    __tablename__ = 'IngestWatermark'
+    file_name = db.Column(db.String(255), primary_key=True)
+    table_name = db.Column(db.String(100), nullable=False)
+    file_size = db.Column(db.Integer)
+    file_mtime = db.Column(db.Float)
+    rows_seen = db.Column(db.Integer)
+    rows_changed = db.Column(db.Integer)
+    loaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class IngestRowHash(db.Model):
+    """Content hash of every loaded row, keyed by table and primary key, for change detection"""
+    __tablename__ = 'IngestRowHash'
+    __table_args__ = {'sqlite_with_rowid': False}
+    table_name = db.Column(db.String(100), primary_key=True)
+    row_id = db.Column(db.Integer, primary_key=True)
+    row_hash = db.Column(db.Integer, nullable=False)
+
+class CatalogVersion(db.Model):
+    """Single-row counter bumped by load_data.py whenever catalog data changes; keys the response cache"""
+    __tablename__ = 'CatalogVersion'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,166 @@
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Input token budget for the response prompt. Sections are filled in priority
+# order (message, DB context, conversation summary, then history or memories)
+# and the lowest priority ones are truncated or dropped once the budget is spent.
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '1500'))
+PROMPT_MEMORY_ITEMS = int(os.getenv('PROMPT_MEMORY_ITEMS', '3'))
+# Upper bound on history messages; retrieval already limits them to those the
+# conversation summary doesn't cover (see conversation_summary.plan_context)
+PROMPT_HISTORY_ITEMS = int(os.getenv('PROMPT_HISTORY_ITEMS', '12'))
+# Longest list rendered from db_result (e.g. order items); the rest are counted
+DB_RESULT_MAX_LIST_ITEMS = int(os.getenv('DB_RESULT_MAX_LIST_ITEMS', '10'))
+# Longest single memory or history message, so one long entry can't crowd out the rest
+PROMPT_ITEM_MAX_TOKENS = int(os.getenv('PROMPT_ITEM_MAX_TOKENS', '200'))
+# Sections smaller than this are dropped rather than truncated to a stub
+MIN_SECTION_TOKENS = 16
+# Texts whose token counts (and truncations) are remembered: history messages,
+# memories, summaries and DB contexts recur turn after turn unchanged
+PROMPT_TOKEN_CACHE_SIZE = int(os.getenv('PROMPT_TOKEN_CACHE_SIZE', '4096'))
+
+INSTRUCTION = ("Respond as a helpful e-commerce assistant with memory and personalization. "
+               "Reference past conversations when relevant.")
+
+# db_result keys the prompt renders elsewhere (memory recall copies memories and
+# history into db_result) or that mean nothing to the model
+DB_RESULT_DROP_FIELDS = {'memory_context', 'conversation_history', 'embedding', 'message_metadata'}
+
+# One match per estimated token: a punctuation mark, or up to 4 characters of a word
+_TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+_WORD_TAIL = re.compile(r"\w+$")
+_TRUNCATION_MARK = " ..."
+
+def estimate_tokens(text: str) -> int:
+    """Fast local estimate of BPE tokens: one per punctuation mark, one per 4 characters of a word.
+
+    Slightly over-counts common English words, which keeps the budget on the safe side.
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+_TRUNCATION_MARK_TOKENS = estimate_tokens(_TRUNCATION_MARK)
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text at a word boundary so it fits in max_tokens (marking the cut)"""
+    for count, match in enumerate(_TOKEN_PATTERN.finditer(text)):
+        if count == max_tokens - _TRUNCATION_MARK_TOKENS:  # leave room for the mark
+            head = text[:match.start()]
+            if head[-1:].isalnum() and match.group()[0].isalnum():
+                head = _WORD_TAIL.sub("", head)  # don't split a word
+            return head.rstrip() + _TRUNCATION_MARK
+    return text
+
+def _compact(value: Any) -> Any:
+    if isinstance(value, dict):
+        compacted = {}
+        for key, item in value.items():
+            if key in DB_RESULT_DROP_FIELDS:
+                continue
+            item = _compact(item)
+            if item is not None and item != '' and item != [] and item != {}:
+                compacted[key] = item
+        return compacted
+    if isinstance(value, (list, tuple)):
+        items = [_compact(item) for item in value[:DB_RESULT_MAX_LIST_ITEMS]]
+        if len(value) > DB_RESULT_MAX_LIST_ITEMS:
+            items.append(f"+{len(value) - DB_RESULT_MAX_LIST_ITEMS} more")
+        return items
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+def compact_db_result(db_result: Optional[dict]) -> str:
+    """Compact JSON of a lookup result without nulls, empties or fields rendered elsewhere"""
+    compacted = _compact(db_result or {})
+    if not compacted:
+        return ""
+    return json.dumps(compacted, separators=(',', ':'), ensure_ascii=False, default=str)
+
+_cached_tokens = lru_cache(maxsize=PROMPT_TOKEN_CACHE_SIZE)(estimate_tokens)
+
+@lru_cache(maxsize=PROMPT_TOKEN_CACHE_SIZE)
+def _cached_truncation(text: str, max_tokens: int) -> Tuple[str, int]:
+    text = truncate_to_tokens(text, max_tokens)
+    return text, estimate_tokens(text)
+
+def _fit(prefix: str, text: str, max_tokens: int, cached: bool = True) -> Tuple[str, int]:
+    """prefix + text, with text truncated so the whole fits in max_tokens, and its estimated token count.
+
+    prefix ends in punctuation and a space, so the counts of prefix and text
+    add up. With cached, text's count and truncation come from the LRU caches.
+    """
+    prefix_tokens = _cached_tokens(prefix)
+    tokens = _cached_tokens(text) if cached else estimate_tokens(text)
+    if prefix_tokens + tokens > max_tokens:
+        if cached:
+            text, tokens = _cached_truncation(text, max_tokens - prefix_tokens)
+        else:
+            text = truncate_to_tokens(text, max_tokens - prefix_tokens)
+            tokens = estimate_tokens(text)
+    return prefix + text, prefix_tokens + tokens
+
+def _fill_items(header: str, items: List[Tuple[str, str]], budget: int) -> Tuple[List[str], int]:
+    """Header plus as many (prefix, text) items as fit (the last one truncated); returns (section lines, tokens used)"""
+    used = _cached_tokens(header)
+    kept = []
+    for prefix, text in items:
+        if budget - used < MIN_SECTION_TOKENS:
+            break
+        line, cost = _fit(prefix, text, min(PROMPT_ITEM_MAX_TOKENS, budget - used))
+        kept.append(line)
+        used += cost
+    if not kept:
+        return [], 0
+    return [header] + kept, used
+
+def build_prompt(state: Dict[str, Any], budget: int = PROMPT_TOKEN_BUDGET) -> Tuple[str, int]:
+    """Assemble the response prompt within a token budget; returns (prompt, estimated tokens).
+
+    Priority: instruction and user message, the DB context, the conversation
+    summary, then recent history and retrieved memories (memories first for
+    memory_recall turns).
+    """
+    instruction = "\n" + INSTRUCTION
+    remaining = budget - _cached_tokens(instruction)
+
+    # The user message is new every turn, so it is counted without the caches
+    user_line, cost = _fit("User: ", state['user_message'], remaining // 2, cached=False)
+    remaining -= cost
+
+    context_line = None
+    context = compact_db_result(state.get("db_result"))
+    if context and remaining >= MIN_SECTION_TOKENS:
+        context_line, cost = _fit("Current Context: ", context, remaining)
+        remaining -= cost
+
+    summary_line = None
+    if state.get("conversation_summary") and remaining >= MIN_SECTION_TOKENS:
+        summary_line, cost = _fit("Conversation Summary: ", state['conversation_summary'], remaining)
+        remaining -= cost
+
+    memories = [(f"{i}. ", memory['content'])
+                for i, memory in enumerate((state.get("semantic_memory") or [])[:PROMPT_MEMORY_ITEMS], 1)]
+    # History arrives oldest first; fill newest first so the oldest messages are
+    # the ones cut, then render oldest first again
+    history = [(f"{msg['role']}: ", msg['content'])
+               for msg in reversed((state.get("conversation_context") or [])[-PROMPT_HISTORY_ITEMS:])]
+
+    sections = {}
+    order = ["memory", "history"] if state.get("intent") == "memory_recall" else ["history", "memory"]
+    for name in order:
+        header = "Relevant Past Conversations:" if name == "memory" else "Recent Conversation History:"
+        lines, cost = _fill_items(header, memories if name == "memory" else history, remaining)
+        if name == "history" and lines:
+            lines = lines[:1] + lines[:0:-1]
+        sections[name] = lines
+        remaining -= cost
+
+    parts = [user_line]
+    parts.extend(line for line in (context_line, summary_line) if line)
+    parts.extend("\n".join(sections[name]) + "\n" for name in ("memory", "history") if sections[name])
+    parts.append(instruction)
+    # Whitespace is free in the estimate, so the prompt costs what its parts did
+    return "\n\n".join(parts), budget - remaining
@@ -0,0 +1,196 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Optional
+from flask import Response, request
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from models import db
+
+# In-process cache for catalog data (products, distribution centers), which only
+# changes when load_data.py runs. Entries are keyed by the catalog version the
+# loader bumps, so a reload invalidates every process without any messaging.
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '1024'))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', '300'))
+# How often (seconds) the catalog version is re-read from the database
+CATALOG_VERSION_CHECK_INTERVAL = float(os.getenv('CATALOG_VERSION_CHECK_INTERVAL', '2'))
+
+def read_catalog_version() -> int:
+    """Current catalog version from the database (0 before the first load)"""
+    try:
+        return db.session.execute(text('SELECT version FROM CatalogVersion WHERE id = 1')).scalar() or 0
+    except OperationalError:
+        db.session.rollback()
+        return 0
+
+class ResponseCache:
+    """Thread-safe LRU cache with a TTL and a byte budget, scoped to a catalog version"""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+                 ttl: float = RESPONSE_CACHE_TTL, version_check_interval: float = CATALOG_VERSION_CHECK_INTERVAL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._version = None
+        self._version_checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def catalog_version(self) -> int:
+        """Catalog version, re-read at most every version_check_interval seconds.
+
+        A changed version drops every entry.
+        """
+        now = time.monotonic()
+        if self._version is not None and now - self._version_checked_at < self.version_check_interval:
+            return self._version
+        version = read_catalog_version()
+        with self._lock:
+            if self._version is not None and version != self._version:
+                self._clear_locked()
+                self.invalidations += 1
+            self._version = version
+            self._version_checked_at = now
+        return version
+
+    def get(self, key) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove_locked(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key, value, size: int = 0):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove_locked(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove_locked(oldest)
+                self.evictions += 1
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        """Drop every entry and force a version re-read on the next request"""
+        with self._lock:
+            self._clear_locked()
+            self._version_checked_at = 0.0
+            self.invalidations += 1
+
+    def _remove_locked(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _clear_locked(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': RESPONSE_CACHE_ENABLED,
+                'catalog_version': self._version,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'not_modified': self.not_modified,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl
+            }
+
+# Global instance
+response_cache = ResponseCache()
+
+def _etag(version: int, body: bytes) -> str:
+    return f"{version}-{hashlib.blake2b(body, digest_size=8).hexdigest()}"
+
+def cached_response(view):
+    """Cache a GET view's serialized response bytes, keyed by path, query string and catalog version.
+
+    Hits skip both the database and JSON encoding. Every response carries an
+    ETag and a matching If-None-Match gets a 304. Streamed and non-200
+    responses are passed through uncached.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not RESPONSE_CACHE_ENABLED:
+            return view(*args, **kwargs)
+
+        version = response_cache.catalog_version()
+        key = ('response', version, request.path, tuple(sorted(request.args.items(multi=True))))
+        entry = response_cache.get(key)
+        if entry is None:
+            response = view(*args, **kwargs)
+            if isinstance(response, tuple) or response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            headers = [(name, value) for name, value in response.headers
+                       if name.lower() not in ('content-length', 'set-cookie')]
+            entry = (body, headers, _etag(version, body))
+            response_cache.set(key, entry, len(body))
+
+        body, headers, etag = entry
+        if etag in request.if_none_match:
+            response_cache.record_not_modified()
+            response = Response(status=304)
+        else:
+            response = Response(body, headers=headers)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'  # always revalidate; a 304 is cheap
+        return response
+    return wrapper
+
+def cached_rows(namespace: str, ids, load):
+    """Per-ID cache for catalog lookups: load(missing_ids) returns {id: row} for the IDs it found.
+
+    Returns copies of the rows in ID order; IDs that don't exist are skipped.
+    """
+    ids = sorted(set(ids))
+    if not RESPONSE_CACHE_ENABLED:
+        rows = load(ids)
+        return [rows[row_id] for row_id in ids if row_id in rows]
+
+    version = response_cache.catalog_version()
+    rows = {}
+    missing = []
+    for row_id in ids:
+        row = response_cache.get((namespace, version, row_id))
+        if row is None:
+            missing.append(row_id)
+        else:
+            rows[row_id] = row
+    if missing:
+        for row_id, row in load(missing).items():
+            response_cache.set((namespace, version, row_id), row)
+            rows[row_id] = row
+    return [dict(rows[row_id]) for row_id in ids if row_id in rows]
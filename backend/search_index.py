@@ -0,0 +1,59 @@
+import re
+from typing import Optional
+from sqlalchemy import inspect
+
+# External-content FTS5 index over Product(name, brand, category). Triggers keep it
+# in sync with every insert/update/delete on Product, whoever the writer is.
+PRODUCT_FTS_TABLE = 'ProductFTS'
+
+PRODUCT_FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {PRODUCT_FTS_TABLE} USING fts5(
+        name, brand, category,
+        content='Product', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS Product_fts_insert AFTER INSERT ON Product BEGIN
+        INSERT INTO {PRODUCT_FTS_TABLE}(rowid, name, brand, category)
+        VALUES (new.id, new.name, new.brand, new.category);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS Product_fts_delete AFTER DELETE ON Product BEGIN
+        INSERT INTO {PRODUCT_FTS_TABLE}({PRODUCT_FTS_TABLE}, rowid, name, brand, category)
+        VALUES ('delete', old.id, old.name, old.brand, old.category);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS Product_fts_update AFTER UPDATE ON Product BEGIN
+        INSERT INTO {PRODUCT_FTS_TABLE}({PRODUCT_FTS_TABLE}, rowid, name, brand, category)
+        VALUES ('delete', old.id, old.name, old.brand, old.category);
+        INSERT INTO {PRODUCT_FTS_TABLE}(rowid, name, brand, category)
+        VALUES (new.id, new.name, new.brand, new.category);
+    END""",
+]
+
+def ensure_product_search_index(engine, rebuild: bool = False) -> bool:
+    """Create the product FTS5 index and its sync triggers if missing.
+
+    The index is (re)built from Product when it is first created or when
+    rebuild=True (e.g. after a bulk load that bypassed the triggers).
+    Returns False if the Product table does not exist yet.
+    """
+    table_names = inspect(engine).get_table_names()
+    if 'Product' not in table_names:
+        return False
+    
+    created = PRODUCT_FTS_TABLE not in table_names
+    with engine.begin() as conn:
+        for statement in PRODUCT_FTS_DDL:
+            conn.exec_driver_sql(statement)
+        if created or rebuild:
+            conn.exec_driver_sql(f"INSERT INTO {PRODUCT_FTS_TABLE}({PRODUCT_FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+def build_fts_query(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word must match, as a prefix.
+
+    Words are quoted so user input can't inject FTS5 operators.
+    Returns None if the text has no searchable words.
+    """
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
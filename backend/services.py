@@ -1,13 +1,51 @@
 from models import db, User, Product, Order, OrderItem, DistributionCenter, InventoryItem, ConversationSession, ChatMessage, MessageType
+from sqlalchemy import text, select, tuple_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import selectinload
+from search_index import PRODUCT_FTS_TABLE, build_fts_query
+from response_cache import cached_rows
 from datetime import datetime
 import json
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+
+# Number of rows buffered per fetch when streaming a table from a server-side cursor
+STREAM_BATCH_SIZE = 1000
+
+def _keyset_query(model, key_column, after_id: Optional[int] = None):
+    """Build a query ordered by its primary key, starting after the given cursor"""
+    query = model.query.order_by(key_column)
+    if after_id is not None:
+        query = query.filter(key_column > after_id)
+    return query
+
+def get_keyset_page(model, key_column, after_id: Optional[int] = None, limit: Optional[int] = None) -> List:
+    """Get one page of rows with keys strictly greater than after_id"""
+    query = _keyset_query(model, key_column, after_id)
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+def iter_keyset(model, key_column, after_id: Optional[int] = None, limit: Optional[int] = None,
+                batch_size: int = STREAM_BATCH_SIZE) -> Iterator:
+    """Stream rows in key order without materializing the whole result set"""
+    query = _keyset_query(model, key_column, after_id)
+    if limit:
+        query = query.limit(limit)
+    return iter(query.yield_per(batch_size))
 
 class UserService:
     @staticmethod
     def get_all_users():
         return User.query.all()
     
+    @staticmethod
+    def get_users_page(after_id: Optional[int] = None, limit: Optional[int] = None):
+        return get_keyset_page(User, User.id, after_id, limit)
+    
+    @staticmethod
+    def iter_users(after_id: Optional[int] = None, limit: Optional[int] = None):
+        return iter_keyset(User, User.id, after_id, limit)
+    
     @staticmethod
     def get_user_by_id(user_id: int):
         return User.query.get(user_id)
@@ -25,23 +63,69 @@ class ProductService:
     def get_all_products():
         return Product.query.all()
     
+    @staticmethod
+    def get_products_page(after_id: Optional[int] = None, limit: Optional[int] = None):
+        return get_keyset_page(Product, Product.id, after_id, limit)
+    
+    @staticmethod
+    def iter_products(after_id: Optional[int] = None, limit: Optional[int] = None):
+        return iter_keyset(Product, Product.id, after_id, limit)
+    
     @staticmethod
     def get_product_by_id(product_id: int):
         return Product.query.get(product_id)
     
     @staticmethod
-    def search_products(query: str):
-        return Product.query.filter(
+    def search_products(query: str, limit: Optional[int] = None, offset: int = 0):
+        """Full-text search over name, brand and category, best BM25 matches first.
+
+        Falls back to LIKE matching when the FTS index is not available.
+        """
+        fts_query = build_fts_query(query)
+        if fts_query is None:
+            return []
+        try:
+            # Rank and page inside FTS5 first, then join only the requested page
+            statement = text(
+                f"SELECT Product.* FROM ("
+                f"SELECT rowid, rank FROM {PRODUCT_FTS_TABLE} WHERE {PRODUCT_FTS_TABLE} MATCH :query "
+                f"ORDER BY rank LIMIT :limit OFFSET :offset"
+                f") AS hits JOIN Product ON Product.id = hits.rowid ORDER BY hits.rank"
+            )
+            return Product.query.from_statement(statement).params(
+                query=fts_query, limit=limit if limit else -1, offset=offset
+            ).all()
+        except OperationalError:
+            db.session.rollback()
+            return ProductService.search_products_like(query, limit, offset)
+    
+    @staticmethod
+    def search_products_like(query: str, limit: Optional[int] = None, offset: int = 0):
+        """Unranked substring search (full table scan)"""
+        search = Product.query.filter(
             Product.name.contains(query) | 
             Product.brand.contains(query) | 
             Product.category.contains(query)
-        ).all()
+        ).order_by(Product.id)
+        if limit:
+            search = search.limit(limit)
+        if offset:
+            search = search.offset(offset)
+        return search.all()
 
 class OrderService:
     @staticmethod
     def get_all_orders():
         return Order.query.all()
     
+    @staticmethod
+    def get_orders_page(after_id: Optional[int] = None, limit: Optional[int] = None):
+        return get_keyset_page(Order, Order.order_id, after_id, limit)
+    
+    @staticmethod
+    def iter_orders(after_id: Optional[int] = None, limit: Optional[int] = None):
+        return iter_keyset(Order, Order.order_id, after_id, limit)
+    
     @staticmethod
     def get_order_by_id(order_id: int):
         return Order.query.get(order_id)
@@ -54,18 +138,32 @@ class OrderService:
     def get_user_order_history(user_id: int):
         return Order.query.filter_by(user_id=user_id).order_by(Order.created_at.desc()).all()
 
+class InventoryService:
+    @staticmethod
+    def get_inventory_page(after_id: Optional[int] = None, limit: Optional[int] = None):
+        return get_keyset_page(InventoryItem, InventoryItem.id, after_id, limit)
+    
+    @staticmethod
+    def iter_inventory(after_id: Optional[int] = None, limit: Optional[int] = None):
+        return iter_keyset(InventoryItem, InventoryItem.id, after_id, limit)
+
 class ConversationService:
     @staticmethod
     def create_session(user_id: int, title: Optional[str] = None) -> ConversationSession:
         """Create a new conversation session for a user"""
-        session = ConversationSession(
+        session = ConversationService.new_session(user_id, title)
+        db.session.add(session)
+        db.session.commit()
+        return session
+    
+    @staticmethod
+    def new_session(user_id: int, title: Optional[str] = None) -> ConversationSession:
+        """Unsaved conversation session for a user, with the default title"""
+        return ConversationSession(
             user_id=user_id,
             title=title or f"Chat Session - {datetime.utcnow().strftime('%Y-%m-%d %H:%M')}",
             is_active=True
         )
-        db.session.add(session)
-        db.session.commit()
-        return session
     
     @staticmethod
     def get_session(session_id: int) -> Optional[ConversationSession]:
@@ -101,6 +199,35 @@ class ConversationService:
             db.session.commit()
             return True
         return False
+    
+    @staticmethod
+    def get_summary_state(session_id: int):
+        """Row of (summary, summary_message_id, message_count, summarized_count) for a session, or None"""
+        return db.session.query(
+            ConversationSession.summary,
+            ConversationSession.summary_message_id,
+            ConversationSession.message_count,
+            ConversationSession.summarized_count
+        ).filter(ConversationSession.id == session_id).first()
+    
+    @staticmethod
+    def save_summary(session_id: int, summary: str, previous_message_id: Optional[int],
+                     last_message_id: int, folded: int) -> bool:
+        """Store a rolling summary that now covers the session's messages up to last_message_id.
+
+        Only applies while the stored summary still ends at previous_message_id,
+        so two folds of the same messages can't both be counted.
+        """
+        updated = ConversationSession.query.filter_by(
+            id=session_id, summary_message_id=previous_message_id
+        ).update({
+            'summary': summary,
+            'summary_message_id': last_message_id,
+            'summarized_count': ConversationSession.summarized_count + folded,
+            'updated_at': ConversationSession.updated_at  # not new activity
+        }, synchronize_session=False)
+        db.session.commit()
+        return bool(updated)
 
 class ChatMessageService:
     @staticmethod
@@ -114,15 +241,59 @@ class ChatMessageService:
             message_metadata=json.dumps(metadata) if metadata else None
         )
         db.session.add(message)
-        
-        # Update session timestamp
-        session = ConversationSession.query.get(session_id)
-        if session:
-            session.updated_at = datetime.utcnow()
-        
+        ChatMessageService._touch_session(session_id, 1)
         db.session.commit()
         return message
     
+    @staticmethod
+    def add_turn(session_id: Optional[int], user_content: str, ai_content: str,
+                 ai_metadata: Optional[Dict[str, Any]] = None,
+                 user_created_at: Optional[datetime] = None,
+                 user_id: Optional[int] = None) -> Tuple[ChatMessage, ChatMessage]:
+        """Persist a whole chat turn (user message, AI reply, session touch) in one transaction.
+
+        With session_id None the turn starts a new session for user_id, created
+        in the same transaction (read its id from the returned messages).
+        user_created_at is when the user message arrived; it defaults to now.
+        Returns (user_message, ai_message).
+        """
+        now = datetime.utcnow()
+        if session_id is None:
+            session = ConversationService.new_session(user_id)
+            session.created_at = user_created_at or now
+            session.updated_at = now
+            session.message_count = 2
+            db.session.add(session)
+            db.session.flush()
+            session_id = session.id
+        else:
+            ChatMessageService._touch_session(session_id, 2, now)
+        user_message = ChatMessage(
+            session_id=session_id,
+            message_type='user',
+            content=user_content,
+            created_at=user_created_at or now
+        )
+        ai_message = ChatMessage(
+            session_id=session_id,
+            message_type='ai',
+            content=ai_content,
+            message_metadata=json.dumps(ai_metadata) if ai_metadata else None,
+            created_at=now
+        )
+        db.session.add_all([user_message, ai_message])
+        db.session.commit()
+        return user_message, ai_message
+    
+    @staticmethod
+    def _touch_session(session_id: int, added: int, now: Optional[datetime] = None):
+        """Bump the session's timestamp and message count with one UPDATE (no read, and
+        as SQL so concurrent writers don't lose counts)"""
+        ConversationSession.query.filter_by(id=session_id).update({
+            ConversationSession.updated_at: now or datetime.utcnow(),
+            ConversationSession.message_count: ConversationSession.message_count + added
+        }, synchronize_session=False)
+    
     @staticmethod
     def get_session_messages(session_id: int, limit: Optional[int] = None) -> List[ChatMessage]:
         """Get all messages for a conversation session"""
@@ -131,6 +302,37 @@ class ChatMessageService:
             query = query.limit(limit)
         return query.all()
     
+    @staticmethod
+    def get_messages_page(session_id: int, before_id: Optional[int] = None, after_id: Optional[int] = None,
+                          limit: int = 50) -> Tuple[List[ChatMessage], bool]:
+        """Get one page of a session's history, oldest first, keyed on (created_at, id).
+
+        With before_id the page holds the messages just older than that message, with
+        after_id the ones just newer, and with neither the most recent ones. Also returns
+        whether more messages exist beyond the page in the direction of travel.
+        """
+        key = tuple_(ChatMessage.created_at, ChatMessage.id)
+        query = ChatMessage.query.filter_by(session_id=session_id)
+        anchor_id = after_id if after_id is not None else before_id
+        if anchor_id is not None:
+            # Compare against the anchor's stored key in SQL; an unknown anchor matches nothing
+            anchor = select(ChatMessage.created_at, ChatMessage.id)\
+                .where(ChatMessage.id == anchor_id, ChatMessage.session_id == session_id)\
+                .scalar_subquery()
+            query = query.filter(key > anchor if after_id is not None else key < anchor)
+        
+        if after_id is not None:
+            query = query.order_by(ChatMessage.created_at, ChatMessage.id)
+        else:
+            query = query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        
+        messages = query.limit(limit + 1).all()
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if after_id is None:
+            messages.reverse()
+        return messages, has_more
+    
     @staticmethod
     def get_recent_messages(session_id: int, count: int = 10) -> List[ChatMessage]:
         """Get the most recent messages from a session"""
@@ -139,6 +341,33 @@ class ChatMessageService:
             .limit(count)\
             .all()
     
+    @staticmethod
+    def get_context_window(session_id: int, count: int = 10) -> List[Dict[str, Any]]:
+        """The last count messages of a session, oldest first, as chat prompt context.
+
+        Reads only role, content and timestamp (no ORM objects, no metadata
+        decoding), walking idx_chat_session_created backwards from the newest.
+        """
+        rows = db.session.query(ChatMessage.message_type, ChatMessage.content, ChatMessage.created_at)\
+            .filter(ChatMessage.session_id == session_id)\
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())\
+            .limit(count)\
+            .all()
+        return [{
+            'role': row.message_type,
+            'content': row.content,
+            'timestamp': row.created_at.isoformat()
+        } for row in reversed(rows)]
+    
+    @staticmethod
+    def get_messages_after(session_id: int, after_id: Optional[int] = None) -> List[Tuple[int, str, str]]:
+        """(id, message_type, content) of a session's messages after after_id, oldest first"""
+        query = db.session.query(ChatMessage.id, ChatMessage.message_type, ChatMessage.content)\
+            .filter(ChatMessage.session_id == session_id)
+        if after_id:
+            query = query.filter(ChatMessage.id > after_id)
+        return query.order_by(ChatMessage.id).all()
+    
     @staticmethod
     def update_message_embedding(message_id: int, embedding: str) -> bool:
         """Update the embedding for a message (for semantic memory)"""
@@ -155,15 +384,18 @@ class EcommerceDataService:
     @staticmethod
     def get_user_context(user_id: int) -> Dict[str, Any]:
         """Get comprehensive user context including orders, products, etc."""
-        user = User.query.get(user_id)
+        # Load the user, their orders and every order item with its product in a
+        # fixed number of queries instead of one OrderItem query per order
+        user = User.query.options(
+            selectinload(User.orders)
+            .selectinload(Order.order_items)
+            .joinedload(OrderItem.product)
+        ).filter_by(id=user_id).first()
         if not user:
             return {}
         
-        orders = Order.query.filter_by(user_id=user_id).all()
-        order_items = []
-        for order in orders:
-            items = OrderItem.query.filter_by(order_id=order.order_id).all()
-            order_items.extend(items)
+        orders = user.orders
+        order_items = [item for order in orders for item in order.order_items]
         
         return {
             'user': {
@@ -182,6 +414,8 @@ class EcommerceDataService:
                 'id': item.id,
                 'order_id': item.order_id,
                 'product_id': item.product_id,
+                'product_name': item.product.name if item.product else None,
+                'product_brand': item.product.brand if item.product else None,
                 'status': item.status,
                 'sale_price': item.sale_price
             } for item in order_items]
@@ -189,17 +423,19 @@ class EcommerceDataService:
     
     @staticmethod
     def get_product_info(product_ids: List[int]) -> List[Dict[str, Any]]:
-        """Get detailed product information"""
-        products = Product.query.filter(Product.id.in_(product_ids)).all()
-        return [{
-            'id': product.id,
-            'name': product.name,
-            'brand': product.brand,
-            'category': product.category,
-            'department': product.department,
-            'retail_price': product.retail_price,
-            'sku': product.sku
-        } for product in products]
+        """Get detailed product information (served from the catalog cache when possible)"""
+        def load(ids):
+            products = Product.query.filter(Product.id.in_(ids)).all()
+            return {product.id: {
+                'id': product.id,
+                'name': product.name,
+                'brand': product.brand,
+                'category': product.category,
+                'department': product.department,
+                'retail_price': product.retail_price,
+                'sku': product.sku
+            } for product in products}
+        return cached_rows('product_info', product_ids, load)
     
     @staticmethod
     def get_order_status(order_id: int) -> Optional[Dict[str, Any]]:
@@ -0,0 +1,63 @@
+import os
+import logging
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Per-connection SQLite settings, applied from a connect hook so every pooled
+# connection (request threads, LangGraph branches, background writers) gets them.
+# WAL lets readers proceed while a writer commits; NORMAL sync is durable in WAL
+# mode except for the last transactions on power loss.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    # Negative values are KiB: 64 MiB of page cache per connection
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-65536')),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'MEMORY'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+}
+
+SQLITE_TUNING_ENABLED = os.getenv('SQLITE_TUNING', 'true').lower() == 'true'
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: dict = None):
+    """Run the PRAGMA statements on a raw sqlite3 connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in (pragmas or SQLITE_PRAGMAS).items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+def configure_sqlite_engine(engine, pragmas: dict = None):
+    """Apply the pragmas to every new connection the engine opens.
+
+    Must be called before the engine hands out its first connection.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+def get_sqlite_settings(engine) -> dict:
+    """Effective values of the tuned pragmas on a fresh pooled connection"""
+    settings = {}
+    with engine.connect() as conn:
+        cursor = conn.connection.cursor()
+        for name in SQLITE_PRAGMAS:
+            settings[name] = cursor.execute(f'PRAGMA {name}').fetchone()[0]
+        cursor.close()
+    return settings
+
+def log_sqlite_settings(engine):
+    """Log the effective settings and warn where they differ from the requested ones"""
+    if engine.dialect.name != 'sqlite':
+        return
+    settings = get_sqlite_settings(engine)
+    logger.info("SQLite settings: %s", ", ".join(f"{name}={value}" for name, value in settings.items()))
+
+    journal_mode = str(settings['journal_mode']).lower()
+    if journal_mode != str(SQLITE_PRAGMAS['journal_mode']).lower() and journal_mode != 'memory':
+        logger.warning("Requested journal_mode=%s but database is using %s", SQLITE_PRAGMAS['journal_mode'], journal_mode)
@@ -0,0 +1,44 @@
+"""Check that cached chat replies stay with the user and session they were written for.
+
+Exercises chat_cache directly; does not need the API server.
+"""
+from chat_cache import ChatResponseCache, cache_key
+
+ENTITIES = {'order': [123]}
+
+def _key(user_id, session_id, message="What's the status of order #123?"):
+    return cache_key('order_status', ENTITIES, message, user_id, session_id)
+
+def test_users_do_not_share_replies():
+    cache = ChatResponseCache(max_entries=10, ttl=60)
+    cache.set(_key(1, 10), 'row', 'Hi Alice, your order #123 shipped to 1 Main St.')
+
+    assert _key(1, 10) != _key(2, 20)
+    assert cache.get(_key(2, 20), 'row') is None
+    assert cache.get(_key(1, 10), 'row') == 'Hi Alice, your order #123 shipped to 1 Main St.'
+    # Same wording up to case and punctuation still hits for the same user and session
+    assert cache.get(_key(1, 10, "WHAT'S THE STATUS OF ORDER #123!"), 'row') is not None
+
+def test_sessions_do_not_share_replies():
+    cache = ChatResponseCache(max_entries=10, ttl=60)
+    cache.set(_key(1, 10), 'row', 'reply written with session 10 history')
+    assert cache.get(_key(1, 11), 'row') is None
+
+def test_new_session_turns_are_not_cached():
+    # Every new session starts without an id, so a key would be shared by all of them
+    assert _key(1, None) is None
+    assert _key(1, 10) is not None
+
+def test_similar_questions_stay_within_user():
+    # Every question embeds to the same vector, so only the key scope keeps users apart
+    cache = ChatResponseCache(max_entries=10, ttl=60, similarity=0.5, embed=lambda text: [1.0, 0.0])
+    cache.set(_key(1, 10), 'row', "Alice's reply")
+    assert cache.get(_key(2, 20, 'where is order 123 now'), 'row') is None
+    assert cache.get(_key(1, 10, 'where is order 123 now'), 'row') == "Alice's reply"
+
+def test_invalidate_drops_every_users_entries():
+    cache = ChatResponseCache(max_entries=10, ttl=60)
+    cache.set(_key(1, 10), 'row', 'a')
+    cache.set(_key(2, 20), 'row', 'b')
+    assert cache.invalidate('order', 123) == 2
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,101 @@
+"""Check that a chat stream cut short still saves its turn: the user message, the
+partial reply marked with an error, and only the user message in memory.
+
+Drives /api/chat/stream through Flask's test client against a temporary
+database, a temporary memory store and a local stub in place of the Groq API;
+does not need the API server.
+"""
+import os
+import json
+import tempfile
+
+# The app's database and embedding backend are chosen at import time
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "chat.db")
+os.environ.setdefault("EMBEDDING_BACKEND", "hash")
+
+import pytest
+import lang_engine
+from app import app
+from embeddings import create_embedder
+from models import db, User, Order, ConversationSession, ChatMessage
+from memory_service import SemanticMemoryService, MemoryWriteQueue
+from llm_client import create_groq_client, set_groq_client
+from bench_utils import StubGroqServer
+
+REPLY = "Your order 1 shipped yesterday and should arrive on Friday."
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(id=1, first_name='Test'))
+        db.session.add(Order(order_id=1, user_id=1, status='Shipped'))
+        db.session.commit()
+    # Memories go to a throwaway store instead of ./chroma_db
+    memory = SemanticMemoryService(create_embedder(), path=str(tmp_path / "chroma"))
+    write_queue = MemoryWriteQueue(memory, flush_interval=0.05)
+    monkeypatch.setattr(lang_engine, "memory_service", memory)
+    monkeypatch.setattr(lang_engine, "memory_write_queue", write_queue)
+    with StubGroqServer(reply=REPLY) as server:
+        previous = set_groq_client(create_groq_client(api_key='test', base_url=server.base_url, max_retries=0))
+        try:
+            yield app.test_client(), memory, write_queue
+        finally:
+            set_groq_client(previous)
+
+def _stream_and_disconnect(test_client, payload, events_to_read):
+    """Read the first few SSE events of a chat stream, then drop the connection"""
+    response = test_client.post('/api/chat/stream', json=payload, buffered=False)
+    chunks = iter(response.response)
+    read = [next(chunks).decode() for _ in range(events_to_read)]
+    response.close()
+    return read
+
+def _saved_turn(session_id=None):
+    with app.app_context():
+        session = db.session.get(ConversationSession, session_id) if session_id else ConversationSession.query.one()
+        messages = ChatMessage.query.filter_by(session_id=session.id).order_by(ChatMessage.id).all()
+        return session.message_count, [(m.message_type, m.content, json.loads(m.message_metadata or '{}'))
+                                       for m in messages], session.id
+
+def test_disconnect_mid_reply_saves_partial_turn(client):
+    test_client, memory, write_queue = client
+    session_id = test_client.post('/api/conversations', json={'user_id': 1}).get_json()['id']
+    # session, intent, db_result and the first two tokens
+    read = _stream_and_disconnect(test_client, {'user_id': 1, 'session_id': session_id,
+                                                'message': 'Where is order #1?'}, 5)
+    assert read[0].startswith('event: session') and read[-1].startswith('event: token')
+
+    message_count, messages, _ = _saved_turn(session_id)
+    assert message_count == 2
+    (user_type, user_content, _), (ai_type, ai_content, ai_metadata) = messages
+    assert (user_type, user_content) == ('user', 'Where is order #1?')
+    assert ai_type == 'ai'
+    assert ai_content and REPLY.startswith(ai_content) and ai_content != REPLY
+    assert ai_metadata['error'] == 'Reply interrupted before it was complete'
+
+    # The question is remembered, the cut-off reply is not
+    write_queue.flush()
+    remembered = memory.retrieve_relevant_memory(1, session_id, 'order shipped', limit=10)
+    assert [m['metadata']['message_type'] for m in remembered] == ['user']
+
+def test_disconnect_before_reply_creates_the_new_session(client):
+    test_client, _, _ = client
+    read = _stream_and_disconnect(test_client, {'user_id': 1, 'message': 'Where is order #1?'}, 1)
+    assert json.loads(read[0].split('data: ', 1)[1]) == {'session_id': None}
+
+    message_count, messages, _ = _saved_turn()
+    assert message_count == 2
+    assert [(m[0], m[1]) for m in messages] == [('user', 'Where is order #1?'), ('ai', '')]
+    assert messages[1][2]['error'] == 'Reply interrupted before it was complete'
+
+def test_completed_stream_saves_full_reply(client):
+    test_client, _, _ = client
+    body = test_client.post('/api/chat/stream', json={'user_id': 1, 'message': 'Where is order #1?'}).data.decode()
+    done = json.loads(body.rstrip().rsplit('data: ', 1)[1])
+    assert done['ai_response'] == REPLY and done['error'] is None
+
+    message_count, messages, session_id = _saved_turn()
+    assert session_id == done['session_id'] and message_count == 2
+    assert messages[1][1] == REPLY and messages[1][2].get('error') is None
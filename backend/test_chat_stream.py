@@ -0,0 +1,48 @@
+import requests
+import json
+import time
+
+BASE_URL = "http://localhost:5000/api/chat/stream"
+
+def test_chat_stream():
+    # Example user and message
+    user_id = 1  # Change as needed
+    session_id = None  # Set to None to create a new session
+    user_message = "What is the status of order #12345?"
+
+    payload = {
+        "user_id": user_id,
+        "message": user_message,
+        "session_id": session_id
+    }
+
+    print(f"Streaming from /api/chat/stream: {payload}")
+    start = time.perf_counter()
+    response = requests.post(BASE_URL, json=payload, stream=True)
+    print(f"Status code: {response.status_code}")
+
+    events = []
+    event = None
+    first_token_at = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            data = json.loads(line[len("data: "):])
+            events.append(event)
+            if event == "token":
+                if first_token_at is None:
+                    first_token_at = time.perf_counter() - start
+                print(data, end="", flush=True)
+            else:
+                print(f"\n[{event}] {data}")
+
+    order = [e for e in events if e != "token"]
+    print(f"\nEvent order: {order}")
+    assert order[:3] == ["session", "intent", "db_result"], "intent and db_result must precede tokens"
+    assert order[-1] == "done", "stream must end with a done event"
+    if first_token_at is not None:
+        print(f"Time to first token: {first_token_at * 1000:.0f} ms, total: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    test_chat_stream()
@@ -0,0 +1,93 @@
+"""Check rolling conversation summaries: when a fold is due, what it covers,
+the extractive fallback and the guard against double folds.
+
+Runs against an in-memory database with a local stub in place of the Groq API;
+does not need the API server.
+"""
+import pytest
+from models import db
+from services import ConversationService, ChatMessageService
+from llm_client import create_groq_client, set_groq_client
+from conversation_summary import (plan_context, summarize_session, DEFAULT_CONTEXT_MESSAGES,
+                                  SUMMARY_EVERY_MESSAGES, SUMMARY_RECENT_MESSAGES)
+from bench_utils import create_bench_app, StubGroqServer
+
+@pytest.fixture
+def app():
+    app = create_bench_app()
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.text('INSERT INTO "UserTable" (id, first_name) VALUES (1, \'Test\')'))
+        db.session.commit()
+        yield app
+
+def _session_with_messages(count):
+    session_id = ConversationService.create_session(1).id
+    for n in range(count):
+        ChatMessageService.add_message(session_id, 'user' if n % 2 == 0 else 'ai', f"message {n} about order {100 + n}")
+    return session_id
+
+@pytest.fixture
+def groq_stub():
+    with StubGroqServer(reply='User is tracking orders 100-109.') as server:
+        previous = set_groq_client(create_groq_client(api_key='test', base_url=server.base_url))
+        try:
+            yield server
+        finally:
+            set_groq_client(previous)
+
+def test_plan_context(app):
+    assert plan_context(None) == (None, DEFAULT_CONTEXT_MESSAGES, False)
+    session_id = _session_with_messages(SUMMARY_RECENT_MESSAGES)
+    summary, window, due = plan_context(ConversationService.get_summary_state(session_id))
+    assert (summary, window, due) == (None, SUMMARY_RECENT_MESSAGES, False)
+
+    # Due once the turn being saved brings the backlog to the recent window plus a fold
+    session_id = _session_with_messages(SUMMARY_RECENT_MESSAGES + SUMMARY_EVERY_MESSAGES - 2)
+    _, window, due = plan_context(ConversationService.get_summary_state(session_id))
+    assert due and window == SUMMARY_RECENT_MESSAGES + SUMMARY_EVERY_MESSAGES - 2
+
+def test_fold_covers_all_but_the_recent_messages(app, groq_stub):
+    total = SUMMARY_RECENT_MESSAGES + SUMMARY_EVERY_MESSAGES + 2
+    session_id = _session_with_messages(total)
+    messages = ChatMessageService.get_messages_after(session_id)
+
+    assert summarize_session(session_id) == total - SUMMARY_RECENT_MESSAGES
+    assert groq_stub.request_count == 1
+    state = ConversationService.get_summary_state(session_id)
+    assert state.summary == 'User is tracking orders 100-109.'
+    assert state.summary_message_id == messages[-SUMMARY_RECENT_MESSAGES - 1][0]
+    assert state.summarized_count == total - SUMMARY_RECENT_MESSAGES
+    # Only the recent messages are left to load verbatim, and nothing is due yet
+    assert plan_context(state) == (state.summary, SUMMARY_RECENT_MESSAGES, False)
+    assert summarize_session(session_id) == 0
+    assert groq_stub.request_count == 1
+
+def test_too_few_messages_are_not_folded(app, groq_stub):
+    session_id = _session_with_messages(SUMMARY_RECENT_MESSAGES + SUMMARY_EVERY_MESSAGES - 1)
+    assert summarize_session(session_id) == 0
+    assert groq_stub.request_count == 0
+    assert ConversationService.get_summary_state(session_id).summary is None
+
+def test_failed_llm_call_falls_back_to_extractive_summary(app):
+    # Nothing listens on port 9, so the call fails straight away
+    previous = set_groq_client(create_groq_client(api_key='test', base_url='http://127.0.0.1:9',
+                                                  timeout=2, max_retries=0))
+    try:
+        session_id = _session_with_messages(SUMMARY_RECENT_MESSAGES + SUMMARY_EVERY_MESSAGES)
+        assert summarize_session(session_id) == SUMMARY_EVERY_MESSAGES
+    finally:
+        set_groq_client(previous)
+    summary = ConversationService.get_summary_state(session_id).summary
+    assert summary.startswith("User asked: message 0 about order 100")
+    assert "message 1 " not in summary  # only what the user asked
+
+def test_stale_fold_is_not_saved(app):
+    session_id = _session_with_messages(4)
+    message_ids = [message_id for message_id, _, _ in ChatMessageService.get_messages_after(session_id)]
+    first, last = message_ids[0], message_ids[-1]
+    assert ConversationService.save_summary(session_id, 'first fold', None, first, 1)
+    # A second fold computed from the same starting point lost the race
+    assert not ConversationService.save_summary(session_id, 'second fold', None, last, 4)
+    state = ConversationService.get_summary_state(session_id)
+    assert (state.summary, state.summary_message_id, state.summarized_count) == ('first fold', first, 1)
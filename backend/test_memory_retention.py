@@ -0,0 +1,96 @@
+"""Check time-bucketed memory retention: whole-bucket expiry, explicit day counts
+and the collection left over from before bucketing.
+
+Uses hash embeddings in a temporary Chroma directory; does not need the API server.
+"""
+import os
+from datetime import datetime, timedelta
+
+os.environ.setdefault("EMBEDDING_BACKEND", "hash")
+
+import chromadb
+from chromadb.config import Settings
+from embeddings import create_embedder
+from memory_service import SemanticMemoryService, MemoryRetentionJob
+
+def _entries(ages_in_days, user_id=1):
+    now = datetime.utcnow()
+    return [{"user_id": user_id, "session_id": 1, "message_id": n + 1, "message_type": "user",
+             "content": f"memory from {age} days ago", "created_at": now - timedelta(days=age)}
+            for n, age in enumerate(ages_in_days)]
+
+def _service(path, bucket_days=30):
+    return SemanticMemoryService(create_embedder(), path=str(path), bucket_days=bucket_days)
+
+def _stored(service):
+    collections = [bucket[2] for bucket in service._buckets.values()]
+    if service.legacy_collection is not None:
+        collections.append(service.legacy_collection)
+    return sum(collection.count() for collection in collections)
+
+def test_cleanup_drops_expired_buckets_whole(tmp_path):
+    service = _service(tmp_path)
+    service.store_memory_batch(_entries([1, 10, 29, 45, 70, 100, 150]))
+    old_buckets = {name for name, (start, end, _) in service._buckets.items()
+                   if end <= (datetime.utcnow() - timedelta(days=30)).timestamp()}
+    assert old_buckets
+
+    assert service.cleanup_expired_memory() == 4
+    assert _stored(service) == 3
+    assert not old_buckets & set(service._buckets)
+    names = {c if isinstance(c, str) else c.name for c in service.client.list_collections()}
+    assert not old_buckets & names
+
+def test_days_zero_expires_everything(tmp_path):
+    service = _service(tmp_path)
+    service.store_memory_batch(_entries([1, 2, 3]))
+    # The 30-day default would keep all three
+    assert service.cleanup_expired_memory(0) == 3
+    assert _stored(service) == 0
+
+def test_retention_job_reports_days_zero(tmp_path):
+    service = _service(tmp_path)
+    service.store_memory_batch(_entries([1, 2]))
+    job = MemoryRetentionJob(service, interval=0)
+    assert job.run_once(0) == 2
+    status = job.status()
+    assert status["days"] == 0 and status["deleted"] == 2 and not status["running"]
+
+def _seed_legacy(path, ages_in_days):
+    """Fill the single pre-bucketing collection the way the old service did"""
+    embedder = create_embedder()
+    client = chromadb.PersistentClient(path=str(path), settings=Settings(anonymized_telemetry=False))
+    legacy = client.get_or_create_collection("memory")
+    entries = _entries(ages_in_days)
+    legacy.add(ids=[f"legacy_{e['message_id']}" for e in entries],
+               embeddings=embedder.embed([e["content"] for e in entries]),
+               documents=[e["content"] for e in entries],
+               metadatas=[{"user_id": e["user_id"], "session_id": e["session_id"], "message_type": "user",
+                           "timestamp": e["created_at"].timestamp()} for e in entries])
+    return entries[0]["created_at"].timestamp()
+
+def test_legacy_collection_sorts_by_its_newest_entry(tmp_path):
+    newest = _seed_legacy(tmp_path, [60, 90])
+    service = _service(tmp_path, bucket_days=7)
+    assert abs(service._legacy_end - (newest + 1)) < 1e-3
+    # The end is kept in the collection metadata for the next start
+    assert _service(tmp_path, bucket_days=7)._legacy_end == service._legacy_end
+
+    # Memories in the current and the previous weekly bucket, both inside the 14-day window
+    service.store_memory_batch(_entries([0, 8]))
+    assert len(service._buckets) == 2
+    cutoff = (datetime.utcnow() - timedelta(days=14)).timestamp()
+    searched = [collection for collection, _ in service._live_collections(cutoff, service.search_buckets)]
+    assert service.legacy_collection not in searched
+    memories = service.retrieve_relevant_memory(1, 1, "memory from 8 days ago", limit=5)
+    assert {memory["content"] for memory in memories} == {"memory from 0 days ago", "memory from 8 days ago"}
+
+def test_expired_legacy_collection_is_dropped(tmp_path):
+    _seed_legacy(tmp_path, [60, 90])
+    service = _service(tmp_path)
+    service.store_memory_batch(_entries([1]))
+    assert service.cleanup_expired_memory() == 2
+    assert service.legacy_collection is None
+    names = {c if isinstance(c, str) else c.name for c in service.client.list_collections()}
+    assert "memory" not in names
+    assert _stored(service) == 1
@@ -0,0 +1,67 @@
+"""Check the write-behind memory queue: batching, flush() and failure counts.
+
+Uses hash embeddings in a temporary Chroma directory; does not need the API server.
+"""
+import os
+import threading
+
+os.environ.setdefault("EMBEDDING_BACKEND", "hash")
+
+from embeddings import create_embedder
+from memory_service import SemanticMemoryService, MemoryWriteQueue
+
+class RecordingService(SemanticMemoryService):
+    """Memory service that remembers the size of every batch it is asked to store"""
+
+    def __init__(self, path, release=None):
+        super().__init__(create_embedder(), path=str(path))
+        self.batches = []
+        self.release = release
+
+    def store_memory_batch(self, entries):
+        if self.release is not None:
+            self.release.wait(5)
+        self.batches.append(len(entries))
+        return super().store_memory_batch(entries)
+
+def _enqueue(write_queue, count, session_id=1):
+    for n in range(count):
+        write_queue.enqueue(1, session_id, n + 1, f"where is my order {n}?", 'user')
+
+def test_flush_waits_for_every_queued_entry(tmp_path):
+    release = threading.Event()
+    service = RecordingService(tmp_path, release)
+    write_queue = MemoryWriteQueue(service, batch_size=8, flush_interval=0.05)
+    _enqueue(write_queue, 20)
+    # The worker is held before its first write, so everything is still pending
+    assert write_queue.pending_count == 20
+    release.set()
+
+    assert write_queue.flush() == 20
+    assert write_queue.pending_count == 0
+    assert write_queue.written_count == 20 and write_queue.failed_count == 0
+    assert sum(service.batches) == 20 and max(service.batches) <= 8
+    assert service.get_memory_stats(1)["total_memory_count"] == 20
+    assert write_queue.flush() == 0
+
+def test_entries_are_written_in_batches(tmp_path):
+    release = threading.Event()
+    service = RecordingService(tmp_path, release)
+    write_queue = MemoryWriteQueue(service, batch_size=16, flush_interval=0.5)
+    _enqueue(write_queue, 33)
+    release.set()
+    write_queue.flush()
+    # The first batch may be taken before the rest is queued; the others fill up
+    assert len(service.batches) <= 4
+    assert sum(service.batches) == 33
+
+def test_failed_batches_are_counted(tmp_path):
+    service = RecordingService(tmp_path)
+    write_queue = MemoryWriteQueue(service, batch_size=8, flush_interval=0.05)
+    # Without content the batch can't be embedded; store_memory_batch reports 0 stored
+    write_queue.enqueue(1, 1, 1, None, 'user')
+    write_queue.flush()
+    assert write_queue.written_count == 0 and write_queue.failed_count == 1
+    _enqueue(write_queue, 3)
+    write_queue.flush()
+    assert write_queue.written_count == 3
@@ -0,0 +1,58 @@
+"""Check keyset pagination and streaming of the list endpoints' service calls.
+
+Runs against an in-memory database built from the models; does not need the
+API server.
+"""
+from models import db, User
+from services import UserService, get_keyset_page
+from bench_utils import create_bench_app, QueryCounter
+
+# Keys with gaps, inserted out of order
+USER_IDS = [5, 1, 42, 7, 3, 100, 8, 2, 64, 9, 11]
+
+def _seed():
+    db.create_all()
+    db.session.execute(User.__table__.insert(), [{'id': user_id, 'first_name': f"User {user_id}"}
+                                                 for user_id in USER_IDS])
+    db.session.commit()
+
+def test_pages_cover_every_row_once_in_key_order():
+    app = create_bench_app()
+    with app.app_context():
+        _seed()
+        seen, after_id = [], None
+        while True:
+            page = UserService.get_users_page(after_id, 3)
+            assert len(page) <= 3
+            seen.extend(user.id for user in page)
+            if len(page) < 3:
+                break
+            after_id = page[-1].id
+        assert seen == sorted(USER_IDS)
+
+def test_after_id_is_exclusive_and_need_not_exist():
+    app = create_bench_app()
+    with app.app_context():
+        _seed()
+        assert [user.id for user in UserService.get_users_page(7, 2)] == [8, 9]
+        # A cursor between keys (e.g. a deleted row) resumes at the next key
+        assert [user.id for user in UserService.get_users_page(50, 5)] == [64, 100]
+        assert UserService.get_users_page(100, 5) == []
+        # Without a limit the rest of the table is returned
+        assert [user.id for user in get_keyset_page(User, User.id, 42)] == [64, 100]
+
+def test_each_page_is_one_query():
+    app = create_bench_app()
+    with app.app_context():
+        _seed()
+        with QueryCounter(db.engine) as counter:
+            UserService.get_users_page(7, 3)
+        assert counter.count == 1
+
+def test_stream_matches_pages():
+    app = create_bench_app()
+    with app.app_context():
+        _seed()
+        streamed = [user.id for user in UserService.iter_users(3)]
+        assert streamed == sorted(user_id for user_id in USER_IDS if user_id > 3)
+        assert [user.id for user in UserService.iter_users(None, 4)] == sorted(USER_IDS)[:4]
@@ -0,0 +1,82 @@
+"""Check product search: FTS5 ranking and prefix matching, trigger sync, and the
+LIKE fallback when the index is missing.
+
+Runs against an in-memory database built from the models; does not need the
+API server.
+"""
+from models import db, Product
+from services import ProductService
+from search_index import PRODUCT_FTS_TABLE, ensure_product_search_index, build_fts_query
+from bench_utils import create_bench_app
+
+PRODUCTS = [
+    {'id': 1, 'name': 'Classic Denim Jacket', 'brand': "Levi's", 'category': 'Outerwear & Coats'},
+    {'id': 2, 'name': 'Slim Fit Jeans', 'brand': "Levi's", 'category': 'Jeans'},
+    {'id': 3, 'name': 'Denim Denim Shirt', 'brand': 'Wrangler', 'category': 'Tops & Tees'},
+    {'id': 4, 'name': 'Wool Sweater', 'brand': 'Patagonia', 'category': 'Sweaters'},
+    {'id': 5, 'name': 'Crème Brûlée Socks', 'brand': 'Happy Socks', 'category': 'Socks'},
+]
+
+def _seed(index=True):
+    db.create_all()
+    db.session.execute(Product.__table__.insert(), PRODUCTS)
+    db.session.commit()
+    if index:
+        assert ensure_product_search_index(db.engine)
+
+def _ids(products):
+    return [product.id for product in products]
+
+def test_build_fts_query_quotes_terms():
+    assert build_fts_query('denim jack') == '"denim"* "jack"*'
+    # FTS5 operators and column filters in user input are matched as plain words
+    assert build_fts_query('name: OR "jeans') == '"name"* "OR"* "jeans"*'
+    assert build_fts_query(' -- !! ') is None
+
+def test_fts_ranks_and_matches_prefixes():
+    app = create_bench_app()
+    with app.app_context():
+        _seed()
+        # The shirt mentions denim twice in a shorter row, so BM25 ranks it first
+        assert _ids(ProductService.search_products('denim')) == [3, 1]
+        assert _ids(ProductService.search_products('jack')) == [1]
+        # Every word has to match, in any column
+        assert _ids(ProductService.search_products("levi jeans")) == [2]
+        assert _ids(ProductService.search_products('creme brulee')) == [5]
+        assert ProductService.search_products('?!') == []
+
+def test_fts_paging():
+    app = create_bench_app()
+    with app.app_context():
+        _seed()
+        assert _ids(ProductService.search_products('denim', limit=1)) == [3]
+        assert _ids(ProductService.search_products('denim', limit=1, offset=1)) == [1]
+
+def test_triggers_keep_the_index_in_sync():
+    app = create_bench_app()
+    with app.app_context():
+        _seed()
+        db.session.add(Product(id=6, name='Denim Overalls', brand='Dickies', category='Jumpsuits'))
+        db.session.commit()
+        assert 6 in _ids(ProductService.search_products('overalls'))
+
+        db.session.get(Product, 4).name = 'Merino Cardigan'
+        db.session.commit()
+        assert _ids(ProductService.search_products('cardigan')) == [4]
+        assert ProductService.search_products('wool') == []
+
+        db.session.delete(db.session.get(Product, 1))
+        db.session.commit()
+        assert _ids(ProductService.search_products('jacket')) == []
+
+def test_like_fallback_without_index():
+    app = create_bench_app()
+    with app.app_context():
+        _seed(index=False)
+        tables = db.session.execute(db.text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars()
+        assert PRODUCT_FTS_TABLE not in set(tables)
+        # Substring matching in id order, no ranking
+        assert _ids(ProductService.search_products('Denim')) == [1, 3]
+        assert _ids(ProductService.search_products('Denim', limit=1, offset=1)) == [3]
+        # The failed FTS query must not leave the session unusable
+        assert db.session.get(Product, 2).name == 'Slim Fit Jeans'
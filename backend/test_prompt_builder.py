@@ -0,0 +1,74 @@
+"""Check the token-budgeted prompt builder: budget, section priority, truncation
+and the token-count caches.
+
+Pure functions; does not need the API server or a database.
+"""
+import prompt_builder
+from prompt_builder import build_prompt, compact_db_result, estimate_tokens, truncate_to_tokens, INSTRUCTION
+
+def _state(history=10, memories=3, intent="order_status", message="Where is order 123?"):
+    return {
+        'user_message': message,
+        'intent': intent,
+        'db_result': {'order_id': 123, 'status': 'Shipped', 'shipped_at': None, 'items': [],
+                      'memory_context': ['repeated elsewhere'], 'total': 59.991},
+        'conversation_summary': "The user asked about order 123 and a refund for order 99.",
+        'semantic_memory': [{'content': f"memory {n}: the user prefers express shipping to Boston"}
+                            for n in range(memories)],
+        'conversation_context': [{'role': 'user' if n % 2 == 0 else 'assistant',
+                                  'content': f"history message {n} about the jacket order and its delivery"}
+                                 for n in range(history)],
+    }
+
+def _clear_caches():
+    prompt_builder._cached_tokens.cache_clear()
+    prompt_builder._cached_truncation.cache_clear()
+
+def test_prompt_fits_the_budget():
+    for budget in (120, 300, 1500):
+        prompt, tokens = build_prompt(_state(history=12), budget)
+        assert tokens <= budget
+        assert estimate_tokens(prompt) == tokens
+        assert prompt.startswith("User: Where is order 123?")
+        assert prompt.endswith(INSTRUCTION)
+
+def test_db_result_is_compacted():
+    assert compact_db_result(_state()['db_result']) == '{"order_id":123,"status":"Shipped","total":59.99}'
+    assert compact_db_result(None) == ""
+
+def test_oldest_history_is_dropped_first_and_rendered_in_order():
+    prompt, _ = build_prompt(_state(history=12, memories=0), 160)
+    kept = [n for n in range(12) if f"history message {n} " in prompt]
+    assert kept and kept[-1] == 11
+    assert kept == list(range(kept[0], 12))
+    positions = [prompt.index(f"history message {n} ") for n in kept]
+    assert positions == sorted(positions)
+
+def test_memory_recall_fills_memories_before_history():
+    tight = 150
+    recall, _ = build_prompt(_state(intent="memory_recall"), tight)
+    other, _ = build_prompt(_state(intent="order_status"), tight)
+    assert "Relevant Past Conversations:" in recall
+    assert "Relevant Past Conversations:" not in other
+    assert "Recent Conversation History:" in other
+
+def test_truncation_keeps_whole_words():
+    text = "international shipping information for every destination"
+    cut = truncate_to_tokens(text, 8)
+    assert cut.endswith(" ...")
+    assert text.startswith(cut[:-len(" ...")])
+    assert cut[:-len(" ...")].split()[-1] in text.split()
+    assert estimate_tokens(cut) <= 8
+    assert truncate_to_tokens("short text", 8) == "short text"
+
+def test_cached_and_cold_builds_match():
+    state = _state(history=12)
+    _clear_caches()
+    cold = build_prompt(state, 300)
+    warm = build_prompt(state, 300)
+    assert cold == warm
+    assert prompt_builder._cached_tokens.cache_info().hits > 0
+    # The user message is new every turn and stays out of the cache
+    size = prompt_builder._cached_tokens.cache_info().currsize
+    build_prompt(dict(state, user_message="a one-off question about order 77"), 300)
+    assert prompt_builder._cached_tokens.cache_info().currsize == size
@@ -0,0 +1,154 @@
+"""Check that the hot service queries are served by indexes, not table scans.
+
+Runs each service call against an in-memory database built from the models,
+captures the SQL it emits and asserts on SQLite's EXPLAIN QUERY PLAN output
+and on query counts. Does not need the API server.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from models import db, ConversationSession, ChatMessage
+from services import UserService, OrderService, ConversationService, ChatMessageService, EcommerceDataService
+from bench_utils import create_bench_app, QueryCounter
+
+def capture_statements(fn, *args):
+    """Run fn and return the (statement, parameters) pairs it executed"""
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', on_execute)
+    try:
+        fn(*args)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', on_execute)
+    return statements
+
+def query_plan(statement, parameters) -> str:
+    cursor = db.session.connection().connection.cursor()
+    rows = cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    cursor.close()
+    return "\n".join(row[-1] for row in rows)
+
+def assert_uses_index(name, fn, args, table, index, ordered=False):
+    plans = [query_plan(statement, parameters) for statement, parameters in capture_statements(fn, *args)
+             if f'FROM "{table}"' in statement or f'FROM {table}' in statement]
+    assert plans, f"{name}: no query against {table}"
+    for plan in plans:
+        assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan, \
+            f"{name}: expected {index}, got:\n{plan}"
+        assert f"SCAN {table}" not in plan, f"{name}: full scan of {table}:\n{plan}"
+        if ordered:
+            assert "TEMP B-TREE" not in plan, f"{name}: extra sort step:\n{plan}"
+    print(f"✓ {name} uses {index}")
+
+def test_query_plans():
+    """Assert the hot lookups use their secondary indexes"""
+    print("🧪 Testing query plans for hot lookups")
+    print("=" * 60)
+
+    app = create_bench_app()
+    with app.app_context():
+        db.create_all()
+
+        assert_uses_index("get_user_orders", UserService.get_user_orders, (1,),
+                          'OrderTable', 'idx_order_user_created')
+        assert_uses_index("get_user_order_history", OrderService.get_user_order_history, (1,),
+                          'OrderTable', 'idx_order_user_created', ordered=True)
+        assert_uses_index("get_order_items", OrderService.get_order_items, (1,),
+                          'OrderItem', 'idx_order_item_order_id')
+        assert_uses_index("get_session_messages", ChatMessageService.get_session_messages, (1,),
+                          'ChatMessage', 'idx_chat_session_created', ordered=True)
+        assert_uses_index("get_messages_page latest", ChatMessageService.get_messages_page, (1,),
+                          'ChatMessage', 'idx_chat_session_created', ordered=True)
+        assert_uses_index("get_messages_page before", ChatMessageService.get_messages_page, (1, 500),
+                          'ChatMessage', 'idx_chat_session_created', ordered=True)
+        assert_uses_index("get_messages_page after", ChatMessageService.get_messages_page, (1, None, 500),
+                          'ChatMessage', 'idx_chat_session_created', ordered=True)
+        assert_uses_index("get_context_window", ChatMessageService.get_context_window, (1,),
+                          'ChatMessage', 'idx_chat_session_created', ordered=True)
+
+        # get_user_context and get_order_status only run their child queries for existing rows
+        db.session.execute(db.text('INSERT INTO "UserTable" (id, first_name) VALUES (1, \'Test\')'))
+        db.session.execute(db.text('INSERT INTO "OrderTable" (order_id, user_id, status) VALUES (1, 1, \'Shipped\')'))
+        assert_uses_index("get_user_context orders", EcommerceDataService.get_user_context, (1,),
+                          'OrderTable', 'idx_order_user_created')
+        assert_uses_index("get_user_context order items", EcommerceDataService.get_user_context, (1,),
+                          'OrderItem', 'idx_order_item_order_id')
+        assert_uses_index("get_order_status items", EcommerceDataService.get_order_status, (1,),
+                          'OrderItem', 'idx_order_item_order_id')
+        db.session.rollback()
+
+        for table, column, index in [
+            ('OrderItem', 'user_id', 'idx_order_item_user_id'),
+            ('OrderItem', 'product_id', 'idx_order_item_product_id'),
+            ('InventoryItem', 'product_id', 'idx_inventory_item_product_id'),
+            ('Product', 'distribution_center_id', 'idx_product_distribution_center_id'),
+        ]:
+            plan = query_plan(f'SELECT * FROM "{table}" WHERE {column} = ?', (1,))
+            assert f"USING INDEX {index}" in plan, f"{table}.{column}: expected {index}, got:\n{plan}"
+            print(f"✓ {table}.{column} lookups use {index}")
+
+    print("\n" + "=" * 60)
+    print("🎉 All query plan checks passed!")
+
+def test_conversation_list_query_count():
+    """Listing a user's conversations must not load their message histories"""
+    print("\n🧪 Testing conversation list query count")
+    print("=" * 60)
+
+    app = create_bench_app()
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.text('INSERT INTO "UserTable" (id, first_name) VALUES (1, \'Test\')'))
+        session_ids = [ConversationService.create_session(1, f"Chat {n}").id for n in range(200)]
+        for n in range(5):
+            ChatMessageService.add_message(session_ids[0], 'user', f"message {n}")
+        db.session.execute(ChatMessage.__table__.insert(), [
+            {'session_id': session_id, 'message_type': 'user', 'content': 'hi'} for session_id in session_ids[1:]
+        ])
+        db.session.execute(ConversationSession.__table__.update()
+                           .where(ConversationSession.id != session_ids[0]).values(message_count=1))
+        db.session.commit()
+        db.session.expunge_all()
+
+        with QueryCounter(db.engine) as counter:
+            sessions = [session.to_dict() for session in ConversationService.get_user_sessions(1)]
+        assert len(sessions) == 200, f"expected 200 sessions, got {len(sessions)}"
+        assert counter.count <= 2, f"listing 200 conversations took {counter.count} queries"
+        counts = {session['id']: session['message_count'] for session in sessions}
+        assert counts[session_ids[0]] == 5, f"expected 5 messages, got {counts[session_ids[0]]}"
+        print(f"✓ 200 conversations listed in {counter.count} query, message_count maintained by add_message")
+
+def test_context_window_order():
+    """The chat context window is the session's last N messages, oldest first"""
+    print("\n🧪 Testing chat context window")
+    print("=" * 60)
+
+    app = create_bench_app()
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.text('INSERT INTO "UserTable" (id, first_name) VALUES (1, \'Test\')'))
+        session_id = ConversationService.create_session(1).id
+        other_id = ConversationService.create_session(1).id
+        start = datetime(2024, 1, 1)
+        db.session.execute(ChatMessage.__table__.insert(), [
+            {'session_id': session_id, 'message_type': 'user' if n % 2 == 0 else 'ai', 'content': f"message {n}",
+             'created_at': start + timedelta(seconds=n), 'message_metadata': '{"intent": "general"}'}
+            for n in range(30)
+        ] + [{'session_id': other_id, 'message_type': 'user', 'content': 'other',
+             'created_at': start + timedelta(hours=1), 'message_metadata': None}])
+        db.session.commit()
+
+        with QueryCounter(db.engine) as counter:
+            window = ChatMessageService.get_context_window(session_id, 10)
+        assert counter.count == 1, f"context window took {counter.count} queries"
+        assert [msg['content'] for msg in window] == [f"message {n}" for n in range(20, 30)], \
+            f"expected the last 10 messages oldest first, got {[msg['content'] for msg in window]}"
+        assert set(window[0]) == {'role', 'content', 'timestamp'}, f"unexpected fields {sorted(window[0])}"
+        print("✓ last 10 of 30 messages returned oldest first in 1 query, without metadata")
+
+if __name__ == "__main__":
+    test_query_plans()
+    test_conversation_list_query_count()
+    test_context_window_order()
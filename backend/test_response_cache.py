@@ -0,0 +1,107 @@
+"""Check the catalog response cache: cached bodies, ETag/304 revalidation and
+invalidation by catalog version.
+
+Uses a throwaway Flask app with an in-memory database; does not need the API
+server.
+"""
+from flask import Response, jsonify
+from models import db
+from response_cache import response_cache, cached_response, cached_rows
+from bench_utils import create_bench_app
+
+def _create_app(calls, monkeypatch):
+    app = create_bench_app()
+
+    @app.route('/items')
+    @cached_response
+    def items():
+        calls.append('items')
+        return jsonify([{'id': 1, 'name': 'Jacket'}])
+
+    @app.route('/missing')
+    @cached_response
+    def missing():
+        calls.append('missing')
+        return jsonify({'error': 'not found'}), 404
+
+    @app.route('/stream')
+    @cached_response
+    def stream():
+        calls.append('stream')
+        return Response((chunk for chunk in ['[', ']']), mimetype='application/json')
+
+    with app.app_context():
+        db.create_all()
+    response_cache.clear()
+    # Re-read the catalog version on every request
+    monkeypatch.setattr(response_cache, 'version_check_interval', 0)
+    return app
+
+def _bump_catalog_version():
+    db.session.execute(db.text(
+        'INSERT INTO CatalogVersion (id, version) VALUES (1, 1) '
+        'ON CONFLICT(id) DO UPDATE SET version = version + 1'))
+    db.session.commit()
+
+def test_repeat_requests_are_served_from_cache(monkeypatch):
+    calls = []
+    client = _create_app(calls, monkeypatch).test_client()
+    first = client.get('/items')
+    second = client.get('/items')
+    assert first.status_code == second.status_code == 200
+    assert first.get_json() == second.get_json() == [{'id': 1, 'name': 'Jacket'}]
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert second.headers['Cache-Control'] == 'no-cache'
+    assert calls == ['items']
+    # The query string is part of the key
+    client.get('/items?limit=5')
+    assert calls == ['items', 'items']
+
+def test_matching_etag_gets_304(monkeypatch):
+    calls = []
+    client = _create_app(calls, monkeypatch).test_client()
+    etag = client.get('/items').headers['ETag']
+    not_modified = client.get('/items', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+    assert not_modified.headers['ETag'] == etag
+    assert client.get('/items', headers={'If-None-Match': '"0-stale"'}).status_code == 200
+    assert response_cache.stats()['not_modified'] == 1
+    assert calls == ['items']
+
+def test_catalog_version_bump_invalidates(monkeypatch):
+    calls = []
+    app = _create_app(calls, monkeypatch)
+    client = app.test_client()
+    etag = client.get('/items').headers['ETag']
+    with app.app_context():
+        _bump_catalog_version()
+    refreshed = client.get('/items', headers={'If-None-Match': etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers['ETag'] != etag
+    assert calls == ['items', 'items']
+
+def test_errors_and_streams_are_not_cached(monkeypatch):
+    calls = []
+    client = _create_app(calls, monkeypatch).test_client()
+    for _ in range(2):
+        assert client.get('/missing').status_code == 404
+        assert client.get('/stream').data == b'[]'
+    assert calls == ['missing', 'stream', 'missing', 'stream']
+
+def test_cached_rows_loads_only_missing_ids(monkeypatch):
+    loaded = []
+
+    def load(ids):
+        loaded.append(list(ids))
+        return {row_id: {'id': row_id} for row_id in ids if row_id != 3}
+
+    app = _create_app([], monkeypatch)
+    with app.app_context():
+        assert cached_rows('product', [2, 1, 3], load) == [{'id': 1}, {'id': 2}]
+        rows = cached_rows('product', [1, 2, 4], load)
+        assert rows == [{'id': 1}, {'id': 2}, {'id': 4}]
+        # Callers get copies, not the cached dicts
+        rows[0]['name'] = 'changed'
+        assert cached_rows('product', [1], load) == [{'id': 1}]
+    assert loaded == [[1, 2, 3], [4]]
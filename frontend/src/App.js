@@ -1,4 +1,4 @@
-import React, { useEffect } from 'react';
+import React, { useEffect, useState } from 'react';
 import './App.css';
 import ChatWindow from './components/ChatWindow';
 import ConversationHistory from './components/ConversationHistory';
@@ -6,6 +6,14 @@ import TestComponent from './components/TestComponent';
 import { ChatProvider, useChat } from './context/ChatContext';
 import { chatAPI } from './services/api';
 
+// Transform API messages to match our format
+const formatMessages = (messages) => messages.map(msg => ({
+  id: msg.id,
+  type: msg.message_type,
+  content: msg.content,
+  timestamp: msg.created_at
+}));
+
 const ChatApp = () => {
   const {
     messages,
@@ -16,8 +24,11 @@ const ChatApp = () => {
     setLoading,
     setCurrentSession,
     setConversations,
-    loadConversation
+    loadConversation,
+    prependMessages,
+    olderCursor
   } = useChat();
+  const [loadingOlder, setLoadingOlder] = useState(false);
 
   useEffect(() => {
     // Load conversations on component mount
@@ -81,16 +92,8 @@ const ChatApp = () => {
   const handleConversationSelect = async (sessionId) => {
     try {
       setLoading(true);
-      const messages = await chatAPI.getConversationMessages(sessionId);
-      
-      // Transform messages to match our format
-      const formattedMessages = messages.map(msg => ({
-        type: msg.message_type,
-        content: msg.content,
-        timestamp: msg.created_at
-      }));
-
-      loadConversation(sessionId, formattedMessages);
+      const page = await chatAPI.getConversationMessages(sessionId);
+      loadConversation(sessionId, formatMessages(page.messages), page.olderCursor);
     } catch (error) {
       console.error('Failed to load conversation:', error);
     } finally {
@@ -98,6 +101,20 @@ const ChatApp = () => {
     }
   };
 
+  // Load the next page of older messages when the user scrolls to the top
+  const handleLoadOlder = async () => {
+    if (!olderCursor || loadingOlder || !currentSessionId) return;
+    try {
+      setLoadingOlder(true);
+      const page = await chatAPI.getConversationMessages(currentSessionId, { beforeId: olderCursor });
+      prependMessages(formatMessages(page.messages), page.olderCursor);
+    } catch (error) {
+      console.error('Failed to load older messages:', error);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   const handleNewConversation = async () => {
     try {
       const newConversation = await chatAPI.createConversation(1, 'New Conversation');
@@ -123,6 +140,9 @@ const ChatApp = () => {
             messages={messages}
             loading={loading}
             onSendMessage={handleSendMessage}
+            hasOlder={Boolean(olderCursor)}
+            loadingOlder={loadingOlder}
+            onLoadOlder={handleLoadOlder}
           />
         </div>
       </div>
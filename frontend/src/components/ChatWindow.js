@@ -2,12 +2,18 @@ import React from 'react';
 import MessageList from './MessageList';
 import UserInput from './UserInput';
 
-const ChatWindow = ({ messages, loading, onSendMessage }) => {
+const ChatWindow = ({ messages, loading, onSendMessage, hasOlder, loadingOlder, onLoadOlder }) => {
   return (
     <div className="chat-window">
       <div className="chat-container">
         <div className="chat-main">
-          <MessageList messages={messages} loading={loading} />
+          <MessageList
+            messages={messages}
+            loading={loading}
+            hasOlder={hasOlder}
+            loadingOlder={loadingOlder}
+            onLoadOlder={onLoadOlder}
+          />
           <UserInput onSendMessage={onSendMessage} disabled={loading} />
         </div>
       </div>
@@ -1,17 +1,44 @@
-import React, { useEffect, useRef } from 'react';
+import React, { useEffect, useLayoutEffect, useRef } from 'react';
 import Message from './Message';
 
-const MessageList = ({ messages, loading }) => {
+// Distance from the top (px) at which the next page of older messages is requested
+const LOAD_OLDER_THRESHOLD = 80;
+
+const MessageList = ({ messages, loading, hasOlder = false, loadingOlder = false, onLoadOlder }) => {
   const messagesEndRef = useRef(null);
+  const listRef = useRef(null);
+  const lastMessageRef = useRef(null);
+  const heightBeforeLoadRef = useRef(0);
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
   };
 
+  // Older pages are prepended: keep the view anchored instead of jumping to the bottom
+  useLayoutEffect(() => {
+    const list = listRef.current;
+    const lastMessage = messages[messages.length - 1];
+    if (list && heightBeforeLoadRef.current && lastMessage === lastMessageRef.current) {
+      list.scrollTop += list.scrollHeight - heightBeforeLoadRef.current;
+    }
+    heightBeforeLoadRef.current = 0;
+  }, [messages]);
+
   useEffect(() => {
-    scrollToBottom();
+    const lastMessage = messages[messages.length - 1];
+    if (lastMessage !== lastMessageRef.current) {
+      lastMessageRef.current = lastMessage;
+      scrollToBottom();
+    }
   }, [messages]);
 
+  const handleScroll = () => {
+    if (hasOlder && !loadingOlder && onLoadOlder && listRef.current.scrollTop < LOAD_OLDER_THRESHOLD) {
+      heightBeforeLoadRef.current = listRef.current.scrollHeight;
+      onLoadOlder();
+    }
+  };
+
   if (loading) {
     return (
       <div className="message-list">
@@ -24,9 +51,15 @@ const MessageList = ({ messages, loading }) => {
   }
 
   return (
-    <div className="message-list">
+    <div className="message-list" ref={listRef} onScroll={handleScroll}>
+      {loadingOlder && (
+        <div className="loading">
+          <div className="loading-spinner"></div>
+          <span>Loading earlier messages...</span>
+        </div>
+      )}
       {messages.map((message, index) => (
-        <Message key={index} message={message} />
+        <Message key={message.id || `local-${index}`} message={message} />
       ))}
       <div ref={messagesEndRef} />
     </div>
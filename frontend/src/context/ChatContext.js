@@ -6,7 +6,8 @@ const initialState = {
   loading: false,
   userInput: '',
   currentSessionId: null,
-  conversations: []
+  conversations: [],
+  olderCursor: null
 };
 
 // Action types
@@ -17,6 +18,7 @@ const ACTIONS = {
   SET_CURRENT_SESSION: 'SET_CURRENT_SESSION',
   SET_CONVERSATIONS: 'SET_CONVERSATIONS',
   LOAD_CONVERSATION: 'LOAD_CONVERSATION',
+  PREPEND_MESSAGES: 'PREPEND_MESSAGES',
   CLEAR_MESSAGES: 'CLEAR_MESSAGES'
 };
 
@@ -57,7 +59,15 @@ const chatReducer = (state, action) => {
       return {
         ...state,
         messages: action.payload.messages,
-        currentSessionId: action.payload.sessionId
+        currentSessionId: action.payload.sessionId,
+        olderCursor: action.payload.olderCursor || null
+      };
+    
+    case ACTIONS.PREPEND_MESSAGES:
+      return {
+        ...state,
+        messages: [...action.payload.messages, ...state.messages],
+        olderCursor: action.payload.olderCursor || null
       };
     
     case ACTIONS.CLEAR_MESSAGES:
@@ -98,10 +108,17 @@ export const ChatProvider = ({ children }) => {
     dispatch({ type: ACTIONS.SET_CONVERSATIONS, payload: conversations });
   };
 
-  const loadConversation = (sessionId, messages) => {
+  const loadConversation = (sessionId, messages, olderCursor = null) => {
     dispatch({ 
       type: ACTIONS.LOAD_CONVERSATION, 
-      payload: { sessionId, messages } 
+      payload: { sessionId, messages, olderCursor } 
+    });
+  };
+
+  const prependMessages = (messages, olderCursor = null) => {
+    dispatch({ 
+      type: ACTIONS.PREPEND_MESSAGES, 
+      payload: { messages, olderCursor } 
     });
   };
 
@@ -117,6 +134,7 @@ export const ChatProvider = ({ children }) => {
     setCurrentSession,
     setConversations,
     loadConversation,
+    prependMessages,
     clearMessages
   };
 
@@ -1,6 +1,7 @@
 import axios from 'axios';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000/api';
+export const MESSAGE_PAGE_SIZE = 50;
 
 const api = axios.create({
   baseURL: API_BASE_URL,
@@ -35,10 +36,16 @@ export const chatAPI = {
     }
   },
 
-  getConversationMessages: async (sessionId) => {
+  // Fetch one page of a conversation, oldest first: the latest messages, or the ones
+  // just older than beforeId. olderCursor is null once the start of the history is reached.
+  getConversationMessages: async (sessionId, { beforeId = null, limit = MESSAGE_PAGE_SIZE } = {}) => {
     try {
-      const response = await api.get(`/conversations/${sessionId}/messages`);
-      return response.data;
+      const params = beforeId ? { before_id: beforeId, limit } : { latest: true, limit };
+      const response = await api.get(`/conversations/${sessionId}/messages`, { params });
+      return {
+        messages: response.data,
+        olderCursor: response.headers['x-prev-before-id'] || null
+      };
     } catch (error) {
       console.error('Error fetching conversation messages:', error);
       throw error;